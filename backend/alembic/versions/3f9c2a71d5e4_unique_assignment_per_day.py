@@ -0,0 +1,65 @@
+"""unique driver and truck assignment per day
+
+Revision ID: 3f9c2a71d5e4
+Revises: 
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a71d5e4'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MAX_LISTED_DUPLICATES = 50
+
+
+def _double_bookings(bind, column: str) -> list:
+    """(entity id, date, assignment ids) of every entity assigned more than once on a day."""
+    rows = bind.execute(sa.text(
+        f"SELECT a.{column}, a.date, a.id FROM assignments a "
+        f"JOIN (SELECT {column}, date FROM assignments GROUP BY {column}, date HAVING COUNT(*) > 1) d "
+        f"ON a.{column} = d.{column} AND a.date = d.date "
+        f"ORDER BY a.{column}, a.date, a.id"
+    ))
+    bookings = {}
+    for entity_id, day, assignment_id in rows:
+        bookings.setdefault((entity_id, day), []).append(assignment_id)
+    return [(entity_id, day, ids) for (entity_id, day), ids in bookings.items()]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # The unique indexes cannot be built over existing double bookings; report them
+    # all instead of failing midway with the first IntegrityError
+    duplicates = [
+        f"{entity} {entity_id} on {day}: assignments {', '.join(str(assignment_id) for assignment_id in ids)}"
+        for entity, column in (('driver', 'driver_id'), ('truck', 'truck_id'))
+        for entity_id, day, ids in _double_bookings(bind, column)
+    ]
+    if duplicates:
+        listed = duplicates[:MAX_LISTED_DUPLICATES]
+        if len(duplicates) > len(listed):
+            listed.append(f"... and {len(duplicates) - len(listed)} more")
+        raise RuntimeError(
+            "Cannot add the unique per-day assignment indexes: these drivers and trucks are "
+            "assigned more than once on the same day. Delete or move the extra assignments "
+            "and run the migration again.\n" + "\n".join(listed)
+        )
+
+    op.create_index('uq_assignments_driver_date', 'assignments', ['driver_id', 'date'], unique=True)
+    op.create_index('uq_assignments_truck_date', 'assignments', ['truck_id', 'date'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_assignments_truck_date', table_name='assignments')
+    op.drop_index('uq_assignments_driver_date', table_name='assignments')
@@ -0,0 +1,32 @@
+"""indexes for keyset pagination and list filters
+
+Revision ID: 8b41e6d0c2f7
+Revises: 3f9c2a71d5e4
+Create Date: 2026-10-17 10:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41e6d0c2f7'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a71d5e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assignments_date_id', 'assignments', ['date', 'id'], unique=False)
+    op.create_index(op.f('ix_drivers_license_type'), 'drivers', ['license_type'], unique=False)
+    op.create_index(op.f('ix_trucks_min_license_type'), 'trucks', ['min_license_type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trucks_min_license_type'), table_name='trucks')
+    op.drop_index(op.f('ix_drivers_license_type'), table_name='drivers')
+    op.drop_index('ix_assignments_date_id', table_name='assignments')
@@ -0,0 +1,55 @@
+"""archive table for assignments past the hot horizon
+
+Revision ID: b6e2d8f4a1c9
+Revises: a9d3e7c1f5b8
+Create Date: 2026-10-17 18:12:05.274193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d8f4a1c9'
+down_revision: Union[str, Sequence[str], None] = 'a9d3e7c1f5b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRECISE_DATETIME = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+BINARY_UUID = sa.BINARY(16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'assignments_archive',
+        sa.Column('id', BINARY_UUID, nullable=False),
+        sa.Column('driver_id', BINARY_UUID, nullable=False),
+        sa.Column('truck_id', BINARY_UUID, nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('updated_at', PRECISE_DATETIME, nullable=False),
+        sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], ),
+        sa.ForeignKeyConstraint(['truck_id'], ['trucks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_assignments_archive_date_id', 'assignments_archive', ['date', 'id'], unique=False)
+    op.create_index('ix_assignments_archive_driver_date', 'assignments_archive', ['driver_id', 'date'], unique=False)
+    op.create_index('ix_assignments_archive_truck_date', 'assignments_archive', ['truck_id', 'date'], unique=False)
+    op.create_index(op.f('ix_assignments_archive_updated_at'), 'assignments_archive', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived rows go back to the hot table before the archive is dropped
+    op.execute(
+        "INSERT INTO assignments (id, driver_id, truck_id, date, updated_at) "
+        "SELECT id, driver_id, truck_id, date, updated_at FROM assignments_archive"
+    )
+    op.drop_index(op.f('ix_assignments_archive_updated_at'), table_name='assignments_archive')
+    op.drop_index('ix_assignments_archive_truck_date', table_name='assignments_archive')
+    op.drop_index('ix_assignments_archive_driver_date', table_name='assignments_archive')
+    op.drop_index('ix_assignments_archive_date_id', table_name='assignments_archive')
+    op.drop_table('assignments_archive')
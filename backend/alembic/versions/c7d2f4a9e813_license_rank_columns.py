@@ -0,0 +1,47 @@
+"""integer license rank columns on drivers and trucks
+
+Revision ID: c7d2f4a9e813
+Revises: 8b41e6d0c2f7
+Create Date: 2026-10-17 13:41:09.127554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2f4a9e813'
+down_revision: Union[str, Sequence[str], None] = '8b41e6d0c2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RANK_FROM_LICENSE = "CASE {column} WHEN 'A' THEN 1 WHEN 'B' THEN 2 WHEN 'C' THEN 3 WHEN 'D' THEN 4 WHEN 'E' THEN 5 END"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('drivers', sa.Column('license_rank', sa.SmallInteger(), nullable=True))
+    op.add_column('trucks', sa.Column('min_license_rank', sa.SmallInteger(), nullable=True))
+
+    op.execute(f"UPDATE drivers SET license_rank = {RANK_FROM_LICENSE.format(column='license_type')}")
+    op.execute(f"UPDATE trucks SET min_license_rank = {RANK_FROM_LICENSE.format(column='min_license_type')}")
+
+    with op.batch_alter_table('drivers') as batch_op:
+        batch_op.alter_column('license_rank', existing_type=sa.SmallInteger(), nullable=False)
+    with op.batch_alter_table('trucks') as batch_op:
+        batch_op.alter_column('min_license_rank', existing_type=sa.SmallInteger(), nullable=False)
+
+    op.create_index(op.f('ix_drivers_license_rank'), 'drivers', ['license_rank'], unique=False)
+    op.create_index(op.f('ix_trucks_min_license_rank'), 'trucks', ['min_license_rank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trucks_min_license_rank'), table_name='trucks')
+    op.drop_index(op.f('ix_drivers_license_rank'), table_name='drivers')
+    with op.batch_alter_table('trucks') as batch_op:
+        batch_op.drop_column('min_license_rank')
+    with op.batch_alter_table('drivers') as batch_op:
+        batch_op.drop_column('license_rank')
@@ -0,0 +1,45 @@
+"""utilization rollups per driver and truck, week and month
+
+Revision ID: c8f4a2e6d9b3
+Revises: b6e2d8f4a1c9
+Create Date: 2026-10-17 19:21:48.603517
+
+Fill the new table with `python -m services.rollups` before assignment writes resume.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f4a2e6d9b3'
+down_revision: Union[str, Sequence[str], None] = 'b6e2d8f4a1c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BINARY_UUID = sa.BINARY(16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'utilization_rollups',
+        sa.Column('entity_type', sa.String(length=10), nullable=False),
+        sa.Column('entity_id', BINARY_UUID, nullable=False),
+        sa.Column('period_type', sa.String(length=10), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('assigned_days', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('entity_type', 'entity_id', 'period_type', 'period_start')
+    )
+    op.create_index(
+        'ix_utilization_rollups_period', 'utilization_rollups',
+        ['entity_type', 'period_type', 'period_start', 'entity_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_utilization_rollups_period', table_name='utilization_rollups')
+    op.drop_table('utilization_rollups')
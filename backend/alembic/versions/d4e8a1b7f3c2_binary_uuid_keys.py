@@ -0,0 +1,109 @@
+"""store uuid keys as 16-byte binary
+
+Revision ID: d4e8a1b7f3c2
+Revises: c7d2f4a9e813
+Create Date: 2026-10-17 14:22:51.803317
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8a1b7f3c2'
+down_revision: Union[str, Sequence[str], None] = 'c7d2f4a9e813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, original type) for every uuid-valued column
+UUID_COLUMNS = [
+    ('drivers', 'id', sa.CHAR(36)),
+    ('trucks', 'id', sa.String(36)),
+    ('assignments', 'id', sa.CHAR(36)),
+    ('assignments', 'driver_id', sa.CHAR(36)),
+    ('assignments', 'truck_id', sa.CHAR(36)),
+    ('error_logs', 'id', sa.CHAR(36)),
+]
+
+FOREIGN_KEYS = [
+    ('assignments', 'driver_id', 'drivers'),
+    ('assignments', 'truck_id', 'trucks'),
+]
+
+TEXT_FROM_BINARY = (
+    "LOWER(INSERT(INSERT(INSERT(INSERT(HEX({column}), 9, 0, '-'), 14, 0, '-'), 19, 0, '-'), 24, 0, '-'))"
+)
+
+BATCH_SIZE = 1000
+
+
+def _drop_foreign_keys(bind) -> None:
+    for fk in sa.inspect(bind).get_foreign_keys('assignments'):
+        if fk['referred_table'] in ('drivers', 'trucks') and fk.get('name'):
+            op.drop_constraint(fk['name'], 'assignments', type_='foreignkey')
+
+
+def _create_foreign_keys() -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        op.create_foreign_key(f'fk_{table}_{column}', table, referred, [column], ['id'])
+
+
+def _rewrite_values(bind, table: str, column: str, convert) -> None:
+    """Batched value rewrite for dialects without UNHEX/HEX (SQLite)."""
+    values = [row[0] for row in bind.execute(sa.text(f"SELECT DISTINCT {column} FROM {table}"))]
+    statement = sa.text(f"UPDATE {table} SET {column} = :new WHERE {column} = :old")
+    for start in range(0, len(values), BATCH_SIZE):
+        params = [{'new': convert(value), 'old': value} for value in values[start:start + BATCH_SIZE] if value is not None]
+        if params:
+            bind.execute(statement, params)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'mysql':
+        # CHAR -> VARBINARY keeps the ascii bytes, so the UPDATE can UNHEX in place
+        # and every index and primary key stays attached to its column.
+        _drop_foreign_keys(bind)
+        for table, column, _ in UUID_COLUMNS:
+            op.execute(f"ALTER TABLE {table} MODIFY {column} VARBINARY(36) NOT NULL")
+            op.execute(f"UPDATE {table} SET {column} = UNHEX(REPLACE({column}, '-', ''))")
+            op.execute(f"ALTER TABLE {table} MODIFY {column} BINARY(16) NOT NULL")
+        _create_foreign_keys()
+    elif dialect == 'postgresql':
+        _drop_foreign_keys(bind)
+        for table, column, _ in UUID_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING {column}::uuid")
+        _create_foreign_keys()
+    else:
+        # SQLite does not enforce declared column types (and a batch copy would CAST
+        # the blobs to NUMERIC), so only the stored values are rewritten.
+        for table, column, _ in UUID_COLUMNS:
+            _rewrite_values(bind, table, column, lambda value: uuid.UUID(value).bytes)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'mysql':
+        _drop_foreign_keys(bind)
+        for table, column, original in UUID_COLUMNS:
+            op.execute(f"ALTER TABLE {table} MODIFY {column} VARBINARY(36) NOT NULL")
+            op.execute(f"UPDATE {table} SET {column} = {TEXT_FROM_BINARY.format(column=column)}")
+            op.alter_column(table, column, existing_type=sa.VARBINARY(36), type_=original, existing_nullable=False)
+        _create_foreign_keys()
+    elif dialect == 'postgresql':
+        _drop_foreign_keys(bind)
+        for table, column, original in UUID_COLUMNS:
+            op.alter_column(table, column, type_=original, postgresql_using=f"{column}::text")
+        _create_foreign_keys()
+    else:
+        for table, column, _ in UUID_COLUMNS:
+            _rewrite_values(bind, table, column, lambda value: str(uuid.UUID(bytes=value)))
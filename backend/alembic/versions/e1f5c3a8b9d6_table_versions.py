@@ -0,0 +1,38 @@
+"""per-table version counters for etags
+
+Revision ID: e1f5c3a8b9d6
+Revises: d4e8a1b7f3c2
+Create Date: 2026-10-17 15:05:37.264418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f5c3a8b9d6'
+down_revision: Union[str, Sequence[str], None] = 'd4e8a1b7f3c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table_versions, [
+        {'name': 'drivers', 'version': 1},
+        {'name': 'trucks', 'version': 1},
+        {'name': 'assignments', 'version': 1},
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
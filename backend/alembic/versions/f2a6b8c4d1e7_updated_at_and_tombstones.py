@@ -0,0 +1,55 @@
+"""updated_at columns and tombstones for delta sync
+
+Revision ID: f2a6b8c4d1e7
+Revises: e1f5c3a8b9d6
+Create Date: 2026-10-17 15:48:12.590734
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6b8c4d1e7'
+down_revision: Union[str, Sequence[str], None] = 'e1f5c3a8b9d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRECISE_DATETIME = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+BINARY_UUID = sa.BINARY(16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+TABLES = ('drivers', 'trucks', 'assignments')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', PRECISE_DATETIME, nullable=True))
+        op.execute(sa.text(f"UPDATE {table} SET updated_at = :now").bindparams(now=now))
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=PRECISE_DATETIME, nullable=False)
+        op.create_index(op.f(f'ix_{table}_updated_at'), table, ['updated_at'], unique=False)
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', BINARY_UUID, nullable=False),
+        sa.Column('deleted_at', PRECISE_DATETIME, nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tombstones_deleted_at'), 'tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tombstones_deleted_at'), table_name='tombstones')
+    op.drop_table('tombstones')
+    for table in reversed(TABLES):
+        op.drop_index(op.f(f'ix_{table}_updated_at'), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,67 @@
+"""
+Synthetic fleet generator shared by the benchmarks.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from services.matching import match_by_license
+
+LICENSE_TYPES = ["A", "B", "C", "D", "E"]
+INSERT_CHUNK = 5000
+
+
+def synthetic_fleet(drivers: int, trucks: int, seed: int = 42):
+    """
+    Random driver and truck license ranks: `(drivers, trucks)` dicts of id -> rank (1-5).
+    """
+    rng = random.Random(seed)
+    return (
+        {str(uuid.UUID(int=rng.getrandbits(128))): rng.randint(1, 5) for _ in range(drivers)},
+        {str(uuid.UUID(int=rng.getrandbits(128))): rng.randint(1, 5) for _ in range(trucks)},
+    )
+
+
+def seed_fleet(db, drivers: int, trucks: int, days: int, start: date, fill: float = 0.7, seed: int = 42):
+    """
+    Insert a synthetic fleet and `days` days of assignments starting at `start`.
+
+    Returns the `(drivers, trucks)` rank dicts so scenarios can pick valid pairs.
+    """
+    from models.models import Assignment, Driver, Truck
+    from services.rollups import rebuild_rollups
+    from utils.etag import bump_versions
+
+    rng = random.Random(seed)
+    driver_ranks, truck_ranks = synthetic_fleet(drivers, trucks, seed)
+
+    db.execute(insert(Driver), [
+        {"id": driver_id, "name": f"Driver {index}", "license_type": LICENSE_TYPES[rank - 1], "license_rank": rank}
+        for index, (driver_id, rank) in enumerate(driver_ranks.items())
+    ])
+    db.execute(insert(Truck), [
+        {"id": truck_id, "plate": f"BNC-{index:07d}", "min_license_type": LICENSE_TYPES[rank - 1], "min_license_rank": rank}
+        for index, (truck_id, rank) in enumerate(truck_ranks.items())
+    ])
+
+    # The same matching shuffled per day keeps seeding fast for years of history
+    pairs = match_by_license(list(truck_ranks.items()), list(driver_ranks.items()))
+    rows = []
+    for offset in range(days):
+        rng.shuffle(pairs)
+        day = start + timedelta(days=offset)
+        rows.extend(
+            {"id": str(uuid.UUID(int=rng.getrandbits(128))), "driver_id": driver_id, "truck_id": truck_id, "date": day}
+            for driver_id, truck_id in pairs[:int(len(pairs) * fill)]
+        )
+        if len(rows) >= INSERT_CHUNK:
+            db.execute(insert(Assignment), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Assignment), rows)
+    bump_versions(db, "drivers", "trucks", "assignments")
+    db.commit()
+    rebuild_rollups(db)
+    return driver_ranks, truck_ranks
@@ -0,0 +1,174 @@
+"""
+Load benchmark: seed a synthetic fleet and drive the real FastAPI app.
+
+    python -m benchmarks.load --drivers 2000 --trucks 1500 --years 1 --concurrency 1,8,32
+
+Runs against a throwaway SQLite file unless --database-url is given, and prints
+(or writes to --output) one JSON document with throughput, latency percentiles
+and SQL statements per request for every scenario and concurrency level.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, requests, concurrency):
+    """
+    Send `requests` (a list of `(method, url, kwargs)`) with at most `concurrency` in flight.
+    """
+    from utils.query_audit import audit_queries
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def send(method, url, kwargs):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            return response
+
+    with audit_queries() as audit:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(send(*request) for request in requests))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(requests) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "queries_per_request": round(audit.count / len(requests), 2),
+    }
+    return result, responses
+
+
+async def run(args):
+    import httpx
+    from database import SessionLocal, engine
+    from main import app
+    from benchmarks.fleet import seed_fleet
+    from services.matching import match_by_license
+    from models import models
+
+    models.Base.metadata.create_all(engine)
+    history_start = date(2020, 1, 1)
+    history_days = int(args.years * 365)
+    db = SessionLocal()
+    started = time.perf_counter()
+    drivers, trucks = seed_fleet(db, args.drivers, args.trucks, history_days, history_start, args.fill, args.seed)
+    db.close()
+    seed_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed)
+    truck_ids = list(trucks)
+    future = history_start + timedelta(days=history_days + 30)
+    # Conflict-free new assignments: one license-valid matching per future day
+    pairs = match_by_license(list(trucks.items()), list(drivers.items()))
+
+    def new_assignments(count, first_day):
+        payloads = []
+        day = first_day
+        while len(payloads) < count:
+            rng.shuffle(pairs)
+            payloads.extend(
+                {"driver_id": driver_id, "truck_id": truck_id, "date": day.isoformat()}
+                for driver_id, truck_id in pairs[:count - len(payloads)]
+            )
+            day += timedelta(days=1)
+        return payloads
+
+    report = {
+        "fleet": {"drivers": args.drivers, "trucks": args.trucks, "history_days": history_days, "fill": args.fill},
+        "seed_seconds": round(seed_seconds, 2),
+        "scenarios": {"create": [], "list": [], "availability": [], "update": []},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for level, concurrency in enumerate(args.concurrency):
+            first_day = future + timedelta(days=level * 400)
+            create = [("POST", "/api/assignments/", {"json": payload}) for payload in new_assignments(args.requests, first_day)]
+            result, responses = await run_scenario(client, create, concurrency)
+            report["scenarios"]["create"].append(result)
+
+            listing = []
+            for _ in range(args.requests):
+                day = history_start + timedelta(days=rng.randrange(max(history_days, 1)))
+                listing.append(("GET", "/api/assignments/", {"params": {
+                    "date_from": day.isoformat(), "date_to": (day + timedelta(days=6)).isoformat(), "limit": 100
+                }}))
+            report["scenarios"]["list"].append((await run_scenario(client, listing, concurrency))[0])
+
+            availability = []
+            for _ in range(args.requests):
+                day = history_start + timedelta(days=rng.randrange(max(history_days, 1)))
+                availability.append(("GET", f"/api/trucks/{rng.choice(truck_ids)}/availability", {"params": {"date": day.isoformat()}}))
+            report["scenarios"]["availability"].append((await run_scenario(client, availability, concurrency))[0])
+
+            # Move every created assignment 200 days later; the shift keeps them conflict-free
+            update = []
+            for response in responses:
+                if response.status_code == 200:
+                    created = response.json()
+                    moved = date.fromisoformat(created["date"]) + timedelta(days=200)
+                    update.append(("PUT", f"/api/assignments/{created['id']}", {"json": {
+                        "driver_id": created["driver_id"], "truck_id": created["truck_id"], "date": moved.isoformat()
+                    }}))
+            if update:
+                report["scenarios"]["update"].append((await run_scenario(client, update, concurrency))[0])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Database to benchmark (default: a temporary SQLite file)")
+    parser.add_argument("--drivers", type=int, default=1000)
+    parser.add_argument("--trucks", type=int, default=800)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--fill", type=float, default=0.7, help="Share of trucks assigned on each seeded day")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+
+    # config.py reads DATABASE_URL at import time, so it must be set before the app is imported
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
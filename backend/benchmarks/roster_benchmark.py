@@ -0,0 +1,87 @@
+"""
+Benchmark the multi-day roster planner on a synthetic fleet.
+
+    python -m benchmarks.roster_benchmark --drivers 5000 --trucks 4500 --days 30 [--persist]
+
+Prints one JSON object with the timing and the plan statistics. With --persist, the
+fleet is also seeded into a database (a temporary SQLite file unless --database-url
+is given) and POST /api/roster/plan with dry_run=false is timed end to end: planning,
+the inserts, the rollups and the commit.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.fleet import synthetic_fleet
+from services.roster import plan_roster
+
+
+def time_persisted_plan(args, start: date, end: date):
+    """
+    Seconds taken by a saved roster request over a freshly seeded fleet, and its response.
+    """
+    from fastapi.testclient import TestClient
+    from database import SessionLocal, engine
+    from main import app
+    from benchmarks.fleet import seed_fleet
+    from models import models
+
+    models.Base.metadata.create_all(engine)
+    db = SessionLocal()
+    seed_fleet(db, args.drivers, args.trucks, 0, start, seed=args.seed)
+    db.close()
+
+    client = TestClient(app)
+    started = time.perf_counter()
+    response = client.post("/api/roster/plan", json={"start": start.isoformat(), "end": end.isoformat(), "dry_run": False})
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    return elapsed, response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=5000)
+    parser.add_argument("--trucks", type=int, default=4500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--persist", action="store_true", help="Also time the saved (dry_run=false) roster request")
+    parser.add_argument("--database-url", help="Database for --persist (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    drivers, trucks = synthetic_fleet(args.drivers, args.trucks, args.seed)
+    start = date(2025, 1, 1)
+    end = start + timedelta(days=args.days - 1)
+
+    started = time.perf_counter()
+    planned, stats = plan_roster(start, end, drivers, trucks, existing=[])
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "benchmark": "roster_plan",
+        "drivers": args.drivers,
+        "trucks": args.trucks,
+        "days": args.days,
+        "seconds": round(elapsed, 3),
+        "assignments_per_second": round(len(planned) / elapsed) if elapsed else None,
+        **stats
+    }
+
+    if args.persist:
+        # config.py reads DATABASE_URL at import time, so it must be set before the app is imported
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/roster_benchmark.db"
+        persist_seconds, response = time_persisted_plan(args, start, end)
+        result.update({
+            "persist_seconds": round(persist_seconds, 3),
+            "persisted_assignments_per_second": round(response["created"] / persist_seconds) if persist_seconds else None,
+            "created": response["created"]
+        })
+
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark encoding assignment list responses: per-row dicts validated against
+the response model and JSON-encoded (the generic path) versus result rows
+written straight to JSON bytes (`utils.serialization.rows_response`).
+
+    python -m benchmarks.serialization_benchmark --rows 100000
+
+Seeds a throwaway in-memory SQLite database, fetches the joined rows once and
+prints one JSON object with the best-of-N timing of each path.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The app's engine is never used; rows come from a private in-memory database
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    from benchmarks.fleet import seed_fleet
+    from database import Base
+    from routes.assignments import assignment_details_query
+    from schemas.schemas import AssignmentResponseSchema
+    from utils.serialization import orjson, rows_response
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    fleet = 2000
+    seed_fleet(db, fleet, fleet, days=args.rows // fleet + 1, start=date(2025, 1, 1), fill=1.0)
+    rows = assignment_details_query(db).limit(args.rows).all()
+    adapter = TypeAdapter(list[AssignmentResponseSchema])
+
+    def generic():
+        content = [
+            {
+                "id": row.id,
+                "driver_id": row.driver_id,
+                "driver_name": row.driver_name,
+                "driver_license_type": row.driver_license_type,
+                "truck_id": row.truck_id,
+                "truck_plate": row.truck_plate,
+                "date": row.date
+            }
+            for row in rows
+        ]
+        validated = adapter.validate_python(content)
+        return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+    def pydantic_dump():
+        content = [row._asdict() for row in rows]
+        return adapter.dump_json(adapter.validate_python(content))
+
+    def fast():
+        return rows_response(rows, Response()).body
+
+    generic_seconds, generic_body = best_of(args.repeat, generic)
+    pydantic_seconds, pydantic_body = best_of(args.repeat, pydantic_dump)
+    fast_seconds, fast_body = best_of(args.repeat, fast)
+    assert json.loads(fast_body) == json.loads(generic_body) == json.loads(pydantic_body)
+
+    print(json.dumps({
+        "benchmark": "assignment_serialization",
+        "rows": len(rows),
+        "encoder": "orjson" if orjson is not None else "json",
+        "bytes": len(fast_body),
+        "generic_seconds": round(generic_seconds, 4),
+        "pydantic_dump_json_seconds": round(pydantic_seconds, 4),
+        "fast_seconds": round(fast_seconds, 4),
+        "speedup_vs_generic": round(generic_seconds / fast_seconds, 1),
+        "speedup_vs_pydantic_dump_json": round(pydantic_seconds / fast_seconds, 1)
+    }))
+
+
+if __name__ == "__main__":
+    main()
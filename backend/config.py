@@ -4,3 +4,56 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Async mode: serve the CRUD routes through an AsyncSession (e.g. sqlite+aiosqlite:///./app.db)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# In-process cache of driver and truck rows. Writes only invalidate the cache of the worker
+# that made them, so with several workers the others can keep using an updated or deleted
+# driver or truck (e.g. its old license) for up to CACHE_TTL_SECONDS. Lower it, or set it to 0
+# to disable the cache, when that window matters more than the saved lookups.
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+# Background writer for ErrorLog rows
+ERROR_LOG_QUEUE_SIZE = int(os.getenv("ERROR_LOG_QUEUE_SIZE", "1000"))
+ERROR_LOG_BATCH_SIZE = int(os.getenv("ERROR_LOG_BATCH_SIZE", "100"))
+
+# Development/CI query auditing: log N+1 patterns and slow statements per request
+QUERY_AUDIT = os.getenv("QUERY_AUDIT", "false").lower() in ("1", "true", "yes")
+QUERY_AUDIT_SLOW_MS = float(os.getenv("QUERY_AUDIT_SLOW_MS", "100"))
+QUERY_AUDIT_REPEAT_THRESHOLD = int(os.getenv("QUERY_AUDIT_REPEAT_THRESHOLD", "5"))
+
+# Optional in-memory occupancy index: day bitmaps of every driver and truck over a
+# window around today, reloaded daily. It only sees writes made by its own process,
+# so enable it only when the API runs as a single worker.
+OCCUPANCY_INDEX = os.getenv("OCCUPANCY_INDEX", "false").lower() in ("1", "true", "yes")
+OCCUPANCY_PAST_DAYS = int(os.getenv("OCCUPANCY_PAST_DAYS", "31"))
+OCCUPANCY_FUTURE_DAYS = int(os.getenv("OCCUPANCY_FUTURE_DAYS", "366"))
+
+# Live change feed (Server-Sent Events): events kept for resuming and keep-alive interval
+EVENTS_HISTORY_SIZE = int(os.getenv("EVENTS_HISTORY_SIZE", "10000"))
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# Delta sync: re-send changes this close to the client's cursor (commit-order and clock
+# skew margin), and keep tombstones of deleted rows for this many days
+SYNC_OVERLAP_SECONDS = float(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# Idempotency-Key support on assignment writes: "memory" (per process) or "database"
+# (shared by all workers). Successful responses are replayed for this many seconds.
+IDEMPOTENCY_STORE = os.getenv("IDEMPOTENCY_STORE", "memory").lower()
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+
+# Optional read replicas (comma-separated URLs). Read-only endpoints are spread over them
+# round-robin; a client that wrote within READ_YOUR_WRITES_SECONDS reads from the primary.
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+ASYNC_REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("ASYNC_REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Hot/archive split of assignments: once a day, assignments older than this many days move
+# to the assignments_archive table and become read-only. 0 keeps everything in the hot table.
+ASSIGNMENT_HOT_DAYS = int(os.getenv("ASSIGNMENT_HOT_DAYS", "0"))
@@ -1,23 +1,120 @@
+import itertools
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+from config import (
+    DATABASE_URL, DB_ASYNC, ASYNC_DATABASE_URL,
+    REPLICA_DATABASE_URLS, ASYNC_REPLICA_DATABASE_URLS, READ_YOUR_WRITES_SECONDS
+)
+from utils.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
+from utils.query_audit import install_query_audit
 
 engine = create_engine(
     DATABASE_URL,
+    poolclass=TimedQueuePool,
     pool_size=10,         
     max_overflow=20,      
     pool_recycle=1800,   
     pool_pre_ping=True  
 )
+instrument_engine(engine, "primary")
+install_query_audit(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas; their sessions are marked so that lagging rows are not cached
+replica_engines = [
+    create_engine(url, poolclass=TimedQueuePool, pool_size=10, max_overflow=20, pool_recycle=1800, pool_pre_ping=True)
+    for url in REPLICA_DATABASE_URLS
+]
+ReplicaSessionLocals = []
+for number, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica_{number}")
+    install_query_audit(replica_engine)
+    ReplicaSessionLocals.append(sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True}))
+
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+AsyncReplicaSessionLocals = []
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    instrument_engine(async_engine.sync_engine, "async_primary")
+    install_query_audit(async_engine.sync_engine)
+
+    for number, url in enumerate(ASYNC_REPLICA_DATABASE_URLS):
+        replica_engine = create_async_engine(
+            url, poolclass=TimedAsyncAdaptedQueuePool, pool_size=10, max_overflow=20, pool_recycle=1800, pool_pre_ping=True
+        )
+        instrument_engine(replica_engine.sync_engine, f"async_replica_{number}")
+        install_query_audit(replica_engine.sync_engine)
+        AsyncReplicaSessionLocals.append(
+            async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False, info={"replica": True})
+        )
+
+# Set on responses to successful writes; while it is fresh, reads go to the primary
+LAST_WRITE_COOKIE = "last_write"
+_replica_turn = itertools.count()
+
+def has_replicas():
+    return bool(ReplicaSessionLocals or AsyncReplicaSessionLocals)
+
+def is_replica(db):
+    return bool(db.info.get("replica"))
+
+def wrote_recently(request: Request):
+    """
+    Whether the client made a successful write less than READ_YOUR_WRITES_SECONDS ago.
+    """
+    try:
+        written_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - written_at < READ_YOUR_WRITES_SECONDS
+
+def pick_session_factory(request: Request, primary, replicas):
+    if not replicas or wrote_recently(request):
+        return primary
+    return replicas[next(_replica_turn) % len(replicas)]
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def read_session_factory(request: Request):
+    """
+    Session factory for a read-only handler: the next replica in round-robin order,
+    or the primary when there are no replicas or the client wrote recently.
+    """
+    return pick_session_factory(request, SessionLocal, ReplicaSessionLocals)
+
+def get_read_db(request: Request):
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    async with pick_session_factory(request, AsyncSessionLocal, AsyncReplicaSessionLocals)() as db:
+        yield db
@@ -1,11 +1,43 @@
-from fastapi import FastAPI
-from routes import drivers, trucks, assignments
-from middlewares.middlewares import log_exceptions_middleware
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI
+from config import ASSIGNMENT_HOT_DAYS, DB_ASYNC, OCCUPANCY_INDEX, QUERY_AUDIT
+from database import has_replicas
+from routes import drivers, trucks, assignments, availability, cache, events, reports, roster, sync
+from middlewares.middlewares import log_exceptions_middleware, metrics_middleware, query_audit_middleware, read_your_writes_middleware
+from middlewares.error_logger import error_log_writer
+from services.archive import archive_assignments_daily
+from services.idempotency import prune_idempotency_keys_hourly
+from services.occupancy import load_occupancy, roll_occupancy_window
+from services.sync import prune_tombstones_daily
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from utils.metrics import render_metrics
 
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    error_log_writer.start()
+    tombstone_pruner = asyncio.create_task(prune_tombstones_daily())
+    idempotency_pruner = asyncio.create_task(prune_idempotency_keys_hourly())
+    if ASSIGNMENT_HOT_DAYS > 0:
+        archiver = asyncio.create_task(archive_assignments_daily())
+    if OCCUPANCY_INDEX:
+        await asyncio.to_thread(load_occupancy)
+        occupancy_roller = asyncio.create_task(roll_occupancy_window())
+    yield
+    if OCCUPANCY_INDEX:
+        occupancy_roller.cancel()
+    if ASSIGNMENT_HOT_DAYS > 0:
+        archiver.cancel()
+    idempotency_pruner.cancel()
+    tombstone_pruner.cancel()
+    # Flush queued error logs before the process exits
+    await error_log_writer.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Truck Management API",
     description="API to manage trucks and drivers assignments",
     version="1.0.0",
@@ -25,15 +57,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"],  
+    expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
 )
 
 
 app.middleware("http")(log_exceptions_middleware)
+app.middleware("http")(metrics_middleware)
+if QUERY_AUDIT:
+    app.middleware("http")(query_audit_middleware)
+if has_replicas():
+    app.middleware("http")(read_your_writes_middleware)
+def without_routes(router: APIRouter, served: set):
+    """
+    Copy of `router` without the (path, method) pairs already in `served`.
+    """
+    remaining = APIRouter()
+    remaining.routes.extend(
+        route for route in router.routes
+        if not any((route.path, method) in served for method in route.methods)
+    )
+    return remaining
+
 # app routes
-app.include_router(drivers.router, prefix="/api")
-app.include_router(trucks.router, prefix="/api")
-app.include_router(assignments.router, prefix="/api")
+sync_routers = [drivers.router, trucks.router, assignments.router]
+if DB_ASYNC:
+    from routes import drivers_async, trucks_async, assignments_async
+
+    async_routers = [drivers_async.router, trucks_async.router, assignments_async.router]
+    served = {(route.path, method) for router in async_routers for route in router.routes for method in route.methods}
+    # Endpoints without an async version (bulk, export) keep the sync session. They are
+    # registered first so that static paths win over the async `/{id}` routes.
+    sync_routers = [without_routes(router, served) for router in sync_routers] + async_routers
+
+for router in sync_routers:
+    app.include_router(router, prefix="/api")
+app.include_router(availability.router, prefix="/api")
+app.include_router(cache.router, prefix="/api")
+app.include_router(roster.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(sync.router, prefix="/api")
+app.include_router(reports.router, prefix="/api")
 
 @app.get("/")
 def root():
     return {"message": "API is running!"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
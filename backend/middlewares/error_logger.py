@@ -0,0 +1,115 @@
+import asyncio
+import logging
+
+from sqlalchemy import insert
+
+from config import ERROR_LOG_BATCH_SIZE, ERROR_LOG_QUEUE_SIZE
+from database import SessionLocal
+from models.models import ErrorLog
+
+logger = logging.getLogger(__name__)
+
+# Pause after a failed write so a broken database is not retried in a tight loop
+FAILURE_BACKOFF_SECONDS = 5
+SHUTDOWN_FLUSH_SECONDS = 5
+
+
+def insert_error_logs(entries):
+    """
+    Insert a batch of error entries with one multi-row insert (runs in a worker thread).
+    """
+    db = SessionLocal()
+    try:
+        db.execute(insert(ErrorLog), entries)
+        db.commit()
+    finally:
+        db.close()
+
+
+class ErrorLogWriter:
+    """
+    Collects error entries in a bounded queue that a background task writes in batches.
+
+    `submit` never blocks the request: when the queue is full the entry is
+    dropped and counted. Database writes run in a thread, one batch at a time,
+    so a slow or failing database cannot stall the event loop.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._queue = None
+        self._task = None
+        self._loop = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = loop.create_task(self._run())
+
+    def submit(self, entry: dict):
+        self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _take_batch(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch):
+        try:
+            await asyncio.to_thread(insert_error_logs, batch)
+            self.written += len(batch)
+            return True
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Could not write %d error log entries", len(batch))
+            return False
+
+    async def _run(self):
+        while True:
+            batch = self._take_batch(await self._queue.get())
+            written = await self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if not written:
+                await asyncio.sleep(FAILURE_BACKOFF_SECONDS)
+
+    async def stop(self):
+        """
+        Give the background task a few seconds to write what is still queued, then stop it.
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=SHUTDOWN_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            self.dropped += self._queue.qsize()
+            logger.warning("Dropped %d error log entries at shutdown", self._queue.qsize())
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+error_log_writer = ErrorLogWriter(ERROR_LOG_QUEUE_SIZE, ERROR_LOG_BATCH_SIZE)
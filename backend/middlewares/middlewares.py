@@ -1,26 +1,98 @@
 from fastapi import Request, FastAPI
+import logging
+import math
+import time
 import traceback
 
 from fastapi.responses import JSONResponse
-from database import SessionLocal
-from models.models import ErrorLog
+from config import READ_YOUR_WRITES_SECONDS
+from database import LAST_WRITE_COOKIE
+from middlewares.error_logger import error_log_writer
+from utils.query_audit import QueryAudit, current_audit
+from utils.metrics import REQUEST_LATENCY, REQUEST_SQL_TIME, REQUEST_STATEMENTS, REQUESTS_IN_FLIGHT, request_sql_stats
 from datetime import datetime
 
 app = FastAPI()
+logger = logging.getLogger(__name__)
 
 @app.middleware("http")
 async def log_exceptions_middleware(request: Request, call_next):
     try:
         return await call_next(request)
     except Exception as e:
-        db = SessionLocal()
-        error_entry = ErrorLog(
-            timestamp=datetime.utcnow(),
-            error_message=str(e),
-            stack_trace=str(traceback.format_exc()),
-            endpoint=request.url.path
-        )
-        db.add(error_entry)
-        db.commit()
-        db.close()
+        # Queued for the background writer; never touches the database on the request path
+        error_log_writer.submit({
+            "timestamp": datetime.utcnow(),
+            "error_message": str(e)[:1024],
+            "stack_trace": str(traceback.format_exc())[-2048:],
+            "endpoint": request.url.path[:255]
+        })
         return JSONResponse(status_code=500, content={"message": "Internal Server Error"})
+
+def route_template(request: Request):
+    """
+    Template of the route that served the request, or "unmatched". FastAPI may put the
+    route of an included router in the scope without the prefix it was included with;
+    the prefix is then the part of the path before the route pattern matches.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    path = request.scope["path"]
+    for start, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[start:]):
+            return path[:start] + route.path
+    return route.path
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    stats = [0, 0.0]
+    token = request_sql_stats.set(stats)
+    REQUESTS_IN_FLIGHT.add(1)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        REQUESTS_IN_FLIGHT.add(-1)
+        request_sql_stats.reset(token)
+        # Label by route template (e.g. /api/assignments/{id}) to keep cardinality bounded
+        path = route_template(request)
+        REQUEST_LATENCY.observe(elapsed, request.method, path, status)
+        REQUEST_STATEMENTS.observe(stats[0], request.method, path)
+        REQUEST_SQL_TIME.observe(stats[1], request.method, path)
+
+async def query_audit_middleware(request: Request, call_next):
+    """
+    Enabled with QUERY_AUDIT: logs N+1 patterns and slow statements of each request
+    and reports the statement count in the `X-Query-Count` header.
+    """
+    audit = QueryAudit()
+    token = current_audit.set(audit)
+    try:
+        response = await call_next(request)
+    finally:
+        current_audit.reset(token)
+    if audit.repeated() or audit.slow():
+        logger.warning("Query audit for %s %s:\n%s", request.method, request.url.path, audit.report())
+    response.headers["X-Query-Count"] = str(audit.count)
+    return response
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """
+    Enabled with read replicas: marks clients that just wrote successfully, so their
+    reads go to the primary until the replicas have caught up.
+    """
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+            samesite="lax"
+        )
+    return response
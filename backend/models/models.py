@@ -1,39 +1,121 @@
-from sqlalchemy import Column, String, Enum, Date, ForeignKey
-from sqlalchemy.dialects.mysql import CHAR
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, String, Enum, Date, ForeignKey, Index, Integer, LargeBinary, SmallInteger
+from sqlalchemy.orm import relationship, validates
+from datetime import datetime, timezone
 import uuid
 from database import Base
+from models.types import BinaryUUID, PreciseDateTime
+
+# License tiers in increasing order; a driver may drive trucks requiring a rank up to their own
+LICENSE_RANKS = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5}
+
+def utcnow():
+    """Naive UTC timestamp, as stored in the updated_at and deleted_at columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 class Driver(Base):
     __tablename__ = "drivers"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
-    license_type = Column(Enum("A", "B", "C", "D", "E", name="license_enum"), nullable=False)
+    license_type = Column(Enum("A", "B", "C", "D", "E", name="license_enum"), nullable=False, index=True)
+    license_rank = Column(SmallInteger, nullable=False, index=True)
+    updated_at = Column(PreciseDateTime, nullable=False, default=utcnow, onupdate=utcnow, index=True)
+
+    @validates("license_type")
+    def _set_license_rank(self, key, value):
+        self.license_rank = LICENSE_RANKS.get(value)
+        return value
 
 class Truck(Base):
     __tablename__ = "trucks"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(BinaryUUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     plate = Column(String(50), unique=True, nullable=False)
-    min_license_type = Column(Enum("A", "B", "C", "D", "E", name="license_enum"), nullable=False)
+    min_license_type = Column(Enum("A", "B", "C", "D", "E", name="license_enum"), nullable=False, index=True)
+    min_license_rank = Column(SmallInteger, nullable=False, index=True)
+    updated_at = Column(PreciseDateTime, nullable=False, default=utcnow, onupdate=utcnow, index=True)
+
+    @validates("min_license_type")
+    def _set_min_license_rank(self, key, value):
+        self.min_license_rank = LICENSE_RANKS.get(value)
+        return value
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("uq_assignments_driver_date", "driver_id", "date", unique=True),
+        Index("uq_assignments_truck_date", "truck_id", "date", unique=True),
+        Index("ix_assignments_date_id", "date", "id"),
+    )
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    driver_id = Column(CHAR(36), ForeignKey("drivers.id"), nullable=False)
-    truck_id = Column(CHAR(36), ForeignKey("trucks.id"), nullable=False)
+    id = Column(BinaryUUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    driver_id = Column(BinaryUUID, ForeignKey("drivers.id"), nullable=False)
+    truck_id = Column(BinaryUUID, ForeignKey("trucks.id"), nullable=False)
     date = Column(Date, nullable=False)
+    updated_at = Column(PreciseDateTime, nullable=False, default=utcnow, onupdate=utcnow, index=True)
 
     driver = relationship("Driver")
     truck = relationship("Truck")
 
+class ArchivedAssignment(Base):
+    __tablename__ = "assignments_archive"
+    __table_args__ = (
+        Index("ix_assignments_archive_date_id", "date", "id"),
+        Index("ix_assignments_archive_driver_date", "driver_id", "date"),
+        Index("ix_assignments_archive_truck_date", "truck_id", "date"),
+    )
+
+    # Assignments older than the hot horizon, moved here by services/archive.py; read-only
+    id = Column(BinaryUUID, primary_key=True)
+    driver_id = Column(BinaryUUID, ForeignKey("drivers.id"), nullable=False)
+    truck_id = Column(BinaryUUID, ForeignKey("trucks.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    updated_at = Column(PreciseDateTime, nullable=False, index=True)
+
 class ErrorLog(Base):
     __tablename__ = "error_logs"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     timestamp = Column(Date, nullable=False)
     error_message = Column(String(1024), nullable=False)
     stack_trace = Column(String(2048), nullable=False)
     endpoint = Column(String(255), nullable=False)
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    # Bumped by every write to the named table; list and detail ETags are derived from it
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+
+    # Hard-deleted drivers, trucks and assignments, reported by the delta sync endpoint
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(BinaryUUID, nullable=False)
+    deleted_at = Column(PreciseDateTime, nullable=False, default=utcnow, index=True)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # Stored results of writes sent with an Idempotency-Key header; status_code is NULL while in progress
+    key_hash = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(SmallInteger, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(PreciseDateTime, nullable=False, index=True)
+
+class UtilizationRollup(Base):
+    __tablename__ = "utilization_rollups"
+    __table_args__ = (
+        Index("ix_utilization_rollups_period", "entity_type", "period_type", "period_start", "entity_id"),
+    )
+
+    # Days assigned per driver or truck and week or month, kept current by every assignment write
+    entity_type = Column(String(10), primary_key=True)
+    entity_id = Column(BinaryUUID, primary_key=True)
+    period_type = Column(String(10), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    assigned_days = Column(Integer, nullable=False, default=0)
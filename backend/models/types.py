@@ -0,0 +1,52 @@
+import uuid
+
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.types import BINARY, DateTime, TypeDecorator
+
+# DATETIME keeps microseconds on MySQL, which otherwise truncates to whole seconds
+PreciseDateTime = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def canonical_uuid(value):
+    """
+    The canonical lowercase, hyphenated form of a UUID written any valid way, as
+    `BinaryUUID` returns it, or None when `value` is not a UUID.
+    """
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    UUID stored in 16 bytes (BINARY(16), or the native uuid type on PostgreSQL)
+    and exposed to Python as the canonical 36-character string.
+
+    Values that are not valid UUIDs bind as NULL, so looking up a malformed id
+    simply finds nothing instead of raising.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            value = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        except ValueError:
+            return None
+        return str(value) if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return str(uuid.UUID(bytes=value))
+        return str(value)
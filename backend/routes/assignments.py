@@ -1,15 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, insert, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from database import get_db
-from models.models import Assignment, Driver, Truck
-from schemas.schemas import AssignmentCreateSchema, AssignmentResponseSchema
+from database import get_db, get_read_db, read_session_factory
+from models.models import ArchivedAssignment, Assignment, Driver, Tombstone, Truck
+from models.types import canonical_uuid
+from schemas.schemas import AssignmentCreateSchema, AssignmentResponseSchema, AssignmentBulkResponseSchema, AutoAssignResponseSchema
+from services.archive import archived_assignment_error, archived_detail, assignment_tables, ensure_writable, hot_horizon
+from services.matching import match_by_license
+from services.events import broadcaster
+from services.idempotency import run_idempotent
+from services.occupancy import occupancy
+from services.rollups import apply_rollups
+from utils.cache import get_driver_row, get_driver_rows, get_truck_row, get_truck_rows
+from utils.etag import bump_versions, check_table_versions
+from utils.pagination import MAX_PAGE_SIZE, fetch_merged_page, fetch_page
+from utils.serialization import rows_response
+from datetime import date
+from typing import Literal, Optional
+import csv
+import heapq
+import io
+import json
 import uuid
 
 router = APIRouter()
 
+MAX_BULK_ASSIGNMENTS = 5000
+EXPORT_BATCH_SIZE = 1000
+# Assignment responses embed driver names and truck plates, so their ETags follow all three tables
+ASSIGNMENT_TABLES = ("assignments", "drivers", "trucks")
+EXPORT_COLUMNS = ["id", "driver_id", "driver_name", "driver_license_type", "truck_id", "truck_plate", "date"]
+
+
+def conflict_detail(error: IntegrityError):
+    """
+    Map a violation of the per-day unique indexes to the API's conflict message.
+    Returns None for any other integrity error.
+    """
+    message = str(error.orig)
+    if "uq_assignments_truck_date" in message or "assignments.truck_id" in message:
+        return "Truck is already assigned to another driver on this date"
+    if "uq_assignments_driver_date" in message or "assignments.driver_id" in message:
+        return "Driver is already assigned to another truck on this date"
+    return None
+
+
+def commit_or_conflict(db: Session, added=(), removed=(), inserted=()):
+    """
+    Commit the session, turning a double booking into a 400 response.
+    `added` and `removed` are the `(driver_id, truck_id, date)` bookings changed, applied
+    to the utilization rollups. `inserted` are assignment rows to bulk insert first, inside
+    the guard, so a slot taken concurrently after the pre-checks is a conflict as well;
+    they are added to the rollups too. Rollups and the assignments version are updated
+    after the flush so their row locks are held briefly.
+    """
+    added = list(added) + [(row["driver_id"], row["truck_id"], row["date"]) for row in inserted]
+    try:
+        if inserted:
+            db.execute(insert(Assignment), inserted)
+        db.flush()
+        apply_rollups(db, added, removed)
+        bump_versions(db, "assignments")
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        detail = conflict_detail(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
+
+def occupancy_conflict(driver_id: str, truck_id: str, day: date, current=None):
+    """
+    Conflict message for a double booking already known to the occupancy index, or None.
+    `current` is the `(driver_id, truck_id, date)` of an assignment being updated, whose
+    own slots do not count. Unknown days pass; the unique indexes stay the guarantee.
+    """
+    def own_slot(position, entity_id):
+        return current is not None and current[2] == day and str(current[position]).lower() == str(entity_id).lower()
+
+    if occupancy.truck_booked(truck_id, day) and not own_slot(1, truck_id):
+        return "Truck is already assigned to another driver on this date"
+    if occupancy.driver_booked(driver_id, day) and not own_slot(0, driver_id):
+        return "Driver is already assigned to another truck on this date"
+    return None
+
 # 📌 Create a new assignment
 @router.post("/assignments/", response_model=AssignmentResponseSchema, summary="Create a new assignment")
-def create_assignment(assignment: AssignmentCreateSchema, db: Session = Depends(get_db)):
+def create_assignment(
+    assignment: AssignmentCreateSchema,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db)
+):
     """
     📌 **Create a new assignment between a driver and a truck**
     
@@ -22,10 +105,17 @@ def create_assignment(assignment: AssignmentCreateSchema, db: Session = Depends(
     - A driver **cannot be assigned to more than one truck on the same day**.
     - A truck **cannot be assigned to more than one driver on the same day**.
     
+    🔁 **Retries**: send an `Idempotency-Key` header to make the request safe to retry;
+    a repeated key replays the first successful response.
+
     **Returns**: The details of the newly created assignment.
     """
-    driver = db.query(Driver).filter(Driver.id == assignment.driver_id).first()
-    truck = db.query(Truck).filter(Truck.id == assignment.truck_id).first()
+    return run_idempotent(idempotency_key, "POST /assignments/", assignment, lambda: insert_assignment(assignment, db))
+
+def insert_assignment(assignment: AssignmentCreateSchema, db: Session):
+    ensure_writable(assignment.date)
+    driver = get_driver_row(db, assignment.driver_id)
+    truck = get_truck_row(db, assignment.truck_id)
 
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
@@ -33,26 +123,14 @@ def create_assignment(assignment: AssignmentCreateSchema, db: Session = Depends(
         raise HTTPException(status_code=404, detail="Truck not found")
 
     # Validate driver's license
-    license_order = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5}
-    if license_order[driver.license_type] < license_order[truck.min_license_type]:
+    if driver.license_rank < truck.min_license_rank:
         raise HTTPException(status_code=400, detail="Driver does not have the required license type")
 
-    # Ensure no conflicts
-    existing_assignment = db.query(Assignment).filter(
-        Assignment.driver_id == assignment.driver_id,
-        Assignment.date == assignment.date
-    ).first()
-    if existing_assignment:
-        raise HTTPException(status_code=400, detail="Driver is already assigned to another truck on this date")
-
-    existing_truck_assignment = db.query(Assignment).filter(
-        Assignment.truck_id == assignment.truck_id,
-        Assignment.date == assignment.date
-    ).first()
-    if existing_truck_assignment:
-        raise HTTPException(status_code=400, detail="Truck is already assigned to another driver on this date")
-
-    # Create the assignment
+    detail = occupancy_conflict(assignment.driver_id, assignment.truck_id, assignment.date)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
+
+    # Create the assignment; the unique indexes reject double bookings
     new_assignment = Assignment(
         id=str(uuid.uuid4()), 
         driver_id=assignment.driver_id, 
@@ -60,11 +138,9 @@ def create_assignment(assignment: AssignmentCreateSchema, db: Session = Depends(
         date=assignment.date
     )
     db.add(new_assignment)
-    db.commit()
-    db.refresh(new_assignment)
 
-    # Return detailed response with driver & truck info
-    return {
+    # Detailed response with driver & truck info, built before the commit expires them
+    response = {
         "id": new_assignment.id,
         "driver_id": driver.id,
         "driver_name": driver.name,
@@ -73,68 +149,344 @@ def create_assignment(assignment: AssignmentCreateSchema, db: Session = Depends(
         "truck_plate": truck.plate,
         "date": new_assignment.date
     }
+    commit_or_conflict(db, added=[(driver.id, truck.id, assignment.date)])
+    occupancy.add(driver.id, truck.id, assignment.date)
+    broadcaster.publish("assignment", "created", response)
+    return response
 
-# 📌 Get all assignments including driver name and truck plate
-@router.get("/assignments/", response_model=list[AssignmentResponseSchema], summary="List all assignments with driver and truck details")
-def get_assignments(db: Session = Depends(get_db)):
+# 📌 Create many assignments in a single transaction
+@router.post("/assignments/bulk", response_model=AssignmentBulkResponseSchema, summary="Create assignments in bulk")
+def create_assignments_bulk(assignments: list[AssignmentCreateSchema], db: Session = Depends(get_db)):
     """
-    📋 **Retrieve all assignments, including driver name, license type, truck plate**
-    
-    **Returns**: A list of all assignments.
+    📦 **Create many assignments at once**
+
+    Accepts a list of assignments with the same fields as `POST /assignments/`.
+    Drivers, trucks and existing conflicts are loaded with one query each, and
+    every valid item is inserted in a single multi-row insert and transaction.
+
+    🚨 **Business Rules** (checked against the database and within the batch):
+    - The driver must have the required license to operate the truck.
+    - A driver **cannot be assigned to more than one truck on the same day**.
+    - A truck **cannot be assigned to more than one driver on the same day**.
+
+    **Returns**: One result per submitted item, in the same order.
+    """
+    if len(assignments) > MAX_BULK_ASSIGNMENTS:
+        raise HTTPException(status_code=413, detail=f"A batch cannot contain more than {MAX_BULK_ASSIGNMENTS} assignments")
+    if not assignments:
+        return {"created": 0, "failed": 0, "results": []}
+
+    # Ids in canonical form, as loaded rows and booked sets hold them; None if malformed
+    items = [(canonical_uuid(item.driver_id), canonical_uuid(item.truck_id), item.date) for item in assignments]
+    driver_ids = {driver_id for driver_id, _, _ in items} - {None}
+    truck_ids = {truck_id for _, truck_id, _ in items} - {None}
+    dates = {day for _, _, day in items}
+
+    drivers = get_driver_rows(db, driver_ids)
+    trucks = get_truck_rows(db, truck_ids)
+
+    # Every (driver, date) and (truck, date) already booked for the dates in this batch
+    booked_drivers = set()
+    booked_trucks = set()
+    existing = db.query(Assignment.driver_id, Assignment.truck_id, Assignment.date).filter(
+        Assignment.date.in_(dates),
+        or_(Assignment.driver_id.in_(driver_ids), Assignment.truck_id.in_(truck_ids))
+    )
+    for row in existing:
+        booked_drivers.add((row.driver_id, row.date))
+        booked_trucks.add((row.truck_id, row.date))
+
+    results = []
+    rows = []
+    for index, (driver_id, truck_id, day) in enumerate(items):
+        driver = drivers.get(driver_id)
+        truck = trucks.get(truck_id)
+
+        if not driver:
+            detail = "Driver not found"
+        elif not truck:
+            detail = "Truck not found"
+        elif driver.license_rank < truck.min_license_rank:
+            detail = "Driver does not have the required license type"
+        elif archived_detail(day):
+            detail = archived_detail(day)
+        elif (driver_id, day) in booked_drivers:
+            detail = "Driver is already assigned to another truck on this date"
+        elif (truck_id, day) in booked_trucks:
+            detail = "Truck is already assigned to another driver on this date"
+        else:
+            detail = None
+
+        if detail:
+            results.append({"index": index, "status": "error", "detail": detail, "assignment": None})
+            continue
+
+        # Later items in the batch conflict with the ones accepted before them
+        booked_drivers.add((driver_id, day))
+        booked_trucks.add((truck_id, day))
+
+        row = {"id": str(uuid.uuid4()), "driver_id": driver_id, "truck_id": truck_id, "date": day}
+        rows.append(row)
+        results.append({
+            "index": index,
+            "status": "created",
+            "detail": None,
+            "assignment": {
+                "id": row["id"],
+                "driver_id": driver.id,
+                "driver_name": driver.name,
+                "driver_license_type": driver.license_type,
+                "truck_id": truck.id,
+                "truck_plate": truck.plate,
+                "date": day
+            }
+        })
+
+    if rows:
+        commit_or_conflict(db, inserted=rows)
+        occupancy.add_rows(rows)
+        broadcaster.publish_many("assignment", "created", (result["assignment"] for result in results if result["assignment"]))
+
+    return {"created": len(rows), "failed": len(results) - len(rows), "results": results}
+
+# 📌 Automatically pair free drivers and trucks for a day
+@router.post("/assignments/auto", response_model=AutoAssignResponseSchema, summary="Automatically assign free drivers to free trucks")
+def auto_assign(date: date, dry_run: bool = False, db: Session = Depends(get_db)):
     """
-    assignments = (
+    🤖 **Assign as many free trucks as possible for a given date**
+
+    - **date**: Day to plan  
+    - **dry_run**: When true, return the proposed assignments without saving them  
+
+    Drivers and trucks already assigned on that date are left out. The remaining
+    ones are paired with a maximum matching that respects the license rule, and
+    the result is saved in a single transaction.
+
+    **Returns**: The proposed or created assignments and what is left unassigned.
+    """
+    ensure_writable(date)
+    free_drivers = db.query(Driver.id, Driver.name, Driver.license_type, Driver.license_rank).filter(
+        ~exists().where(Assignment.driver_id == Driver.id, Assignment.date == date)
+    ).all()
+    free_trucks = db.query(Truck.id, Truck.plate, Truck.min_license_rank).filter(
+        ~exists().where(Assignment.truck_id == Truck.id, Assignment.date == date)
+    ).all()
+
+    pairs = match_by_license(
+        [(truck.id, truck.min_license_rank) for truck in free_trucks],
+        [(driver.id, driver.license_rank) for driver in free_drivers]
+    )
+
+    drivers = {driver.id: driver for driver in free_drivers}
+    trucks = {truck.id: truck for truck in free_trucks}
+    rows = [
+        {"id": str(uuid.uuid4()), "driver_id": driver_id, "truck_id": truck_id, "date": date}
+        for driver_id, truck_id in pairs
+    ]
+
+    proposed = [
+        {
+            "id": row["id"],
+            "driver_id": row["driver_id"],
+            "driver_name": drivers[row["driver_id"]].name,
+            "driver_license_type": drivers[row["driver_id"]].license_type,
+            "truck_id": row["truck_id"],
+            "truck_plate": trucks[row["truck_id"]].plate,
+            "date": date
+        }
+        for row in rows
+    ]
+
+    if rows and not dry_run:
+        commit_or_conflict(db, inserted=rows)
+        occupancy.add_rows(rows)
+        broadcaster.publish_many("assignment", "created", proposed)
+
+    return {
+        "date": date,
+        "dry_run": dry_run,
+        "created": 0 if dry_run else len(rows),
+        "unassigned_drivers": len(free_drivers) - len(rows),
+        "unassigned_trucks": len(free_trucks) - len(rows),
+        "assignments": proposed
+    }
+
+def assignment_details_query(db: Session, table=Assignment):
+    """
+    Assignments joined with their driver's name and license and their truck's plate.
+    `table` is `Assignment` or `ArchivedAssignment`.
+    """
+    return (
         db.query(
-            Assignment.id,
-            Assignment.driver_id,
+            table.id,
+            table.driver_id,
             Driver.name.label("driver_name"),
             Driver.license_type.label("driver_license_type"),
-            Assignment.truck_id,
+            table.truck_id,
             Truck.plate.label("truck_plate"),
-            Assignment.date
+            table.date
         )
-        .join(Driver, Assignment.driver_id == Driver.id)
-        .join(Truck, Assignment.truck_id == Truck.id)
-        .all()
+        .join(Driver, table.driver_id == Driver.id)
+        .join(Truck, table.truck_id == Truck.id)
     )
 
-    return [
-        {
-            "id": assignment.id,
-            "driver_id": assignment.driver_id,
-            "driver_name": assignment.driver_name,
-            "driver_license_type": assignment.driver_license_type,
-            "truck_id": assignment.truck_id,
-            "truck_plate": assignment.truck_plate,
-            "date": assignment.date
-        }
-        for assignment in assignments
-    ]
+def filter_assignments(query, date_from=None, date_to=None, driver_id=None, truck_id=None, license_type=None, table=Assignment):
+    """
+    Apply the optional list filters shared by the assignment read endpoints.
+    """
+    if date_from:
+        query = query.filter(table.date >= date_from)
+    if date_to:
+        query = query.filter(table.date <= date_to)
+    if driver_id:
+        query = query.filter(table.driver_id == driver_id)
+    if truck_id:
+        query = query.filter(table.truck_id == truck_id)
+    if license_type:
+        query = query.filter(Driver.license_type == license_type)
+    return query
+
+def fetch_assignment_page(db: Session, filters: tuple, cursor, limit, response: Response):
+    """
+    Joined assignment rows matching `filters`, paged by date and id. Ranges starting
+    before the hot horizon also read the archive; otherwise only the hot table is used.
+    """
+    tables = assignment_tables(filters[0])
+    queries = [filter_assignments(assignment_details_query(db, table), *filters, table=table) for table in tables]
+    if len(queries) == 1:
+        return fetch_page(queries[0], [Assignment.date, Assignment.id], cursor, limit, response)
+    return fetch_merged_page(queries, [[table.date, table.id] for table in tables], cursor, limit, response)
+
+# 📌 Get all assignments including driver name and truck plate
+@router.get("/assignments/", response_model=list[AssignmentResponseSchema], summary="List all assignments with driver and truck details")
+def get_assignments(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    driver_id: Optional[str] = None,
+    truck_id: Optional[str] = None,
+    license_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """
+    📋 **Retrieve assignments, including driver name, license type, truck plate**
+
+    - **date_from** / **date_to**: Only assignments within this date range (inclusive)  
+    - **driver_id** / **truck_id**: Only assignments of this driver or truck  
+    - **license_type**: Only assignments whose driver holds this license type  
+    - **limit**: Page size; when omitted every matching assignment is returned  
+    - **cursor**: Value of the `X-Next-Cursor` header from the previous page  
+
+    Assignments are ordered by date and id. Responses carry an `ETag`; sending it back
+    in `If-None-Match` returns **304 Not Modified** without running the query while nothing changed.
+    When archival is enabled, only ranges starting before the hot horizon read the archive.
+    
+    **Returns**: A list of assignments.
+    """
+    not_modified = check_table_versions(db, request, response, *ASSIGNMENT_TABLES)
+    if not_modified:
+        return not_modified
+
+    filters = (date_from, date_to, driver_id, truck_id, license_type)
+    assignments = fetch_assignment_page(db, filters, cursor, limit, response)
+
+    # The joined rows already have the response's shape; encode them directly
+    return rows_response(assignments, response)
+
+# 📌 Export assignments as a stream
+@router.get("/assignments/export", summary="Export assignments as CSV or NDJSON")
+def export_assignments(
+    format: Literal["csv", "ndjson"] = "csv",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    driver_id: Optional[str] = None,
+    truck_id: Optional[str] = None,
+    license_type: Optional[str] = None,
+    session_factory=Depends(read_session_factory)
+):
+    """
+    📤 **Stream assignments, including driver name, license type, truck plate**
+
+    - **format**: `csv` (default) or `ndjson`  
+    - **date_from** / **date_to**, **driver_id** / **truck_id**, **license_type**: Same filters as `GET /assignments/`  
+
+    Rows are read from a server-side cursor and written out in batches, so
+    memory use does not depend on the number of exported assignments.
+
+    **Returns**: The matching assignments ordered by date and id.
+    """
+    filters = (date_from, date_to, driver_id, truck_id, license_type)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_assignments(format, filters, session_factory),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="assignments.{format}"'}
+    )
+
+def stream_assignments(format: str, filters: tuple, session_factory):
+    """
+    Yield the export in chunks of `EXPORT_BATCH_SIZE` rows.
+
+    The session is owned by the generator because the response body is
+    produced after the request's dependencies have been cleaned up.
+    """
+    tables = assignment_tables(filters[0])
+    # One session per table: each streams from its own server-side cursor
+    sessions = [session_factory() for _ in tables]
+    try:
+        queries = [
+            filter_assignments(assignment_details_query(db, table), *filters, table=table)
+            .order_by(table.date, table.id)
+            .yield_per(EXPORT_BATCH_SIZE)
+            for db, table in zip(sessions, tables)
+        ]
+        query = queries[0] if len(queries) == 1 else heapq.merge(*queries, key=lambda row: (row.date, row.id))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        for count, row in enumerate(query, start=1):
+            values = [row.date.isoformat() if column == "date" else getattr(row, column) for column in EXPORT_COLUMNS]
+            if format == "csv":
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))) + "\n")
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        for db in sessions:
+            db.close()
 
 # 📌 Get a specific assignment by ID with driver name and truck plate
 @router.get("/assignments/{id}", response_model=AssignmentResponseSchema, summary="Retrieve an assignment with driver and truck details")
-def get_assignment(id: str, db: Session = Depends(get_db)):
+def get_assignment(id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """
     🔍 **Retrieve a specific assignment, including driver name, license type, truck plate**
     
     - **id**: The unique identifier of the assignment  
     
-    **Returns**: The assignment details if found.
+    **Returns**: The assignment details if found, with an `ETag` for conditional requests.
     """
-    assignment = (
-        db.query(
-            Assignment.id,
-            Assignment.driver_id,
-            Driver.name.label("driver_name"),
-            Driver.license_type.label("driver_license_type"),
-            Assignment.truck_id,
-            Truck.plate.label("truck_plate"),
-            Assignment.date
-        )
-        .join(Driver, Assignment.driver_id == Driver.id)
-        .join(Truck, Assignment.truck_id == Truck.id)
-        .filter(Assignment.id == id)
-        .first()
-    )
+    not_modified = check_table_versions(db, request, response, *ASSIGNMENT_TABLES)
+    if not_modified:
+        return not_modified
+
+    for table in assignment_tables():
+        assignment = assignment_details_query(db, table).filter(table.id == id).first()
+        if assignment:
+            break
 
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
@@ -150,7 +502,12 @@ def get_assignment(id: str, db: Session = Depends(get_db)):
     }
 # 📌 Update an existing assignment
 @router.put("/assignments/{id}", response_model=AssignmentResponseSchema, summary="Update an existing assignment")
-def update_assignment(id: str, updated_data: AssignmentCreateSchema, db: Session = Depends(get_db)):
+def update_assignment(
+    id: str,
+    updated_data: AssignmentCreateSchema,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db)
+):
     """
     ✏️ **Update an existing assignment**
     
@@ -163,15 +520,24 @@ def update_assignment(id: str, updated_data: AssignmentCreateSchema, db: Session
     - A driver **cannot be assigned to more than one truck on the same day**.
     - A truck **cannot be assigned to more than one driver on the same day**.
     
+    🔁 **Retries**: accepts an `Idempotency-Key` header, like `POST /assignments/`.
+
     **Returns**: The updated assignment details, including driver and truck info.
     """
+    return run_idempotent(idempotency_key, f"PUT /assignments/{id}", updated_data, lambda: replace_assignment(id, updated_data, db))
+
+def replace_assignment(id: str, updated_data: AssignmentCreateSchema, db: Session):
     assignment = db.query(Assignment).filter(Assignment.id == id).first()
     if not assignment:
+        if hot_horizon() is not None and db.get(ArchivedAssignment, id):
+            raise archived_assignment_error()
         raise HTTPException(status_code=404, detail="Assignment not found")
+    ensure_writable(assignment.date)
+    ensure_writable(updated_data.date)
 
     # Validate the new driver and truck
-    driver = db.query(Driver).filter(Driver.id == updated_data.driver_id).first()
-    truck = db.query(Truck).filter(Truck.id == updated_data.truck_id).first()
+    driver = get_driver_row(db, updated_data.driver_id)
+    truck = get_truck_row(db, updated_data.truck_id)
 
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
@@ -179,36 +545,21 @@ def update_assignment(id: str, updated_data: AssignmentCreateSchema, db: Session
         raise HTTPException(status_code=404, detail="Truck not found")
 
     # Validate driver's license
-    license_order = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5}
-    if license_order[driver.license_type] < license_order[truck.min_license_type]:
+    if driver.license_rank < truck.min_license_rank:
         raise HTTPException(status_code=400, detail="Driver does not have the required license type")
 
-    # Ensure no conflicts with other assignments
-    existing_assignment = db.query(Assignment).filter(
-        Assignment.driver_id == updated_data.driver_id,
-        Assignment.date == updated_data.date,
-        Assignment.id != id
-    ).first()
-    if existing_assignment:
-        raise HTTPException(status_code=400, detail="Driver is already assigned to another truck on this date")
-
-    existing_truck_assignment = db.query(Assignment).filter(
-        Assignment.truck_id == updated_data.truck_id,
-        Assignment.date == updated_data.date,
-        Assignment.id != id
-    ).first()
-    if existing_truck_assignment:
-        raise HTTPException(status_code=400, detail="Truck is already assigned to another driver on this date")
-
-    # ✅ Update the assignment
+    current = (assignment.driver_id, assignment.truck_id, assignment.date)
+    detail = occupancy_conflict(updated_data.driver_id, updated_data.truck_id, updated_data.date, current)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
+
+    # ✅ Update the assignment; the unique indexes reject double bookings
     assignment.driver_id = updated_data.driver_id
     assignment.truck_id = updated_data.truck_id
     assignment.date = updated_data.date
-    db.commit()
-    db.refresh(assignment)
 
     # ✅ Return the updated assignment with full details
-    return {
+    response = {
         "id": assignment.id,
         "driver_id": driver.id,
         "driver_name": driver.name,
@@ -217,6 +568,11 @@ def update_assignment(id: str, updated_data: AssignmentCreateSchema, db: Session
         "truck_plate": truck.plate,
         "date": assignment.date
     }
+    commit_or_conflict(db, added=[(driver.id, truck.id, updated_data.date)], removed=[current])
+    occupancy.remove(*current)
+    occupancy.add(driver.id, truck.id, updated_data.date)
+    broadcaster.publish("assignment", "updated", {**response, "previous_date": current[2]})
+    return response
 
 # 📌 Delete an assignment
 @router.delete("/assignments/{id}", summary="Delete an assignment")
@@ -230,20 +586,33 @@ def delete_assignment(id: str, db: Session = Depends(get_db)):
     """
     assignment = db.query(Assignment).filter(Assignment.id == id).first()
     if not assignment:
+        if hot_horizon() is not None and db.get(ArchivedAssignment, id):
+            raise archived_assignment_error()
         raise HTTPException(status_code=404, detail="Assignment not found")
+    ensure_writable(assignment.date)
 
+    assignment_id = assignment.id
+    booked = (assignment.driver_id, assignment.truck_id, assignment.date)
     db.delete(assignment)
+    db.add(Tombstone(entity_type="assignment", entity_id=assignment_id))
+    apply_rollups(db, removed=[booked])
+    bump_versions(db, "assignments")
     db.commit()
+    occupancy.remove(*booked)
+    broadcaster.publish("assignment", "deleted", {"id": assignment_id, "driver_id": booked[0], "truck_id": booked[1], "date": booked[2]})
     return {"message": "Assignment deleted successfully"}
 
 @router.get("/trucks/{truck_id}/availability")
-def check_truck_availability(truck_id: str, date: str, db: Session = Depends(get_db)):
+def check_truck_availability(truck_id: str, date: date, db: Session = Depends(get_read_db)):
     """
     Verify if truck is avaliable for a specific date
     """
-    existing_assignment = db.query(Assignment).filter(
-        Assignment.truck_id == truck_id,
-        Assignment.date == date
-    ).first()
+    booked = occupancy.truck_booked(truck_id, date)
+    if booked is not None:
+        return {"available": not booked}
 
-    return {"available": existing_assignment is None}
\ No newline at end of file
+    booked = any(
+        db.query(exists().where(table.truck_id == truck_id, table.date == date)).scalar()
+        for table in assignment_tables(date)
+    )
+    return {"available": not booked}
\ No newline at end of file
@@ -0,0 +1,239 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from inspect import cleandoc
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_async_read_db
+from models.models import ArchivedAssignment, Assignment, Driver, Tombstone, Truck
+from routes import assignments
+from routes.assignments import ASSIGNMENT_TABLES, conflict_detail, filter_assignments, occupancy_conflict
+from schemas.schemas import AssignmentCreateSchema, AssignmentResponseSchema
+from services.archive import archived_assignment_error, assignment_tables, ensure_writable, hot_horizon
+from services.events import broadcaster
+from services.idempotency import run_idempotent_async
+from services.occupancy import occupancy
+from services.rollups import apply_rollups_async
+from utils.cache import get_driver_row_async, get_truck_row_async
+from utils.etag import bump_versions_async, check_table_versions_async
+from utils.pagination import MAX_PAGE_SIZE, fetch_merged_page_async, fetch_page_async
+from utils.serialization import rows_response
+from datetime import date
+from typing import Optional
+import uuid
+
+# Async versions of the handlers in routes/assignments.py, served when DB_ASYNC is enabled
+router = APIRouter()
+
+
+def assignment_details_select(table=Assignment):
+    """
+    Assignments joined with their driver's name and license and their truck's plate.
+    `table` is `Assignment` or `ArchivedAssignment`.
+    """
+    return (
+        select(
+            table.id,
+            table.driver_id,
+            Driver.name.label("driver_name"),
+            Driver.license_type.label("driver_license_type"),
+            table.truck_id,
+            Truck.plate.label("truck_plate"),
+            table.date
+        )
+        .join(Driver, table.driver_id == Driver.id)
+        .join(Truck, table.truck_id == Truck.id)
+    )
+
+
+async def commit_or_conflict(db: AsyncSession, added=(), removed=()):
+    """
+    Commit the session, turning a double booking into a 400 response.
+    `added` and `removed` are applied to the utilization rollups, as in routes/assignments.py.
+    """
+    try:
+        await db.flush()
+        await apply_rollups_async(db, added, removed)
+        await bump_versions_async(db, "assignments")
+        await db.commit()
+    except IntegrityError as error:
+        await db.rollback()
+        detail = conflict_detail(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
+
+
+async def load_driver_and_truck(db: AsyncSession, data: AssignmentCreateSchema):
+    """
+    Fetch the driver and truck of an assignment and check the license rule.
+    """
+    driver = await get_driver_row_async(db, data.driver_id)
+    truck = await get_truck_row_async(db, data.truck_id)
+
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    if not truck:
+        raise HTTPException(status_code=404, detail="Truck not found")
+
+    if driver.license_rank < truck.min_license_rank:
+        raise HTTPException(status_code=400, detail="Driver does not have the required license type")
+    return driver, truck
+
+# 📌 Create a new assignment
+@router.post("/assignments/", response_model=AssignmentResponseSchema, summary="Create a new assignment", description=cleandoc(assignments.create_assignment.__doc__))
+async def create_assignment(
+    assignment: AssignmentCreateSchema,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await run_idempotent_async(idempotency_key, "POST /assignments/", assignment, lambda: insert_assignment(assignment, db))
+
+async def insert_assignment(assignment: AssignmentCreateSchema, db: AsyncSession):
+    ensure_writable(assignment.date)
+    driver, truck = await load_driver_and_truck(db, assignment)
+    detail = occupancy_conflict(assignment.driver_id, assignment.truck_id, assignment.date)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
+
+    new_assignment = Assignment(
+        id=str(uuid.uuid4()),
+        driver_id=assignment.driver_id,
+        truck_id=assignment.truck_id,
+        date=assignment.date
+    )
+    db.add(new_assignment)
+    await commit_or_conflict(db, added=[(driver.id, truck.id, assignment.date)])
+    occupancy.add(driver.id, truck.id, assignment.date)
+
+    response = {
+        "id": new_assignment.id,
+        "driver_id": driver.id,
+        "driver_name": driver.name,
+        "driver_license_type": driver.license_type,
+        "truck_id": truck.id,
+        "truck_plate": truck.plate,
+        "date": new_assignment.date
+    }
+    broadcaster.publish("assignment", "created", response)
+    return response
+
+# 📌 Get all assignments including driver name and truck plate
+@router.get("/assignments/", response_model=list[AssignmentResponseSchema], summary="List all assignments with driver and truck details", description=cleandoc(assignments.get_assignments.__doc__))
+async def get_assignments(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    driver_id: Optional[str] = None,
+    truck_id: Optional[str] = None,
+    license_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    not_modified = await check_table_versions_async(db, request, response, *ASSIGNMENT_TABLES)
+    if not_modified:
+        return not_modified
+
+    filters = (date_from, date_to, driver_id, truck_id, license_type)
+    tables = assignment_tables(date_from)
+    statements = [filter_assignments(assignment_details_select(table), *filters, table=table) for table in tables]
+    if len(statements) == 1:
+        rows = await fetch_page_async(db, statements[0], [Assignment.date, Assignment.id], cursor, limit, response)
+    else:
+        rows = await fetch_merged_page_async(db, statements, [[table.date, table.id] for table in tables], cursor, limit, response)
+    return rows_response(rows, response)
+
+# 📌 Get a specific assignment by ID with driver name and truck plate
+@router.get("/assignments/{id}", response_model=AssignmentResponseSchema, summary="Retrieve an assignment with driver and truck details", description=cleandoc(assignments.get_assignment.__doc__))
+async def get_assignment(id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    not_modified = await check_table_versions_async(db, request, response, *ASSIGNMENT_TABLES)
+    if not_modified:
+        return not_modified
+
+    for table in assignment_tables():
+        assignment = (await db.execute(assignment_details_select(table).filter(table.id == id))).first()
+        if assignment:
+            break
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    return assignment._asdict()
+
+# 📌 Update an existing assignment
+@router.put("/assignments/{id}", response_model=AssignmentResponseSchema, summary="Update an existing assignment", description=cleandoc(assignments.update_assignment.__doc__))
+async def update_assignment(
+    id: str,
+    updated_data: AssignmentCreateSchema,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await run_idempotent_async(idempotency_key, f"PUT /assignments/{id}", updated_data, lambda: replace_assignment(id, updated_data, db))
+
+async def replace_assignment(id: str, updated_data: AssignmentCreateSchema, db: AsyncSession):
+    assignment = await db.get(Assignment, id)
+    if not assignment:
+        if hot_horizon() is not None and await db.get(ArchivedAssignment, id):
+            raise archived_assignment_error()
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    ensure_writable(assignment.date)
+
+    ensure_writable(updated_data.date)
+    driver, truck = await load_driver_and_truck(db, updated_data)
+    current = (assignment.driver_id, assignment.truck_id, assignment.date)
+    detail = occupancy_conflict(updated_data.driver_id, updated_data.truck_id, updated_data.date, current)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
+
+    assignment.driver_id = updated_data.driver_id
+    assignment.truck_id = updated_data.truck_id
+    assignment.date = updated_data.date
+    await commit_or_conflict(db, added=[(driver.id, truck.id, updated_data.date)], removed=[current])
+    occupancy.remove(*current)
+    occupancy.add(driver.id, truck.id, updated_data.date)
+
+    response = {
+        "id": assignment.id,
+        "driver_id": driver.id,
+        "driver_name": driver.name,
+        "driver_license_type": driver.license_type,
+        "truck_id": truck.id,
+        "truck_plate": truck.plate,
+        "date": assignment.date
+    }
+    broadcaster.publish("assignment", "updated", {**response, "previous_date": current[2]})
+    return response
+
+# 📌 Delete an assignment
+@router.delete("/assignments/{id}", summary="Delete an assignment", description=cleandoc(assignments.delete_assignment.__doc__))
+async def delete_assignment(id: str, db: AsyncSession = Depends(get_async_db)):
+    assignment = await db.get(Assignment, id)
+    if not assignment:
+        if hot_horizon() is not None and await db.get(ArchivedAssignment, id):
+            raise archived_assignment_error()
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    ensure_writable(assignment.date)
+
+    assignment_id = assignment.id
+    booked = (assignment.driver_id, assignment.truck_id, assignment.date)
+    await db.delete(assignment)
+    db.add(Tombstone(entity_type="assignment", entity_id=assignment_id))
+    await apply_rollups_async(db, removed=[booked])
+    await bump_versions_async(db, "assignments")
+    await db.commit()
+    occupancy.remove(*booked)
+    broadcaster.publish("assignment", "deleted", {"id": assignment_id, "driver_id": booked[0], "truck_id": booked[1], "date": booked[2]})
+    return {"message": "Assignment deleted successfully"}
+
+@router.get("/trucks/{truck_id}/availability", description=cleandoc(assignments.check_truck_availability.__doc__))
+async def check_truck_availability(truck_id: str, date: date, db: AsyncSession = Depends(get_async_read_db)):
+    booked = occupancy.truck_booked(truck_id, date)
+    if booked is not None:
+        return {"available": not booked}
+
+    for table in assignment_tables(date):
+        existing_assignment = await db.scalar(
+            select(table.id).filter(table.truck_id == truck_id, table.date == date).limit(1)
+        )
+        if existing_assignment is not None:
+            return {"available": False}
+    return {"available": True}
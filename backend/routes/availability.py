@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from database import get_read_db
+from models.models import LICENSE_RANKS, Driver, Truck
+from schemas.schemas import FleetAvailabilitySchema
+from services.archive import assignment_tables
+from services.availability import day_offsets, free_bitmap, free_bitmap_from_bits, free_ranges
+from services.occupancy import occupancy
+from datetime import date
+from itertools import chain
+from typing import Literal, Optional
+
+router = APIRouter()
+
+MAX_AVAILABILITY_DAYS = 366
+
+
+def bookings_by_entity(rows):
+    """
+    Group `(entity columns..., booked date)` outer-join rows by entity.
+    Entities without bookings in the range come back with a single NULL date.
+    """
+    entities = {}
+    for row in rows:
+        *entity, booked = row
+        entities.setdefault(tuple(entity), []).append(booked)
+    return entities
+
+# 📌 Availability of the whole fleet over a date range
+@router.get("/availability/", response_model=FleetAvailabilitySchema, summary="Free days of every truck and driver in a date range")
+def get_fleet_availability(
+    start: date,
+    end: date,
+    license_type: Optional[Literal["A", "B", "C", "D", "E"]] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    🗓️ **Which trucks and drivers are free on each day of a date range**
+
+    - **start** / **end**: First and last day of the range (inclusive, at most 366 days)  
+    - **license_type**: Only trucks a driver with this license may drive and drivers allowed to drive its trucks  
+
+    Each entity has a `free` bitmap with one character per day from `start`
+    ("1" free, "0" assigned) and the same information as `free_ranges`.
+    Trucks and drivers are each loaded with a single outer join on the range (plus one
+    on the archive for ranges before the hot horizon), or
+    without touching the assignments when the occupancy index covers the range.
+
+    **Returns**: The range and the availability of every matching truck and driver.
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if days > MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"The range cannot exceed {MAX_AVAILABILITY_DAYS} days")
+
+    truck_query = db.query(Truck.id, Truck.plate, Truck.min_license_type).order_by(Truck.id)
+    driver_query = db.query(Driver.id, Driver.name, Driver.license_type).order_by(Driver.id)
+    if license_type:
+        # Same rank rule as the assignments: a license covers every truck requiring it or a lower one
+        rank = LICENSE_RANKS[license_type]
+        truck_query = truck_query.filter(Truck.min_license_rank <= rank)
+        driver_query = driver_query.filter(Driver.license_rank >= rank)
+
+    if occupancy.covers(start, end):
+        # Booked days come from the in-memory occupancy index; only the entities are read
+        truck_bitmaps = [
+            (tuple(truck), free_bitmap_from_bits(occupancy.truck_days(truck.id, start, days), days))
+            for truck in truck_query
+        ]
+        driver_bitmaps = [
+            (tuple(driver), free_bitmap_from_bits(occupancy.driver_days(driver.id, start, days), days))
+            for driver in driver_query
+        ]
+    else:
+        # One outer join per table holding the range: the hot one, and the archive for old ranges
+        tables = assignment_tables(start)
+        truck_bookings = bookings_by_entity(chain.from_iterable(
+            truck_query.add_columns(table.date).outerjoin(table, and_(table.truck_id == Truck.id, table.date >= start, table.date <= end))
+            for table in tables
+        ))
+        driver_bookings = bookings_by_entity(chain.from_iterable(
+            driver_query.add_columns(table.date).outerjoin(table, and_(table.driver_id == Driver.id, table.date >= start, table.date <= end))
+            for table in tables
+        ))
+        truck_bitmaps = [
+            (truck, free_bitmap(day_offsets(filter(None, booked), start, days), days))
+            for truck, booked in truck_bookings.items()
+        ]
+        driver_bitmaps = [
+            (driver, free_bitmap(day_offsets(filter(None, booked), start, days), days))
+            for driver, booked in driver_bookings.items()
+        ]
+
+    trucks = [
+        {
+            "id": truck_id,
+            "plate": plate,
+            "min_license_type": min_license_type,
+            "free": bitmap,
+            "free_ranges": free_ranges(bitmap, start)
+        }
+        for (truck_id, plate, min_license_type), bitmap in truck_bitmaps
+    ]
+    drivers = [
+        {
+            "id": driver_id,
+            "name": name,
+            "license_type": driver_license_type,
+            "free": bitmap,
+            "free_ranges": free_ranges(bitmap, start)
+        }
+        for (driver_id, name, driver_license_type), bitmap in driver_bitmaps
+    ]
+
+    return {"start": start, "end": end, "trucks": trucks, "drivers": drivers}
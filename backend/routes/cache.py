@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from utils.cache import cache_stats
+
+router = APIRouter()
+
+# 📌 Inspect the driver/truck lookup cache
+@router.get("/cache/stats", summary="Driver and truck cache statistics")
+def get_cache_stats():
+    """
+    📊 **Hit/miss counters of the in-process driver and truck cache**
+
+    Counters are per worker process and reset when it restarts.
+
+    **Returns**: Entries, hits and misses for the driver and truck caches.
+    """
+    return cache_stats()
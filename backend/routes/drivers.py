@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
-from database import get_db
-from models.models import Driver
-from schemas.schemas import DriverSchema
+from database import get_db, get_read_db
+from models.models import Driver, Tombstone, Truck
+from schemas.schemas import DriverSchema, ImportResponseSchema
+from services.archive import assignment_tables
+from services.events import broadcaster
+from services.importer import import_drivers_chunk, run_import
+from utils.cache import cache_driver, get_driver_row, invalidate_driver
+from utils.etag import bump_versions, check_content, check_table_versions
+from utils.pagination import MAX_PAGE_SIZE, fetch_page
+from datetime import date
+from typing import Literal, Optional
 import uuid
 
 router = APIRouter()
@@ -23,37 +32,114 @@ def create_driver(driver: DriverSchema, db: Session = Depends(get_db)):
     """
     new_driver = Driver(id=str(uuid.uuid4()), name=driver.name, license_type=driver.license_type)
     db.add(new_driver)
+    bump_versions(db, "drivers")
     db.commit()
     db.refresh(new_driver)
+    broadcaster.publish("driver", "created", cache_driver(new_driver)._asdict())
     return new_driver
 
+# 📌 Import drivers from a CSV or NDJSON file
+@router.post("/drivers/import", response_model=ImportResponseSchema, summary="Import drivers from a CSV or NDJSON file")
+async def import_drivers(request: Request, format: Optional[Literal["csv", "ndjson"]] = None, db: Session = Depends(get_db)):
+    """
+    📥 **Create many drivers from a file sent as the request body**
+
+    - **format**: `csv` or `ndjson`; defaults to NDJSON for JSON content types and CSV otherwise  
+
+    CSV files need a header with `name` and `license_type`; NDJSON files hold one
+    object with those fields per line. The file is parsed while it is received
+    and saved in chunks of 1000 rows, each chunk in its own transaction.
+
+    **Returns**: The number of created and failed rows and the errors by line number
+    (the first 1000 of them).
+
+    🚨 **Error Handling**:
+    - Returns **400 Bad Request** if the CSV header lacks a required column.
+    """
+    format = format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")
+    return await run_import(
+        request.stream(), format, DriverSchema, ("name", "license_type"),
+        lambda chunk, report: import_drivers_chunk(db, chunk, report)
+    )
+
 # 📌 Retrieve all drivers
 @router.get("/drivers/", summary="List all drivers")
-def get_drivers(db: Session = Depends(get_db)):
+def get_drivers(
+    request: Request,
+    response: Response,
+    license_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
     """
     📋 **Retrieve all registered drivers**
     
-    **Returns**: A list containing all drivers stored in the database.
+    - **license_type**: Only drivers holding this license type  
+    - **limit**: Page size; when omitted every matching driver is returned  
+    - **cursor**: Value of the `X-Next-Cursor` header from the previous page  
+
+    **Returns**: A list containing the drivers stored in the database, ordered by id.
+    Responses carry an `ETag`; sending it back in `If-None-Match` returns **304 Not Modified** while nothing changed.
     """
-    return db.query(Driver).all()
+    not_modified = check_table_versions(db, request, response, "drivers")
+    if not_modified:
+        return not_modified
+
+    query = db.query(Driver)
+    if license_type:
+        query = query.filter(Driver.license_type == license_type)
+    return fetch_page(query, [Driver.id], cursor, limit, response)
 
 # 📌 Retrieve a driver by ID
 @router.get("/drivers/{id}", summary="Retrieve a driver by ID")
-def get_driver(id: str, db: Session = Depends(get_db)):
+def get_driver(id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """
     🔍 **Retrieve a specific driver by ID**
     
     - **id**: The unique identifier of the driver  
     
-    **Returns**: The details of the driver if found.
+    **Returns**: The details of the driver if found, with an `ETag` for conditional requests.
     
     🚨 **Error Handling**:
     - Returns **404 Not Found** if the driver does not exist.
     """
-    driver = db.query(Driver).filter(Driver.id == id).first()
+    driver = get_driver_row(db, id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
-    return driver
+    return check_content(request, response, driver) or driver._asdict()
+
+# 📌 Trucks a driver may drive
+@router.get("/drivers/{id}/eligible-trucks", summary="List trucks a driver is allowed to drive")
+def get_eligible_trucks(
+    id: str,
+    response: Response,
+    date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """
+    🚚 **Trucks that a driver's license allows them to drive**
+
+    - **id**: The unique identifier of the driver  
+    - **date**: Only trucks that are not assigned on this date  
+    - **limit** / **cursor**: Pagination, as in `GET /trucks/`  
+
+    **Returns**: The eligible trucks, ordered by id.
+
+    🚨 **Error Handling**:
+    - Returns **404 Not Found** if the driver does not exist.
+    """
+    driver = get_driver_row(db, id)
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    query = db.query(Truck).filter(Truck.min_license_rank <= driver.license_rank)
+    if date:
+        for table in assignment_tables(date):
+            query = query.filter(~exists().where(table.truck_id == Truck.id, table.date == date))
+    return fetch_page(query, [Truck.id], cursor, limit, response)
 
 # 📌 Update a driver
 @router.put("/drivers/{id}", response_model=DriverSchema, summary="Update a driver")
@@ -79,7 +165,9 @@ def update_driver(id: str, updated_data: DriverSchema, db: Session = Depends(get
     
     driver.name = updated_data.name
     driver.license_type = updated_data.license_type
+    bump_versions(db, "drivers")
     db.commit()
+    broadcaster.publish("driver", "updated", cache_driver(driver)._asdict())
     return driver
 
 # 📌 Delete a driver
@@ -99,6 +187,11 @@ def delete_driver(id: str, db: Session = Depends(get_db)):
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     
+    driver_id = driver.id
     db.delete(driver)
+    db.add(Tombstone(entity_type="driver", entity_id=driver_id))
+    bump_versions(db, "drivers")
     db.commit()
+    invalidate_driver(driver_id)
+    broadcaster.publish("driver", "deleted", {"id": driver_id})
     return {"message": "Driver deleted successfully"}
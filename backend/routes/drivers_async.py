@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from inspect import cleandoc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_async_read_db
+from models.models import Driver, Tombstone
+from routes import drivers
+from schemas.schemas import DriverSchema
+from services.events import broadcaster
+from utils.cache import cache_driver, get_driver_row_async, invalidate_driver
+from utils.etag import bump_versions_async, check_content, check_table_versions_async
+from utils.pagination import MAX_PAGE_SIZE, fetch_page_async
+from typing import Optional
+import uuid
+
+# Async versions of the handlers in routes/drivers.py, served when DB_ASYNC is enabled
+router = APIRouter()
+
+# 📌 Create a new driver
+@router.post("/drivers/", response_model=DriverSchema, summary="Create a new driver", description=cleandoc(drivers.create_driver.__doc__))
+async def create_driver(driver: DriverSchema, db: AsyncSession = Depends(get_async_db)):
+    new_driver = Driver(id=str(uuid.uuid4()), name=driver.name, license_type=driver.license_type)
+    db.add(new_driver)
+    await bump_versions_async(db, "drivers")
+    await db.commit()
+    broadcaster.publish("driver", "created", cache_driver(new_driver)._asdict())
+    return new_driver
+
+# 📌 Retrieve all drivers
+@router.get("/drivers/", summary="List all drivers", description=cleandoc(drivers.get_drivers.__doc__))
+async def get_drivers(
+    request: Request,
+    response: Response,
+    license_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    not_modified = await check_table_versions_async(db, request, response, "drivers")
+    if not_modified:
+        return not_modified
+
+    statement = select(Driver)
+    if license_type:
+        statement = statement.filter(Driver.license_type == license_type)
+    return await fetch_page_async(db, statement, [Driver.id], cursor, limit, response, scalars=True)
+
+# 📌 Retrieve a driver by ID
+@router.get("/drivers/{id}", summary="Retrieve a driver by ID", description=cleandoc(drivers.get_driver.__doc__))
+async def get_driver(id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    driver = await get_driver_row_async(db, id)
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return check_content(request, response, driver) or driver._asdict()
+
+# 📌 Update a driver
+@router.put("/drivers/{id}", response_model=DriverSchema, summary="Update a driver", description=cleandoc(drivers.update_driver.__doc__))
+async def update_driver(id: str, updated_data: DriverSchema, db: AsyncSession = Depends(get_async_db)):
+    driver = await db.get(Driver, id)
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    driver.name = updated_data.name
+    driver.license_type = updated_data.license_type
+    await bump_versions_async(db, "drivers")
+    await db.commit()
+    broadcaster.publish("driver", "updated", cache_driver(driver)._asdict())
+    return driver
+
+# 📌 Delete a driver
+@router.delete("/drivers/{id}", summary="Delete a driver", description=cleandoc(drivers.delete_driver.__doc__))
+async def delete_driver(id: str, db: AsyncSession = Depends(get_async_db)):
+    driver = await db.get(Driver, id)
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    driver_id = driver.id
+    await db.delete(driver)
+    db.add(Tombstone(entity_type="driver", entity_id=driver_id))
+    await bump_versions_async(db, "drivers")
+    await db.commit()
+    invalidate_driver(driver_id)
+    broadcaster.publish("driver", "deleted", {"id": driver_id})
+    return {"message": "Driver deleted successfully"}
@@ -0,0 +1,98 @@
+import asyncio
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from config import EVENTS_KEEPALIVE_SECONDS
+from services.events import broadcaster
+from utils.serialization import dumps
+from datetime import date
+from typing import Literal, Optional
+
+router = APIRouter()
+
+ENTITIES = ("assignment", "driver", "truck")
+
+
+def event_matches(event: dict, entities, date_from: Optional[date], date_to: Optional[date]):
+    """
+    Whether an event passes the stream's filters. Date filters only apply to
+    assignment events, which match when either their new or previous date is in range.
+    """
+    entity = event["type"].partition(".")[0]
+    if entity not in entities:
+        return False
+    if entity != "assignment" or (date_from is None and date_to is None):
+        return True
+    days = [event["data"].get("date"), event["data"].get("previous_date")]
+    return any(
+        day is not None and (date_from is None or day >= date_from) and (date_to is None or day <= date_to)
+        for day in days
+    )
+
+
+def format_event(event: dict) -> bytes:
+    """
+    One Server-Sent Events message.
+    """
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event["id"].encode(), event["type"].encode(), dumps(event["data"]))
+
+
+async def event_stream(last_event_id: Optional[str], matches):
+    """
+    Replay the events missed since `last_event_id`, then forward live events until
+    the client goes away or falls too far behind, sending comments as keep-alives while idle.
+    """
+    subscription, backlog = broadcaster.subscribe(last_event_id)
+    try:
+        yield b"retry: 3000\n\n"
+        if backlog is None:
+            # Some events were lost: the client reloads its lists and resumes from here
+            yield format_event({"id": broadcaster.last_event_id, "type": "reset", "data": {}})
+            backlog = []
+        for event in backlog:
+            if matches(event):
+                yield format_event(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            if matches(event):
+                yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+# 📌 Live feed of changes
+@router.get("/events/stream", summary="Stream assignment, driver and truck changes (Server-Sent Events)")
+async def stream_events(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    entity: Optional[list[Literal["assignment", "driver", "truck"]]] = Query(None),
+    since_id: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    📡 **Server-Sent Events feed of created, updated and deleted records**
+
+    - **date_from** / **date_to**: Only assignment events whose date (or previous date) is in this range  
+    - **entity**: Only events of these kinds (`assignment`, `driver`, `truck`); repeat for several  
+    - **since_id**: Resume after this event id (browsers send it as `Last-Event-ID` on reconnect)  
+
+    Events are named `<entity>.<created|updated|deleted>` and carry the record as JSON;
+    assignment updates also carry `previous_date`. A `reset` event means some events
+    could not be replayed and the client should reload before applying new ones.
+
+    **Returns**: A `text/event-stream` response that stays open.
+    """
+    entities = set(entity or ENTITIES)
+
+    def matches(event):
+        return event_matches(event, entities, date_from, date_to)
+
+    return StreamingResponse(
+        event_stream(since_id or last_event_id, matches),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import get_read_db
+from models.models import UtilizationRollup
+from schemas.schemas import UtilizationSchema, UtilizationSummarySchema
+from services.rollups import period_days, period_start
+from utils.pagination import MAX_PAGE_SIZE, fetch_page
+from datetime import date
+from typing import Literal, Optional
+
+router = APIRouter()
+
+MAX_REPORT_DAYS = 3 * 366
+
+
+def rollups_in_range(db: Session, entity: str, period: str, start: date, end: date, *columns):
+    """
+    Rollup rows of `entity` and `period` for the periods overlapping `start`..`end`,
+    read from the (entity_type, period_type, period_start, entity_id) index.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"The range cannot exceed {MAX_REPORT_DAYS} days")
+    return db.query(*columns).filter(
+        UtilizationRollup.entity_type == entity,
+        UtilizationRollup.period_type == period,
+        UtilizationRollup.period_start >= period_start(period, start),
+        UtilizationRollup.period_start <= end
+    )
+
+# 📌 Utilization of each driver or truck per week or month
+@router.get("/reports/utilization", response_model=list[UtilizationSchema], summary="Days assigned per driver or truck and period")
+def get_utilization(
+    response: Response,
+    entity: Literal["driver", "truck"],
+    start: date,
+    end: date,
+    period: Literal["week", "month"] = "month",
+    entity_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """
+    📊 **Utilization of every driver or truck, per ISO week or calendar month**
+
+    - **entity**: `driver` or `truck`  
+    - **start** / **end**: Periods overlapping this date range (inclusive, at most 3 years)  
+    - **period**: `week` (starting on Monday) or `month` (default)  
+    - **entity_id**: Only this driver or truck  
+    - **limit** / **cursor**: Pagination, as in `GET /assignments/`  
+
+    Read from rollups kept current by every assignment write, so the cost does not
+    depend on the number of assignments. Entities without assignments in a period are left out.
+
+    **Returns**: Assigned days, days in the period and their ratio, ordered by period and entity id.
+    """
+    query = rollups_in_range(
+        db, entity, period, start, end,
+        UtilizationRollup.entity_id, UtilizationRollup.period_start, UtilizationRollup.assigned_days
+    ).filter(UtilizationRollup.assigned_days > 0)
+    if entity_id:
+        query = query.filter(UtilizationRollup.entity_id == entity_id)
+    rows = fetch_page(query, [UtilizationRollup.period_start, UtilizationRollup.entity_id], cursor, limit, response)
+
+    report = []
+    for row in rows:
+        days = period_days(period, row.period_start)
+        report.append({
+            "entity_id": row.entity_id,
+            "period_start": row.period_start,
+            "assigned_days": row.assigned_days,
+            "days": days,
+            "utilization": round(row.assigned_days / days, 4)
+        })
+    return report
+
+# 📌 Fleet-wide totals per week or month
+@router.get("/reports/utilization/summary", response_model=list[UtilizationSummarySchema], summary="Assigned days and active drivers or trucks per period")
+def get_utilization_summary(
+    entity: Literal["driver", "truck"],
+    start: date,
+    end: date,
+    period: Literal["week", "month"] = "month",
+    db: Session = Depends(get_read_db)
+):
+    """
+    📈 **Totals of the utilization report, one row per period**
+
+    - **entity**: `driver` or `truck`  
+    - **start** / **end**: Periods overlapping this date range (inclusive, at most 3 years)  
+    - **period**: `week` or `month` (default)  
+
+    **Returns**: For each period, the days in it, the assigned days of all drivers or
+    trucks together and how many of them had at least one assignment.
+    """
+    rows = (
+        rollups_in_range(
+            db, entity, period, start, end,
+            UtilizationRollup.period_start,
+            func.sum(UtilizationRollup.assigned_days).label("assigned_days"),
+            func.count().label("active_entities")
+        )
+        .filter(UtilizationRollup.assigned_days > 0)
+        .group_by(UtilizationRollup.period_start)
+        .order_by(UtilizationRollup.period_start)
+    )
+    return [
+        {
+            "period_start": row.period_start,
+            "days": period_days(period, row.period_start),
+            "assigned_days": row.assigned_days,
+            "active_entities": row.active_entities
+        }
+        for row in rows
+    ]
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from database import get_db
+from models.models import Driver, Truck
+from routes.assignments import commit_or_conflict
+from schemas.schemas import RosterPlanRequestSchema, RosterPlanResponseSchema
+from services.archive import assignment_tables, ensure_writable
+from services.events import broadcaster
+from services.occupancy import occupancy
+from services.roster import plan_roster
+from datetime import timedelta
+import uuid
+
+router = APIRouter()
+
+MAX_ROSTER_DAYS = 62
+
+# 📌 Plan assignments over several days
+@router.post("/roster/plan", response_model=RosterPlanResponseSchema, summary="Plan a multi-day roster")
+def plan(request: RosterPlanRequestSchema, db: Session = Depends(get_db)):
+    """
+    🗓️ **Plan assignments for every day of a date range**
+
+    - **start** / **end**: First and last day to plan (inclusive, at most 62 days)  
+    - **dry_run**: When true (default), return the plan without saving it  
+    - **continuity_weight**: How many days of workload imbalance keeping a driver on the same truck is worth  
+    - **include_assignments**: Include every planned assignment in the response  
+
+    Existing assignments are kept. Each day as many free trucks as possible are
+    assigned. The whole range is planned at once, as a min-cost flow that evens out
+    the days worked while keeping drivers on the same truck where that is worth it;
+    the day-by-day plan is used instead when it scores better on the same terms.
+
+    🚨 **Business Rules**:
+    - The driver must have the required license to operate the truck.
+    - A driver and a truck are assigned at most once per day.
+
+    **Returns**: Plan statistics and, on request, the planned assignments.
+    """
+    days = (request.end - request.start).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if days > MAX_ROSTER_DAYS:
+        raise HTTPException(status_code=400, detail=f"The range cannot exceed {MAX_ROSTER_DAYS} days")
+
+    ensure_writable(request.start)
+
+    drivers = {driver.id: driver for driver in db.query(Driver.id, Driver.name, Driver.license_type, Driver.license_rank)}
+    trucks = {truck.id: truck for truck in db.query(Truck.id, Truck.plate, Truck.min_license_rank)}
+    # The day before the range only decides which truck each driver continues on
+    previous_day = request.start - timedelta(days=1)
+    existing = [
+        row
+        for table in assignment_tables(previous_day)
+        for row in db.query(table.date, table.driver_id, table.truck_id).filter(table.date >= previous_day, table.date <= request.end)
+    ]
+
+    planned, stats = plan_roster(
+        request.start, request.end,
+        {driver_id: driver.license_rank for driver_id, driver in drivers.items()},
+        {truck_id: truck.min_license_rank for truck_id, truck in trucks.items()},
+        existing, request.continuity_weight
+    )
+
+    rows = [
+        {"id": str(uuid.uuid4()), "driver_id": driver_id, "truck_id": truck_id, "date": day}
+        for day, driver_id, truck_id in planned
+    ]
+    if rows and not request.dry_run:
+        commit_or_conflict(db, inserted=rows)
+        occupancy.add_rows(rows)
+        broadcaster.publish_many("assignment", "created", (
+            {
+                "id": row["id"],
+                "driver_id": row["driver_id"],
+                "driver_name": drivers[row["driver_id"]].name,
+                "driver_license_type": drivers[row["driver_id"]].license_type,
+                "truck_id": row["truck_id"],
+                "truck_plate": trucks[row["truck_id"]].plate,
+                "date": row["date"]
+            }
+            for row in rows
+        ))
+
+    return {
+        "start": request.start,
+        "end": request.end,
+        "dry_run": request.dry_run,
+        "created": 0 if request.dry_run else len(rows),
+        **stats,
+        "assignments": rows if request.include_assignments else None
+    }
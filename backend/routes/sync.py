@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from config import SYNC_OVERLAP_SECONDS
+from database import get_db
+from models.models import Driver, Tombstone, Truck, utcnow
+from routes.assignments import assignment_details_query
+from schemas.schemas import SyncResponseSchema
+from services.archive import assignment_tables
+from services.sync import TOMBSTONE_ENTITIES, decode_sync_cursor, encode_sync_cursor, retention_horizon
+from utils.serialization import FastJSONResponse, row_dicts
+from datetime import timedelta
+from typing import Optional
+
+router = APIRouter()
+
+# 📌 Changes since the client's last sync
+@router.get("/sync", response_model=SyncResponseSchema, summary="Drivers, trucks and assignments changed or deleted since a cursor")
+def sync(since: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    🔄 **Delta sync for offline clients**
+
+    - **since**: The `cursor` returned by the previous sync; omit it for the first sync  
+
+    Returns the drivers, trucks and assignments created or updated since the cursor and
+    the ids of those deleted since then. Apply the changes first, then the deletions,
+    and keep the new `cursor` for the next call. Records changed right around the cursor
+    may be sent twice, so applying them must be idempotent.
+
+    When `full` is true (first sync, or a cursor older than the tombstone retention)
+    the response is a complete snapshot and replaces the client's data.
+
+    **Returns**: The changes, the deletions and the next cursor.
+
+    🚨 **Error Handling**:
+    - Returns **400 Bad Request** if the cursor is malformed.
+    """
+    now = utcnow()
+    changed_after = None
+    if since:
+        try:
+            changed_after = decode_sync_cursor(since) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    full = changed_after is None or changed_after < retention_horizon(now)
+
+    drivers = db.query(Driver.id, Driver.name, Driver.license_type)
+    trucks = db.query(Truck.id, Truck.plate, Truck.min_license_type)
+    # Archived assignments keep their updated_at, so they are only sent by full syncs
+    # or when they changed shortly before being archived
+    tables = assignment_tables()
+    assignments = [assignment_details_query(db, table) for table in tables]
+    deleted = {name: [] for name in TOMBSTONE_ENTITIES.values()}
+
+    if not full:
+        drivers = drivers.filter(Driver.updated_at > changed_after)
+        trucks = trucks.filter(Truck.updated_at > changed_after)
+        assignments = [query.filter(table.updated_at > changed_after) for query, table in zip(assignments, tables)]
+        tombstones = db.query(Tombstone.entity_type, Tombstone.entity_id).filter(Tombstone.deleted_at > changed_after)
+        for entity_type, entity_id in tombstones:
+            deleted[TOMBSTONE_ENTITIES[entity_type]].append(entity_id)
+
+    return FastJSONResponse({
+        "cursor": encode_sync_cursor(now),
+        "full": full,
+        "drivers": row_dicts(drivers.all()),
+        "trucks": row_dicts(trucks.all()),
+        "assignments": row_dicts([row for query in assignments for row in query]),
+        "deleted": deleted
+    })
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
-from database import get_db
-from models.models import Truck
-from schemas.schemas import TruckSchema
+from database import get_db, get_read_db
+from models.models import Driver, Tombstone, Truck
+from schemas.schemas import ImportResponseSchema, TruckSchema
+from services.archive import assignment_tables
+from services.events import broadcaster
+from services.importer import import_trucks_chunk, run_import
+from utils.cache import cache_truck, get_truck_row, invalidate_truck
+from utils.etag import bump_versions, check_content, check_table_versions
+from utils.pagination import MAX_PAGE_SIZE, fetch_page
+from datetime import date
+from typing import Literal, Optional
 import uuid
 
 router = APIRouter()
@@ -21,7 +30,8 @@ def create_truck(truck: TruckSchema, db: Session = Depends(get_db)):
     
     **Returns**: The details of the newly created truck.
     """
-    existing_truck = db.query(Truck).filter(Truck.plate == truck.plate).first()
+    # Checked against the database: a cache of another worker may not know a new or renamed plate
+    existing_truck = db.query(Truck.id).filter(Truck.plate == truck.plate).first()
     if existing_truck:
         raise HTTPException(status_code=409, detail="A truck with this plate already exists")
 
@@ -31,34 +41,115 @@ def create_truck(truck: TruckSchema, db: Session = Depends(get_db)):
         min_license_type=truck.min_license_type,
     )
     db.add(new_truck)
+    bump_versions(db, "trucks")
     db.commit()
     db.refresh(new_truck)
+    broadcaster.publish("truck", "created", cache_truck(new_truck)._asdict())
     return new_truck
 
+# 📌 Import trucks from a CSV or NDJSON file
+@router.post("/trucks/import", response_model=ImportResponseSchema, summary="Import trucks from a CSV or NDJSON file")
+async def import_trucks(request: Request, format: Optional[Literal["csv", "ndjson"]] = None, db: Session = Depends(get_db)):
+    """
+    📥 **Create many trucks from a file sent as the request body**
+
+    - **format**: `csv` or `ndjson`; defaults to NDJSON for JSON content types and CSV otherwise  
+
+    CSV files need a header with `plate` and `min_license_type`; NDJSON files hold
+    one object with those fields per line. The file is parsed while it is received
+    and saved in chunks of 1000 rows, each chunk in its own transaction.
+
+    🚨 **Business Rules**:
+    - Plates must be unique, both in the database and within the file.
+
+    **Returns**: The number of created and failed rows and the errors by line number
+    (the first 1000 of them).
+
+    🚨 **Error Handling**:
+    - Returns **400 Bad Request** if the CSV header lacks a required column.
+    """
+    format = format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")
+    seen_plates = set()
+    return await run_import(
+        request.stream(), format, TruckSchema, ("plate", "min_license_type"),
+        lambda chunk, report: import_trucks_chunk(db, chunk, report, seen_plates)
+    )
+
 # 📌 Retrieve all trucks
 @router.get("/trucks/", summary="List all trucks")
-def get_trucks(db: Session = Depends(get_db)):
+def get_trucks(
+    request: Request,
+    response: Response,
+    min_license_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
     """
     📋 **Retrieve all registered trucks**
     
-    **Returns**: A list of all trucks stored in the database.
+    - **min_license_type**: Only trucks requiring this license type  
+    - **limit**: Page size; when omitted every matching truck is returned  
+    - **cursor**: Value of the `X-Next-Cursor` header from the previous page  
+
+    **Returns**: A list of the trucks stored in the database, ordered by id.
+    Responses carry an `ETag`; sending it back in `If-None-Match` returns **304 Not Modified** while nothing changed.
     """
-    return db.query(Truck).all()
+    not_modified = check_table_versions(db, request, response, "trucks")
+    if not_modified:
+        return not_modified
+
+    query = db.query(Truck)
+    if min_license_type:
+        query = query.filter(Truck.min_license_type == min_license_type)
+    return fetch_page(query, [Truck.id], cursor, limit, response)
 
 # 📌 Retrieve specific truck
 @router.get("/trucks/{id}", summary="Retrieve a truck by ID")
-def get_truck(id: str, db: Session = Depends(get_db)):
+def get_truck(id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """
     🔍 **Retrieve a specific truck by ID**
     
     - **id**: The unique identifier of the truck  
     
-    **Returns**: The details of the truck if found.
+    **Returns**: The details of the truck if found, with an `ETag` for conditional requests.
     """
-    truck = db.query(Truck).filter(Truck.id == id).first()
+    truck = get_truck_row(db, id)
     if not truck:
         raise HTTPException(status_code=404, detail="Truck not found")
-    return truck
+    return check_content(request, response, truck) or truck._asdict()
+
+# 📌 Drivers who may drive a truck
+@router.get("/trucks/{id}/eligible-drivers", summary="List drivers allowed to drive a truck")
+def get_eligible_drivers(
+    id: str,
+    response: Response,
+    date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """
+    🪪 **Drivers whose license allows them to drive a truck**
+
+    - **id**: The unique identifier of the truck  
+    - **date**: Only drivers who are not assigned on this date  
+    - **limit** / **cursor**: Pagination, as in `GET /drivers/`  
+
+    **Returns**: The eligible drivers, ordered by id.
+
+    🚨 **Error Handling**:
+    - Returns **404 Not Found** if the truck does not exist.
+    """
+    truck = get_truck_row(db, id)
+    if not truck:
+        raise HTTPException(status_code=404, detail="Truck not found")
+
+    query = db.query(Driver).filter(Driver.license_rank >= truck.min_license_rank)
+    if date:
+        for table in assignment_tables(date):
+            query = query.filter(~exists().where(table.driver_id == Driver.id, table.date == date))
+    return fetch_page(query, [Driver.id], cursor, limit, response)
 
 # 📌 Update a truck
 @router.put("/trucks/{id}", response_model=TruckSchema, summary="Update a truck")
@@ -81,7 +172,10 @@ def update_truck(id: str, updated_data: TruckSchema, db: Session = Depends(get_d
     
     truck.plate = updated_data.plate
     truck.min_license_type = updated_data.min_license_type
+    bump_versions(db, "trucks")
     db.commit()
+    invalidate_truck(truck.id)
+    broadcaster.publish("truck", "updated", cache_truck(truck)._asdict())
     return truck
 
 # 📌 Delete a truck
@@ -101,8 +195,13 @@ def delete_truck(id: str, db: Session = Depends(get_db)):
     if not truck:
         raise HTTPException(status_code=404, detail="Truck not found")
     
+    truck_id = truck.id
     db.delete(truck)
+    db.add(Tombstone(entity_type="truck", entity_id=truck_id))
+    bump_versions(db, "trucks")
     db.commit()
+    invalidate_truck(truck_id)
+    broadcaster.publish("truck", "deleted", {"id": truck_id})
     return {"message": "Truck deleted successfully"}
 
 
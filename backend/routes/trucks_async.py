@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from inspect import cleandoc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_async_read_db
+from models.models import Tombstone, Truck
+from routes import trucks
+from schemas.schemas import TruckSchema
+from services.events import broadcaster
+from utils.cache import cache_truck, get_truck_row_async, invalidate_truck
+from utils.etag import bump_versions_async, check_content, check_table_versions_async
+from utils.pagination import MAX_PAGE_SIZE, fetch_page_async
+from typing import Optional
+import uuid
+
+# Async versions of the handlers in routes/trucks.py, served when DB_ASYNC is enabled
+router = APIRouter()
+
+# 📌 Create a new truck
+@router.post("/trucks/", response_model=TruckSchema, summary="Create a new truck", description=cleandoc(trucks.create_truck.__doc__))
+async def create_truck(truck: TruckSchema, db: AsyncSession = Depends(get_async_db)):
+    existing_truck = await db.scalar(select(Truck.id).filter(Truck.plate == truck.plate))
+    if existing_truck:
+        raise HTTPException(status_code=409, detail="A truck with this plate already exists")
+
+    new_truck = Truck(
+        id=str(uuid.uuid4()),
+        plate=truck.plate,
+        min_license_type=truck.min_license_type,
+    )
+    db.add(new_truck)
+    await bump_versions_async(db, "trucks")
+    await db.commit()
+    broadcaster.publish("truck", "created", cache_truck(new_truck)._asdict())
+    return new_truck
+
+# 📌 Retrieve all trucks
+@router.get("/trucks/", summary="List all trucks", description=cleandoc(trucks.get_trucks.__doc__))
+async def get_trucks(
+    request: Request,
+    response: Response,
+    min_license_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    not_modified = await check_table_versions_async(db, request, response, "trucks")
+    if not_modified:
+        return not_modified
+
+    statement = select(Truck)
+    if min_license_type:
+        statement = statement.filter(Truck.min_license_type == min_license_type)
+    return await fetch_page_async(db, statement, [Truck.id], cursor, limit, response, scalars=True)
+
+# 📌 Retrieve specific truck
+@router.get("/trucks/{id}", summary="Retrieve a truck by ID", description=cleandoc(trucks.get_truck.__doc__))
+async def get_truck(id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    truck = await get_truck_row_async(db, id)
+    if not truck:
+        raise HTTPException(status_code=404, detail="Truck not found")
+    return check_content(request, response, truck) or truck._asdict()
+
+# 📌 Update a truck
+@router.put("/trucks/{id}", response_model=TruckSchema, summary="Update a truck", description=cleandoc(trucks.update_truck.__doc__))
+async def update_truck(id: str, updated_data: TruckSchema, db: AsyncSession = Depends(get_async_db)):
+    truck = await db.get(Truck, id)
+    if not truck:
+        raise HTTPException(status_code=404, detail="Truck not found")
+
+    truck.plate = updated_data.plate
+    truck.min_license_type = updated_data.min_license_type
+    await bump_versions_async(db, "trucks")
+    await db.commit()
+    invalidate_truck(truck.id)
+    broadcaster.publish("truck", "updated", cache_truck(truck)._asdict())
+    return truck
+
+# 📌 Delete a truck
+@router.delete("/trucks/{id}", summary="Delete a truck", description=cleandoc(trucks.delete_truck.__doc__))
+async def delete_truck(id: str, db: AsyncSession = Depends(get_async_db)):
+    truck = await db.get(Truck, id)
+    if not truck:
+        raise HTTPException(status_code=404, detail="Truck not found")
+
+    truck_id = truck.id
+    await db.delete(truck)
+    db.add(Tombstone(entity_type="truck", entity_id=truck_id))
+    await bump_versions_async(db, "trucks")
+    await db.commit()
+    invalidate_truck(truck_id)
+    broadcaster.publish("truck", "deleted", {"id": truck_id})
+    return {"message": "Truck deleted successfully"}
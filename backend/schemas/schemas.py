@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import date
+from typing import Optional
 
 class DriverSchema(BaseModel):
     name: str
@@ -27,6 +28,115 @@ class AssignmentResponseSchema(BaseModel):
 
     model_config = ConfigDict(from_attributes=True) 
 
+class AssignmentBulkResultSchema(BaseModel):
+    index: int
+    status: str
+    detail: Optional[str] = None
+    assignment: Optional[AssignmentResponseSchema] = None
+
+class AssignmentBulkResponseSchema(BaseModel):
+    created: int
+    failed: int
+    results: list[AssignmentBulkResultSchema]
+
+class AutoAssignResponseSchema(BaseModel):
+    date: date
+    dry_run: bool
+    created: int
+    unassigned_drivers: int
+    unassigned_trucks: int
+    assignments: list[AssignmentResponseSchema]
+
+class RosterPlanRequestSchema(BaseModel):
+    start: date
+    end: date
+    dry_run: bool = True
+    continuity_weight: float = 1.0
+    include_assignments: bool = False
+
+class PlannedAssignmentSchema(BaseModel):
+    id: str
+    driver_id: str
+    truck_id: str
+    date: date
+
+class RosterPlanResponseSchema(BaseModel):
+    start: date
+    end: date
+    dry_run: bool
+    created: int
+    planned: int
+    kept_on_previous_truck: int
+    min_days_worked: int
+    max_days_worked: int
+    assignments: Optional[list[PlannedAssignmentSchema]] = None
+
+class TruckAvailabilitySchema(BaseModel):
+    id: str
+    plate: str
+    min_license_type: str
+    free: str
+    free_ranges: list[tuple[date, date]]
+
+class DriverAvailabilitySchema(BaseModel):
+    id: str
+    name: str
+    license_type: str
+    free: str
+    free_ranges: list[tuple[date, date]]
+
+class FleetAvailabilitySchema(BaseModel):
+    start: date
+    end: date
+    trucks: list[TruckAvailabilitySchema]
+    drivers: list[DriverAvailabilitySchema]
+
+class SyncDriverSchema(BaseModel):
+    id: str
+    name: str
+    license_type: str
+
+class SyncTruckSchema(BaseModel):
+    id: str
+    plate: str
+    min_license_type: str
+
+class SyncDeletedSchema(BaseModel):
+    drivers: list[str]
+    trucks: list[str]
+    assignments: list[str]
+
+class SyncResponseSchema(BaseModel):
+    cursor: str
+    full: bool
+    drivers: list[SyncDriverSchema]
+    trucks: list[SyncTruckSchema]
+    assignments: list[AssignmentResponseSchema]
+    deleted: SyncDeletedSchema
+
+class ImportErrorSchema(BaseModel):
+    line: int
+    detail: str
+
+class ImportResponseSchema(BaseModel):
+    created: int
+    failed: int
+    errors: list[ImportErrorSchema]
+    errors_truncated: bool
+
+class UtilizationSchema(BaseModel):
+    entity_id: str
+    period_start: date
+    assigned_days: int
+    days: int
+    utilization: float
+
+class UtilizationSummarySchema(BaseModel):
+    period_start: date
+    days: int
+    assigned_days: int
+    active_entities: int
+
 class ErrorLogSchema(BaseModel):
     timestamp: date
     error_message: str
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select
+
+from config import ASSIGNMENT_HOT_DAYS, OCCUPANCY_PAST_DAYS
+from database import SessionLocal
+from models.models import ArchivedAssignment, Assignment
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVED_COLUMNS = ("id", "driver_id", "truck_id", "date", "updated_at")
+# Rows stay hot for a day past the horizon, so that a process whose clock is slightly
+# behind the archival job never looks for them in the hot table only after they moved
+ARCHIVE_GRACE = timedelta(days=1)
+
+
+def hot_horizon(today: Optional[date] = None) -> Optional[date]:
+    """
+    First day whose assignments are always in the hot table and writable, or None
+    when archival is off. Days before it may already be in the archive.
+    """
+    if ASSIGNMENT_HOT_DAYS <= 0:
+        return None
+    # The occupancy index loads its window from the hot table only
+    hot_days = max(ASSIGNMENT_HOT_DAYS, OCCUPANCY_PAST_DAYS)
+    return (today or date.today()) - timedelta(days=hot_days)
+
+
+def assignment_tables(date_from: Optional[date] = None):
+    """
+    Tables holding the assignments dated `date_from` or later: the hot table alone
+    when the range starts at the hot horizon, otherwise the archive as well.
+    """
+    horizon = hot_horizon()
+    if horizon is None or (date_from is not None and date_from >= horizon):
+        return (Assignment,)
+    return (Assignment, ArchivedAssignment)
+
+
+def archived_detail(day: date):
+    """
+    Error message for a write to a day before the hot horizon, or None if `day` is
+    writable. Archived days are read-only, so the per-day unique indexes of the hot
+    table cover every day that can still change.
+    """
+    horizon = hot_horizon()
+    if horizon is not None and day < horizon:
+        return f"Assignments before {horizon.isoformat()} are archived and cannot be changed"
+    return None
+
+
+def ensure_writable(day: date):
+    detail = archived_detail(day)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
+
+
+def archived_assignment_error():
+    return HTTPException(status_code=400, detail="Assignment is archived and cannot be changed")
+
+
+def archive_assignments(db, before: date) -> int:
+    """
+    Move the assignments dated before `before` to the archive, in batches of
+    `ARCHIVE_BATCH_SIZE` rows that each commit on their own. Returns the rows moved.
+    """
+    hot_columns = [getattr(Assignment, column) for column in ARCHIVED_COLUMNS]
+    moved = 0
+    while True:
+        ids = db.scalars(
+            select(Assignment.id).where(Assignment.date < before).order_by(Assignment.date, Assignment.id).limit(ARCHIVE_BATCH_SIZE)
+        ).all()
+        if not ids:
+            return moved
+        db.execute(insert(ArchivedAssignment).from_select(ARCHIVED_COLUMNS, select(*hot_columns).where(Assignment.id.in_(ids))))
+        db.execute(delete(Assignment).where(Assignment.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+
+def run_archival(today: Optional[date] = None) -> int:
+    horizon = hot_horizon(today)
+    if horizon is None:
+        return 0
+    db = SessionLocal()
+    try:
+        return archive_assignments(db, horizon - ARCHIVE_GRACE)
+    finally:
+        db.close()
+
+
+async def archive_assignments_daily():
+    """
+    Move assignments past the hot horizon to the archive once a day.
+    """
+    while True:
+        try:
+            moved = await asyncio.to_thread(run_archival)
+            logger.info("Archived %d assignments", moved)
+        except Exception:
+            logger.exception("Could not archive assignments")
+        await asyncio.sleep(24 * 3600)
+
+
+if __name__ == "__main__":
+    # python -m services.archive: archive once, e.g. from cron instead of the API process
+    if hot_horizon() is None:
+        raise SystemExit("ASSIGNMENT_HOT_DAYS is not set; archival is off")
+    print(f"Archived {run_archival()} assignments")
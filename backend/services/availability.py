@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+
+def day_offsets(booked_dates, start: date, days: int):
+    """
+    Convert booked dates into offsets from `start`, ignoring dates outside the range.
+    """
+    offsets = set()
+    for booked in booked_dates:
+        offset = (booked - start).days
+        if 0 <= offset < days:
+            offsets.add(offset)
+    return offsets
+
+
+def free_bitmap(booked_offsets, days: int):
+    """
+    One character per day: "1" when the entity is free, "0" when it is booked.
+    """
+    return "".join("0" if offset in booked_offsets else "1" for offset in range(days))
+
+
+def free_ranges(bitmap: str, start: date):
+    """
+    Collapse a free-day bitmap into inclusive `[first_day, last_day]` ranges.
+    """
+    ranges = []
+    run_start = None
+    for offset, flag in enumerate(bitmap + "0"):
+        if flag == "1" and run_start is None:
+            run_start = offset
+        elif flag == "0" and run_start is not None:
+            ranges.append((start + timedelta(days=run_start), start + timedelta(days=offset - 1)))
+            run_start = None
+    return ranges
+
+
+def free_bitmap_from_bits(booked_bits: int, days: int):
+    """
+    Same as `free_bitmap` for booked days given as an integer bitmap (bit 0 is the first day).
+    """
+    return format(~booked_bits & ((1 << days) - 1), f"0{days}b")[::-1]
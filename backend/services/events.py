@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import uuid
+from collections import deque
+from typing import Optional
+
+from config import EVENTS_HISTORY_SIZE
+
+
+class Subscription:
+    """
+    Events waiting to be sent to one client. Bound to the event loop that
+    created it; publishers on other threads hand events over thread-safely.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event: Optional[dict]):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The client's loop is gone; the stream's cleanup unsubscribes it
+            pass
+
+    def _put(self, event: Optional[dict]):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop what is queued and end the stream with the
+            # None sentinel, the client resumes from its last event id
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBroadcaster:
+    """
+    In-process publish/subscribe of change events with a ring buffer of the
+    latest events, so that clients can resume after a reconnect.
+
+    Event ids are `<epoch>-<sequence>`; the epoch changes with every process, so
+    an id from another worker or from before a restart is recognised as a gap.
+    Only writes made by this process are published.
+    """
+
+    def __init__(self, history_size: int):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.epoch}-{self._sequence}"
+
+    def publish(self, entity: str, action: str, data: dict) -> dict:
+        """
+        Publish `<entity>.<action>` with `data` to every subscriber. Thread-safe.
+        """
+        with self._lock:
+            self._sequence += 1
+            event = {"id": f"{self.epoch}-{self._sequence}", "sequence": self._sequence, "type": f"{entity}.{action}", "data": data}
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.deliver(event)
+        return event
+
+    def publish_many(self, entity: str, action: str, items):
+        for data in items:
+            self.publish(entity, action, data)
+
+    def _missed(self, last_event_id: str):
+        """
+        Events after `last_event_id`, or None when some of them are no longer known.
+        """
+        epoch, _, sequence = last_event_id.rpartition("-")
+        if epoch != self.epoch or not sequence.isdigit() or int(sequence) > self._sequence:
+            return None
+        sequence = int(sequence)
+        oldest = self._history[0]["sequence"] if self._history else self._sequence + 1
+        if sequence + 1 < oldest:
+            return None
+        return [event for event in self._history if event["sequence"] > sequence]
+
+    def subscribe(self, last_event_id: Optional[str] = None):
+        """
+        Register a subscriber on the running loop.
+
+        Returns `(subscription, backlog)` where backlog lists the events published
+        after `last_event_id`, or None when they cannot all be replayed.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self._history.maxlen)
+        with self._lock:
+            backlog = [] if last_event_id is None else self._missed(last_event_id)
+            self._subscribers.add(subscription)
+        return subscription, backlog
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+broadcaster = EventBroadcaster(EVENTS_HISTORY_SIZE)
@@ -0,0 +1,147 @@
+import heapq
+from collections import deque
+
+
+class MinCostFlow:
+    """
+    Minimum-cost maximum flow with integer capacities and costs.
+
+    Primal-dual successive shortest paths: each round finds the shortest distances
+    from the source with Dijkstra on reduced costs, then saturates all shortest
+    paths at once with a blocking flow (Dinic) on the zero reduced-cost arcs.
+    Negative costs are allowed as long as there is no negative cycle; the first
+    potentials come from Bellman-Ford.
+    """
+
+    def __init__(self):
+        self._adjacent = []
+        # Arc e and its reverse e ^ 1, stored side by side
+        self._head = []
+        self._capacity = []
+        self._cost = []
+
+    def add_node(self) -> int:
+        self._adjacent.append([])
+        return len(self._adjacent) - 1
+
+    def add_arc(self, tail: int, head: int, capacity: int, cost: int) -> int:
+        """
+        Add an arc and return its index, to read its flow after `solve`.
+        """
+        arc = len(self._head)
+        self._head += [head, tail]
+        self._capacity += [capacity, 0]
+        self._cost += [cost, -cost]
+        self._adjacent[tail].append(arc)
+        self._adjacent[head].append(arc + 1)
+        return arc
+
+    def flow(self, arc: int) -> int:
+        return self._capacity[arc ^ 1]
+
+    def _initial_potentials(self, source):
+        potential = [None] * len(self._adjacent)
+        potential[source] = 0
+        queue = deque([source])
+        queued = [False] * len(self._adjacent)
+        queued[source] = True
+        while queue:
+            node = queue.popleft()
+            queued[node] = False
+            for arc in self._adjacent[node]:
+                if self._capacity[arc]:
+                    head = self._head[arc]
+                    distance = potential[node] + self._cost[arc]
+                    if potential[head] is None or distance < potential[head]:
+                        potential[head] = distance
+                        if not queued[head]:
+                            queued[head] = True
+                            queue.append(head)
+        return potential
+
+    def _shortest_distances(self, source, potential):
+        distance = [None] * len(self._adjacent)
+        distance[source] = 0
+        heap = [(0, source)]
+        while heap:
+            node_distance, node = heapq.heappop(heap)
+            if node_distance > distance[node]:
+                continue
+            for arc in self._adjacent[node]:
+                if self._capacity[arc]:
+                    head = self._head[arc]
+                    candidate = node_distance + self._cost[arc] + potential[node] - potential[head]
+                    if distance[head] is None or candidate < distance[head]:
+                        distance[head] = candidate
+                        heapq.heappush(heap, (candidate, head))
+        return distance
+
+    def _blocking_flow(self, source, sink, potential):
+        """
+        Maximum flow from `source` to `sink` over the arcs of zero reduced cost.
+        """
+        head_of, capacity, cost, adjacent = self._head, self._capacity, self._cost, self._adjacent
+
+        def admissible(node, arc):
+            head = head_of[arc]
+            return capacity[arc] and potential[head] is not None and cost[arc] + potential[node] == potential[head]
+
+        total = 0
+        while True:
+            level = [None] * len(adjacent)
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                for arc in adjacent[node]:
+                    if level[head_of[arc]] is None and admissible(node, arc):
+                        level[head_of[arc]] = level[node] + 1
+                        queue.append(head_of[arc])
+            if level[sink] is None:
+                return total
+
+            position = [0] * len(adjacent)
+            while True:
+                # Walk down the level graph, retreating from dead ends
+                path = []
+                node = source
+                while node != sink:
+                    arcs = adjacent[node]
+                    while position[node] < len(arcs):
+                        arc = arcs[position[node]]
+                        head = head_of[arc]
+                        if level[head] == level[node] + 1 and admissible(node, arc):
+                            break
+                        position[node] += 1
+                    if position[node] == len(arcs):
+                        if not path:
+                            break
+                        level[node] = None
+                        node = head_of[path.pop() ^ 1]
+                        position[node] += 1
+                        continue
+                    path.append(arcs[position[node]])
+                    node = head_of[arcs[position[node]]]
+                if node != sink:
+                    break
+                pushed = min(capacity[arc] for arc in path)
+                for arc in path:
+                    capacity[arc] -= pushed
+                    capacity[arc ^ 1] += pushed
+                total += pushed
+
+    def solve(self, source: int, sink: int) -> int:
+        """
+        Send the maximum flow from `source` to `sink` at minimum cost. Returns the flow.
+        """
+        potential = self._initial_potentials(source)
+        total = 0
+        while True:
+            distance = self._shortest_distances(source, potential)
+            if distance[sink] is None:
+                return total
+            potential = [
+                node_potential + node_distance if node_distance is not None else None
+                for node_potential, node_distance in zip(potential, distance)
+            ]
+            total += self._blocking_flow(source, sink, potential)
@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import timedelta
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from config import IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_STORE, IDEMPOTENCY_TTL_SECONDS
+from database import SessionLocal
+from models.models import IdempotencyKey, utcnow
+from utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# A completed write whose response is replayed to retries with the same key
+StoredResponse = namedtuple("StoredResponse", ["status_code", "body"])
+
+
+def key_hash(scope: str, key: str) -> str:
+    """
+    Storage key of an Idempotency-Key, scoped to the method and path it was sent to.
+    """
+    return hashlib.sha256(f"{scope}\n{key}".encode()).hexdigest()
+
+
+def payload_fingerprint(payload) -> str:
+    return hashlib.sha256(dumps(payload.model_dump(mode="json"))).hexdigest()
+
+
+def reused_key():
+    return HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request body")
+
+
+def key_in_progress():
+    return HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+
+class MemoryIdempotencyStore:
+    """
+    Per-process store: an LRU of at most `max_keys` entries, each expiring after
+    `ttl_seconds`. Retries reaching another worker are not recognized.
+    """
+
+    def __init__(self, max_keys: int, ttl_seconds: float, lock_seconds: float):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        # key hash -> (expires at, fingerprint, StoredResponse or None while in progress)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fingerprint: str):
+        """
+        Reserve `key` for a new request and return None, or return the stored
+        response of a completed one. Raises 409/422 for concurrent or mismatched reuse.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                if entry[1] != fingerprint:
+                    raise reused_key()
+                if entry[2] is None:
+                    raise key_in_progress()
+                return entry[2]
+            self._entries[key] = (now + self.lock_seconds, fingerprint, None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            return None
+
+    def save(self, key: str, fingerprint: str, stored: StoredResponse):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, fingerprint, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+    def release(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def prune(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry[0] <= now]
+            for key in expired:
+                del self._entries[key]
+            return len(expired)
+
+
+class DatabaseIdempotencyStore:
+    """
+    Store shared by every worker, in the idempotency_keys table. Claims commit in
+    their own session, so the primary key serializes concurrent retries.
+    """
+
+    def __init__(self, ttl_seconds: float, lock_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    def claim(self, key: str, fingerprint: str):
+        now = utcnow()
+        db = SessionLocal()
+        try:
+            row = db.get(IdempotencyKey, key)
+            if row is not None and row.expires_at > now:
+                if row.fingerprint != fingerprint:
+                    raise reused_key()
+                if row.status_code is None:
+                    raise key_in_progress()
+                return StoredResponse(row.status_code, row.body)
+            # An expired result or an abandoned claim frees the key
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key_hash == key, IdempotencyKey.expires_at <= now))
+            db.add(IdempotencyKey(
+                key_hash=key,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=self.lock_seconds)
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                raise key_in_progress()
+            return None
+        finally:
+            db.close()
+
+    def save(self, key: str, fingerprint: str, stored: StoredResponse):
+        db = SessionLocal()
+        try:
+            db.execute(update(IdempotencyKey).where(IdempotencyKey.key_hash == key).values(
+                status_code=stored.status_code,
+                body=stored.body,
+                expires_at=utcnow() + timedelta(seconds=self.ttl_seconds)
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, key: str):
+        db = SessionLocal()
+        try:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key_hash == key, IdempotencyKey.status_code.is_(None)))
+            db.commit()
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        db = SessionLocal()
+        try:
+            deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= utcnow())).rowcount
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+
+def create_idempotency_store():
+    if IDEMPOTENCY_STORE == "database":
+        return DatabaseIdempotencyStore(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS)
+    if IDEMPOTENCY_STORE != "memory":
+        raise ValueError(f"Unknown IDEMPOTENCY_STORE {IDEMPOTENCY_STORE!r}; expected 'memory' or 'database'")
+    return MemoryIdempotencyStore(IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS)
+
+
+idempotency_store = create_idempotency_store()
+
+
+def check_key(key: str):
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be between 1 and {MAX_KEY_LENGTH} characters")
+
+
+def replay_response(stored: StoredResponse):
+    response = Response(stored.body, status_code=stored.status_code, media_type="application/json")
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def completed_response(key: str, fingerprint: str, result):
+    """
+    Store a successful handler result and send it as the first response.
+    """
+    stored = StoredResponse(200, dumps(result))
+    idempotency_store.save(key, fingerprint, stored)
+    return Response(stored.body, status_code=stored.status_code, media_type="application/json")
+
+
+def run_idempotent(idempotency_key, scope: str, payload, handler):
+    """
+    Run `handler()` at most once per `Idempotency-Key` sent to `scope`.
+
+    Without a key the handler result is returned unchanged. With one, a retry of a
+    completed request replays its stored response without calling the handler, and
+    failed requests are not stored, so they can be retried.
+    """
+    if idempotency_key is None:
+        return handler()
+    check_key(idempotency_key)
+    key = key_hash(scope, idempotency_key)
+    fingerprint = payload_fingerprint(payload)
+    stored = idempotency_store.claim(key, fingerprint)
+    if stored is not None:
+        return replay_response(stored)
+    try:
+        result = handler()
+    except BaseException:
+        idempotency_store.release(key)
+        raise
+    return completed_response(key, fingerprint, result)
+
+
+async def run_idempotent_async(idempotency_key, scope: str, payload, handler):
+    """
+    `run_idempotent` for coroutine handlers; store calls run in a worker thread.
+    """
+    if idempotency_key is None:
+        return await handler()
+    check_key(idempotency_key)
+    key = key_hash(scope, idempotency_key)
+    fingerprint = payload_fingerprint(payload)
+    stored = await asyncio.to_thread(idempotency_store.claim, key, fingerprint)
+    if stored is not None:
+        return replay_response(stored)
+    try:
+        result = await handler()
+    except BaseException:
+        await asyncio.to_thread(idempotency_store.release, key)
+        raise
+    return await asyncio.to_thread(completed_response, key, fingerprint, result)
+
+
+async def prune_idempotency_keys_hourly():
+    """
+    Drop expired idempotency results once an hour.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(idempotency_store.prune)
+        except Exception:
+            logger.exception("Could not prune idempotency keys")
+        await asyncio.sleep(3600)
@@ -0,0 +1,184 @@
+import asyncio
+import codecs
+import csv
+import json
+import uuid
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models.models import LICENSE_RANKS, Driver, Truck
+from services.events import broadcaster
+from utils.etag import bump_versions
+
+IMPORT_CHUNK_ROWS = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """
+    Created/failed counters and the first `max_errors` row errors of an import.
+    """
+
+    def __init__(self, max_errors: int = MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line: int, detail: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "detail": detail})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+async def iter_lines(stream):
+    """
+    Decode a stream of UTF-8 byte chunks into lines, without the line endings.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(stream, format: str, required: tuple):
+    """
+    Yield `(line number, record dict or None, error or None)` for every non-empty
+    line. CSV files start with a header naming at least the `required` columns;
+    each record must fit on one line.
+    """
+    header = None
+    line_number = 0
+    async for line in iter_lines(stream):
+        line_number += 1
+        if not line.strip():
+            continue
+
+        if format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                yield line_number, None, "Invalid JSON object"
+                continue
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [column.strip() for column in values]
+                missing = [column for column in required if column not in header]
+                if missing:
+                    raise HTTPException(status_code=400, detail=f"Missing CSV columns: {', '.join(missing)}")
+                continue
+            if len(values) != len(header):
+                yield line_number, None, f"Expected {len(header)} columns, found {len(values)}"
+                continue
+            record = dict(zip(header, values))
+        yield line_number, record, None
+
+
+def validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+
+
+async def run_import(stream, format: str, schema, required: tuple, import_chunk):
+    """
+    Validate the records of `stream` with `schema` and hand them to
+    `import_chunk(chunk, report)` in chunks of IMPORT_CHUNK_ROWS, run in a worker
+    thread. Only one chunk is held in memory at a time.
+    """
+    report = ImportReport()
+    chunk = []
+    async for line_number, record, error in iter_records(stream, format, required):
+        if error:
+            report.fail(line_number, error)
+            continue
+        try:
+            chunk.append((line_number, schema(**record)))
+        except ValidationError as validation_error:
+            report.fail(line_number, validation_detail(validation_error))
+            continue
+        if len(chunk) >= IMPORT_CHUNK_ROWS:
+            await asyncio.to_thread(import_chunk, chunk, report)
+            chunk = []
+    if chunk:
+        await asyncio.to_thread(import_chunk, chunk, report)
+    return report.as_dict()
+
+
+def import_drivers_chunk(db, chunk, report: ImportReport):
+    """
+    Insert a chunk of validated drivers with a single multi-row insert.
+    """
+    rows = []
+    for line, driver in chunk:
+        rank = LICENSE_RANKS.get(driver.license_type)
+        if rank is None:
+            report.fail(line, "Invalid license type")
+            continue
+        rows.append({"id": str(uuid.uuid4()), "name": driver.name, "license_type": driver.license_type, "license_rank": rank})
+
+    if rows:
+        db.execute(insert(Driver), rows)
+        bump_versions(db, "drivers")
+        db.commit()
+        report.created += len(rows)
+        broadcaster.publish_many("driver", "created", rows)
+
+
+def import_trucks_chunk(db, chunk, report: ImportReport, seen_plates: set):
+    """
+    Insert a chunk of validated trucks with a single multi-row insert. Plates
+    are checked against the file so far (`seen_plates`) and against the
+    database with one IN query.
+    """
+    candidates = []
+    for line, truck in chunk:
+        rank = LICENSE_RANKS.get(truck.min_license_type)
+        if rank is None:
+            report.fail(line, "Invalid license type")
+        elif truck.plate in seen_plates:
+            report.fail(line, "Duplicate plate in the file")
+        else:
+            seen_plates.add(truck.plate)
+            candidates.append((line, {"id": str(uuid.uuid4()), "plate": truck.plate, "min_license_type": truck.min_license_type, "min_license_rank": rank}))
+
+    # A plate committed concurrently makes the insert fail; look the plates up again once
+    existing, rows = set(), []
+    for attempt in range(2 if candidates else 0):
+        existing = set(db.scalars(select(Truck.plate).where(Truck.plate.in_([row["plate"] for _, row in candidates]))))
+        rows = [row for _, row in candidates if row["plate"] not in existing]
+        if not rows:
+            break
+        try:
+            db.execute(insert(Truck), rows)
+            bump_versions(db, "trucks")
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise
+
+    for line, row in candidates:
+        if row["plate"] in existing:
+            report.fail(line, "A truck with this plate already exists")
+    report.created += len(rows)
+    broadcaster.publish_many("truck", "created", rows)
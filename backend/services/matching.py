@@ -0,0 +1,29 @@
+def match_by_license(trucks, drivers):
+    """
+    Maximum matching between trucks and drivers under the license rule.
+
+    `trucks` is a list of `(truck_id, required_rank)` and `drivers` a list of
+    `(driver_id, license_rank)`; a driver may take a truck when
+    `license_rank >= required_rank`.
+
+    The eligibility graph is nested: a driver who can take a truck can take
+    every truck with a lower requirement. Walking trucks from the highest
+    requirement down and giving each one the highest-ranked driver still free
+    therefore yields a maximum matching, the same size Hopcroft-Karp would find,
+    in O(n log n) without materialising the dense edge list.
+
+    Returns a list of `(driver_id, truck_id)` pairs.
+    """
+    trucks = sorted(trucks, key=lambda truck: (-truck[1], truck[0]))
+    drivers = sorted(drivers, key=lambda driver: (-driver[1], driver[0]))
+
+    pairs = []
+    next_driver = 0
+    for truck_id, required_rank in trucks:
+        if next_driver == len(drivers):
+            break
+        driver_id, license_rank = drivers[next_driver]
+        if license_rank >= required_rank:
+            pairs.append((driver_id, truck_id))
+            next_driver += 1
+    return pairs
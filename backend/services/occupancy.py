@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+
+from config import OCCUPANCY_FUTURE_DAYS, OCCUPANCY_PAST_DAYS
+from database import SessionLocal
+from models.models import Assignment
+from models.types import canonical_uuid
+
+logger = logging.getLogger(__name__)
+
+
+def _key(entity_id) -> str:
+    # Same id whatever its case or hyphenation; non-UUID ids stay distinct
+    return canonical_uuid(entity_id) or str(entity_id)
+
+
+class OccupancyIndex:
+    """
+    In-memory bitmaps of the days each driver and truck is assigned, over a
+    window from `past_days` before to `future_days` after the day it was loaded.
+    Bit n of an entity's integer stands for the window's first day + n days.
+
+    Lookups return None while the index is not loaded or when the days fall
+    outside the window; callers then ask the database.
+    """
+
+    def __init__(self, past_days: int, future_days: int):
+        self.past_days = past_days
+        self.future_days = future_days
+        self._lock = threading.Lock()
+        # (first day, last day, driver bitmaps, truck bitmaps), swapped as a whole on reload
+        self._state = None
+        # Writes recorded while a reload is reading the database, replayed on top of it
+        self._pending = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._state is not None
+
+    def load(self, db, today: Optional[date] = None):
+        """
+        (Re)build the bitmaps from the assignments in the window around `today`.
+        """
+        today = today or date.today()
+        start = today - timedelta(days=self.past_days)
+        end = today + timedelta(days=self.future_days)
+
+        with self._lock:
+            self._pending = []
+        try:
+            drivers, trucks = defaultdict(int), defaultdict(int)
+            rows = db.execute(
+                select(Assignment.driver_id, Assignment.truck_id, Assignment.date)
+                .where(Assignment.date >= start, Assignment.date <= end)
+            )
+            for driver_id, truck_id, day in rows:
+                bit = 1 << (day - start).days
+                drivers[driver_id] |= bit
+                trucks[truck_id] |= bit
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+
+        state = (start, end, dict(drivers), dict(trucks))
+        with self._lock:
+            for operation in self._pending:
+                self._apply(state, *operation)
+            self._state, self._pending = state, None
+
+    def clear(self):
+        with self._lock:
+            self._state = None
+
+    @staticmethod
+    def _apply(state, driver_id, truck_id, day, booked):
+        start, end, drivers, trucks = state
+        if not start <= day <= end:
+            return
+        bit = 1 << (day - start).days
+        for bitmaps, key in ((drivers, driver_id), (trucks, truck_id)):
+            bitmaps[key] = bitmaps.get(key, 0) | bit if booked else bitmaps.get(key, 0) & ~bit
+
+    def _record(self, driver_id, truck_id, day: date, booked: bool):
+        operation = (_key(driver_id), _key(truck_id), day, booked)
+        with self._lock:
+            if self._state is not None:
+                self._apply(self._state, *operation)
+            if self._pending is not None:
+                self._pending.append(operation)
+
+    def add(self, driver_id, truck_id, day: date):
+        """
+        Record a committed assignment.
+        """
+        self._record(driver_id, truck_id, day, True)
+
+    def remove(self, driver_id, truck_id, day: date):
+        """
+        Forget a deleted (or moved) assignment.
+        """
+        self._record(driver_id, truck_id, day, False)
+
+    def add_rows(self, rows):
+        """
+        Record committed assignment rows given as dicts with driver_id, truck_id and date.
+        """
+        for row in rows:
+            self.add(row["driver_id"], row["truck_id"], row["date"])
+
+    def covers(self, start: date, end: date) -> bool:
+        state = self._state
+        return state is not None and state[0] <= start and end <= state[1]
+
+    def _days(self, index: int, entity_id, start: date, days: int) -> Optional[int]:
+        state = self._state
+        if state is None or start < state[0] or start + timedelta(days=days - 1) > state[1]:
+            return None
+        return (state[index].get(_key(entity_id), 0) >> (start - state[0]).days) & ((1 << days) - 1)
+
+    def driver_days(self, driver_id, start: date, days: int = 1) -> Optional[int]:
+        """
+        Booked days of a driver from `start` as a bitmap (bit 0 is `start`), or None.
+        """
+        return self._days(2, driver_id, start, days)
+
+    def truck_days(self, truck_id, start: date, days: int = 1) -> Optional[int]:
+        """
+        Booked days of a truck from `start` as a bitmap (bit 0 is `start`), or None.
+        """
+        return self._days(3, truck_id, start, days)
+
+    def driver_booked(self, driver_id, day: date) -> Optional[bool]:
+        bits = self.driver_days(driver_id, day)
+        return None if bits is None else bool(bits)
+
+    def truck_booked(self, truck_id, day: date) -> Optional[bool]:
+        bits = self.truck_days(truck_id, day)
+        return None if bits is None else bool(bits)
+
+
+occupancy = OccupancyIndex(OCCUPANCY_PAST_DAYS, OCCUPANCY_FUTURE_DAYS)
+
+
+def load_occupancy(today: Optional[date] = None):
+    db = SessionLocal()
+    try:
+        occupancy.load(db, today)
+    finally:
+        db.close()
+
+
+async def roll_occupancy_window():
+    """
+    Reload the index shortly after every midnight so that its window follows the calendar.
+    """
+    while True:
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        await asyncio.sleep((midnight - now).total_seconds() + 1)
+        try:
+            await asyncio.to_thread(load_occupancy)
+        except Exception:
+            logger.exception("Could not reload the occupancy index")
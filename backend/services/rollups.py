@@ -0,0 +1,128 @@
+import calendar
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from database import SessionLocal
+from models.models import ArchivedAssignment, Assignment, UtilizationRollup
+
+ROLLUP_PERIODS = ("week", "month")
+REBUILD_BATCH_SIZE = 5000
+
+
+def period_start(period_type: str, day: date) -> date:
+    """
+    First day of the ISO week (Monday) or calendar month containing `day`.
+    """
+    if period_type == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_days(period_type: str, start: date) -> int:
+    if period_type == "week":
+        return 7
+    return calendar.monthrange(start.year, start.month)[1]
+
+
+def rollup_deltas(added=(), removed=()):
+    """
+    Change of assigned days per rollup key for the `(driver_id, truck_id, date)`
+    assignments added and removed, without the keys that cancel out.
+    """
+    deltas = Counter()
+    for sign, assignments in ((1, added), (-1, removed)):
+        for driver_id, truck_id, day in assignments:
+            # Normalized so that differently written ids hit the same rollup row
+            entities = (("driver", str(uuid.UUID(str(driver_id)))), ("truck", str(uuid.UUID(str(truck_id)))))
+            for entity_type, entity_id in entities:
+                for period_type in ROLLUP_PERIODS:
+                    deltas[(entity_type, entity_id, period_type, period_start(period_type, day))] += sign
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def upsert_statement(dialect_name: str):
+    """
+    Insert adding `assigned_days` to an existing rollup row, or creating it. Every
+    row is bound as a parameter set, so the statement compiles once per dialect.
+    """
+    table = UtilizationRollup.__table__
+    if dialect_name == "mysql":
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update(assigned_days=table.c.assigned_days + statement.inserted.assigned_days)
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.entity_type, table.c.entity_id, table.c.period_type, table.c.period_start],
+        set_={"assigned_days": table.c.assigned_days + statement.excluded.assigned_days}
+    )
+
+
+def rollup_batches(deltas: dict):
+    """
+    Parameter sets of the upsert in batches of `REBUILD_BATCH_SIZE`. Keys are sorted
+    so concurrent writers lock rollup rows in the same order.
+    """
+    keys = sorted(deltas)
+    for offset in range(0, len(keys), REBUILD_BATCH_SIZE):
+        yield [
+            {"entity_type": key[0], "entity_id": key[1], "period_type": key[2], "period_start": key[3], "assigned_days": deltas[key]}
+            for key in keys[offset:offset + REBUILD_BATCH_SIZE]
+        ]
+
+
+def apply_rollups(db, added=(), removed=()):
+    """
+    Add the assignment changes to the rollups in the session's transaction.
+    `added` and `removed` hold `(driver_id, truck_id, date)` tuples.
+    """
+    deltas = rollup_deltas(added, removed)
+    if deltas:
+        statement = upsert_statement(db.get_bind().dialect.name)
+        for rows in rollup_batches(deltas):
+            db.execute(statement, rows)
+
+
+async def apply_rollups_async(db, added=(), removed=()):
+    """
+    `apply_rollups` for an `AsyncSession`.
+    """
+    deltas = rollup_deltas(added, removed)
+    if deltas:
+        statement = upsert_statement(db.get_bind().dialect.name)
+        for rows in rollup_batches(deltas):
+            await db.execute(statement, rows)
+
+
+def rebuild_rollups(db) -> int:
+    """
+    Recompute every rollup from the hot and archived assignments in one transaction.
+    Run it while assignment writes are paused, e.g. right after the migration.
+    Returns the number of rollup rows written.
+    """
+    counts = Counter()
+    for table in (Assignment, ArchivedAssignment):
+        rows = db.execute(select(table.driver_id, table.truck_id, table.date).execution_options(yield_per=REBUILD_BATCH_SIZE))
+        for driver_id, truck_id, day in rows:
+            for entity_type, entity_id in (("driver", driver_id), ("truck", truck_id)):
+                for period_type in ROLLUP_PERIODS:
+                    counts[(entity_type, entity_id, period_type, period_start(period_type, day))] += 1
+
+    db.execute(delete(UtilizationRollup))
+    statement = upsert_statement(db.get_bind().dialect.name)
+    for rows in rollup_batches(counts):
+        db.execute(statement, rows)
+    db.commit()
+    return len(counts)
+
+
+if __name__ == "__main__":
+    # python -m services.rollups: backfill the rollups from the assignments
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild_rollups(db)} utilization rollups")
+    finally:
+        db.close()
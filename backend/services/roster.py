@@ -0,0 +1,409 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from services.flow import MinCostFlow
+from services.matching import match_by_license
+
+# License ranks run from 1 (A) to 5 (E)
+RANKS = range(1, 6)
+# Flow costs are integers: one day of workload is worth COST_SCALE
+COST_SCALE = 1000
+
+
+def hall_ok(driver_counts, truck_counts):
+    """
+    Whether every driver counted in `driver_counts` can get a truck from `truck_counts`.
+
+    Both map a license rank to a number of drivers/trucks. Because eligibility is
+    nested, Hall's condition only has to be checked for the drivers ranked at or
+    below each threshold: they can only use the trucks requiring at most that rank.
+    """
+    drivers = trucks = 0
+    for rank in RANKS:
+        drivers += driver_counts[rank]
+        trucks += truck_counts[rank]
+        if drivers > trucks:
+            return False
+    return True
+
+
+def schedulable(quotas, counts):
+    """
+    Whether drivers with `quotas` days left to work can fill days needing `counts`
+    drivers each, nobody working twice on a day (Gale-Ryser).
+    """
+    if sum(quotas) != sum(counts):
+        return False
+    counts = sorted(counts)
+    below = below_total = total = 0
+    for workers, quota in enumerate(sorted(quotas, reverse=True), 1):
+        if not quota:
+            break
+        total += quota
+        while below < len(counts) and counts[below] < workers:
+            below_total += counts[below]
+            below += 1
+        if total > below_total + workers * (len(counts) - below):
+            return False
+    return True
+
+
+def match_keeping_trucks(drivers, trucks, previous_truck):
+    """
+    Pair every driver of `drivers` with a truck of `trucks` (both map ids to license
+    ranks); Hall's condition must hold.
+
+    Drivers stay on their previous truck whenever the drivers that are left can still
+    all be matched to the trucks that are left; the others are paired with
+    `match_by_license`.
+
+    Returns `(pairs, kept)` where `pairs` is a list of `(driver_id, truck_id)` and
+    `kept` the number of drivers left on their previous truck.
+    """
+    driver_counts = defaultdict(int)
+    for rank in drivers.values():
+        driver_counts[rank] += 1
+    truck_counts = defaultdict(int)
+    for rank in trucks.values():
+        truck_counts[rank] += 1
+
+    pairs = []
+    remaining_trucks = dict(trucks)
+    remaining_drivers = []
+    for driver_id, rank in drivers.items():
+        truck_id = previous_truck.get(driver_id)
+        if truck_id in remaining_trucks and rank >= remaining_trucks[truck_id]:
+            driver_counts[rank] -= 1
+            truck_counts[remaining_trucks[truck_id]] -= 1
+            if hall_ok(driver_counts, truck_counts):
+                pairs.append((driver_id, truck_id))
+                del remaining_trucks[truck_id]
+                continue
+            driver_counts[rank] += 1
+            truck_counts[remaining_trucks[truck_id]] += 1
+        remaining_drivers.append(driver_id)
+
+    kept = len(pairs)
+    pairs.extend(match_by_license(
+        list(remaining_trucks.items()),
+        [(driver_id, drivers[driver_id]) for driver_id in remaining_drivers]
+    ))
+    return pairs, kept
+
+
+def plan_day(free_drivers, free_trucks, days_worked, previous_truck, continuity_weight):
+    """
+    Plan one day: `free_drivers` and `free_trucks` map ids to license ranks.
+
+    1. Choose which drivers work. Sets of drivers that can all be matched form a
+       (transversal) matroid, so adding drivers in order of increasing cost while
+       Hall's condition holds yields a maximum assignment of minimum total cost.
+       A driver's cost is the number of days already worked, minus
+       `continuity_weight` when their previous truck is free today.
+    2. Pair them with trucks with `match_keeping_trucks`.
+
+    Returns `(pairs, kept)` where `pairs` is a list of `(driver_id, truck_id)` and
+    `kept` the number of drivers left on their previous truck.
+    """
+    truck_counts = defaultdict(int)
+    for rank in free_trucks.values():
+        truck_counts[rank] += 1
+
+    def cost(driver_id):
+        bonus = continuity_weight if previous_truck.get(driver_id) in free_trucks else 0
+        return (days_worked[driver_id] - bonus, free_drivers[driver_id], driver_id)
+
+    selected = []
+    selected_counts = defaultdict(int)
+    capacity = len(free_trucks)
+    for driver_id in sorted(free_drivers, key=cost):
+        if len(selected) == capacity:
+            break
+        rank = free_drivers[driver_id]
+        selected_counts[rank] += 1
+        if hall_ok(selected_counts, truck_counts):
+            selected.append(driver_id)
+        else:
+            selected_counts[rank] -= 1
+
+    return match_keeping_trucks({driver_id: free_drivers[driver_id] for driver_id in selected}, free_trucks, previous_truck)
+
+
+def plan_day_by_day(start, end, drivers, trucks, existing, continuity_weight):
+    """
+    Plan the days from `start` to `end` in order with `plan_day`, each one optimal for
+    the days worked and trucks driven so far. Returns `(planned, kept)`.
+    """
+    booked = defaultdict(list)
+    for day, driver_id, truck_id in existing:
+        booked[day].append((driver_id, truck_id))
+
+    days_worked = defaultdict(int)
+    previous_truck = dict(booked.get(start - timedelta(days=1), []))
+
+    planned = []
+    kept_total = 0
+    day = start
+    while day <= end:
+        busy_drivers = set()
+        busy_trucks = set()
+        for driver_id, truck_id in booked.get(day, []):
+            busy_drivers.add(driver_id)
+            busy_trucks.add(truck_id)
+            days_worked[driver_id] += 1
+            previous_truck[driver_id] = truck_id
+
+        free_drivers = {driver_id: rank for driver_id, rank in drivers.items() if driver_id not in busy_drivers}
+        free_trucks = {truck_id: rank for truck_id, rank in trucks.items() if truck_id not in busy_trucks}
+
+        pairs, kept = plan_day(free_drivers, free_trucks, days_worked, previous_truck, continuity_weight)
+        kept_total += kept
+        for driver_id, truck_id in pairs:
+            planned.append((day, driver_id, truck_id))
+            days_worked[driver_id] += 1
+            previous_truck[driver_id] = truck_id
+        day += timedelta(days=1)
+    return planned, kept_total
+
+
+class DriverGroup:
+    """
+    Drivers the flow model cannot tell apart: same license rank, same days worked
+    already, same free days and, on each of them, an anchor truck of the same rank.
+    """
+
+    def __init__(self, members, free_days, anchor_ranks):
+        self.members = members
+        self.free_days = free_days
+        self.anchor_ranks = dict(anchor_ranks)
+        self.worked_arcs = {}
+        self.anchor_arcs = {}
+
+    def plan(self, flow):
+        """
+        Spread the days worked in `flow` over the members: `self.workers[day]` lists who works.
+
+        A member works at most one day more than another. Members keep working and keep
+        resting on consecutive days where the remaining days can still be covered, so
+        that rests come in blocks a replacement driver can cover on the same truck.
+        """
+        counts = [flow.flow(self.worked_arcs[day]) for day in self.free_days]
+        days_each, extra = divmod(sum(counts), len(self.members))
+        quota = {member: days_each + (n < extra) for n, member in enumerate(self.members)}
+        worked_last = dict.fromkeys(self.members, False)
+
+        self.workers = {}
+        for position, (day, count) in enumerate(zip(self.free_days, counts)):
+            days_left = len(self.free_days) - position
+            future = counts[position + 1:]
+            by_quota = sorted(self.members, key=lambda member: -quota[member])
+            preferred = sorted(self.members, key=lambda member: (quota[member] < days_left, not worked_last[member], -quota[member]))
+            for order in (preferred, by_quota):
+                chosen = set(order[:count])
+                if schedulable([quota[member] - (member in chosen) for member in self.members], future):
+                    break
+            self.workers[day] = [member for member in self.members if member in chosen]
+            for member in self.members:
+                quota[member] -= member in chosen
+                worked_last[member] = member in chosen
+
+
+class RosterProblem:
+    """
+    The drivers, trucks and existing bookings of a range of days, solved as one
+    min-cost flow per set of anchor trucks.
+    """
+
+    def __init__(self, start, end, drivers, trucks, existing, continuity_weight):
+        self.days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        self.drivers = drivers
+        self.trucks = trucks
+        self.continuity_weight = continuity_weight
+        self.booked = defaultdict(list)
+        for day, driver_id, truck_id in existing:
+            self.booked[day].append((driver_id, truck_id))
+
+        self.day_before = start - timedelta(days=1)
+        self.days_worked = defaultdict(int)
+        self.busy_drivers = {day: set() for day in self.days}
+        self.busy_trucks = {day: set() for day in self.days}
+        for day in self.days:
+            for driver_id, truck_id in self.booked.get(day, []):
+                self.busy_drivers[day].add(driver_id)
+                self.busy_trucks[day].add(truck_id)
+                self.days_worked[driver_id] += 1
+
+        # Drivers without a previous truck get a home truck: each truck, highest license
+        # first, goes to the lowest-ranked driver allowed on it, which keeps the most
+        # versatile drivers free to stand in for the others
+        previous_truck = dict(self.booked.get(self.day_before, []))
+        homes_taken = set(previous_truck.values())
+        homeless = sorted((rank, driver_id) for driver_id, rank in drivers.items() if driver_id not in previous_truck)
+        self.home = {}
+        for truck_id, rank in sorted(trucks.items(), key=lambda item: (-item[1], item[0])):
+            position = bisect_left(homeless, (rank,))
+            if truck_id not in homes_taken and position < len(homeless):
+                self.home[homeless.pop(position)[1]] = truck_id
+
+    def anchors(self):
+        """
+        Anchor trucks per day: `{day: {driver_id: truck_id}}`.
+
+        A driver's anchor on a day is the truck they were last booked on, else their
+        home truck. A truck anchors the driver booked on it most recently, on the days
+        both are free.
+        """
+        anchors = {}
+        last_driven = {driver_id: (truck_id, 1) for driver_id, truck_id in self.booked.get(self.day_before, [])}
+        for day_number, day in enumerate(self.days, 2):
+            latest = {}
+            for driver_id, rank in self.drivers.items():
+                truck_id, driven_on = last_driven.get(driver_id, (self.home.get(driver_id), 0))
+                if truck_id in self.trucks and rank >= self.trucks[truck_id] and driven_on >= latest.get(truck_id, (None, -1))[1]:
+                    latest[truck_id] = (driver_id, driven_on)
+            anchors[day] = {
+                driver_id: truck_id
+                for truck_id, (driver_id, _) in latest.items()
+                if driver_id not in self.busy_drivers[day] and truck_id not in self.busy_trucks[day]
+            }
+            for driver_id, truck_id in self.booked.get(day, []):
+                last_driven[driver_id] = (truck_id, day_number)
+        return anchors
+
+    def solve(self, anchors):
+        """
+        Plan the range for the given anchor trucks.
+
+        Flow runs source -> driver group -> group on a day -> truck rank on that day ->
+        sink, and its capacities enforce the license rule and one assignment per driver
+        and truck a day, so the maximum flow assigns as many trucks as possible on every
+        day. The n-th day a driver works costs their n-th day worked in the range
+        (existing ones included), which makes the cheapest flow the most even spread of
+        days worked; a day on the anchor truck is `continuity_weight` days cheaper.
+
+        The flow is then turned into drivers per day, and trucks for the drivers away
+        from their anchor, keeping them on their previous truck where possible.
+        Returns `(planned, kept)`.
+        """
+        days, drivers, trucks = self.days, self.drivers, self.trucks
+        grouped = defaultdict(list)
+        for driver_id in sorted(drivers):
+            free_days = tuple(day for day in days if driver_id not in self.busy_drivers[day])
+            anchor_ranks = tuple((day, trucks[anchors[day][driver_id]]) for day in free_days if driver_id in anchors[day])
+            grouped[drivers[driver_id], self.days_worked[driver_id], free_days, anchor_ranks].append(driver_id)
+
+        flow = MinCostFlow()
+        source, sink = flow.add_node(), flow.add_node()
+        unlimited = len(drivers)
+        # Drivers of a rank away from their anchor can take the trucks of that rank and below
+        away = {(day, rank): flow.add_node() for day in days for rank in RANKS}
+        slots = {(day, rank): flow.add_node() for day in days for rank in RANKS}
+        for day in days:
+            free_trucks = defaultdict(int)
+            for truck_id, rank in trucks.items():
+                if truck_id not in self.busy_trucks[day]:
+                    free_trucks[rank] += 1
+            for rank in RANKS:
+                flow.add_arc(away[day, rank], slots[day, rank], unlimited, 0)
+                if rank > RANKS[0]:
+                    flow.add_arc(away[day, rank], away[day, rank - 1], unlimited, 0)
+                flow.add_arc(slots[day, rank], sink, free_trucks[rank], 0)
+
+        anchor_bonus = max(round(self.continuity_weight * COST_SCALE) - 1, 0)  # ties go to fairness
+        groups = []
+        for (rank, worked, free_days, anchor_ranks), members in grouped.items():
+            if not free_days:
+                continue
+            group = DriverGroup(members, free_days, anchor_ranks)
+            groups.append(group)
+            node = flow.add_node()
+            for extra_day in range(1, len(free_days) + 1):
+                flow.add_arc(source, node, len(members), (worked + extra_day) * COST_SCALE)
+            for day in free_days:
+                day_node = flow.add_node()
+                group.worked_arcs[day] = flow.add_arc(node, day_node, len(members), 0)
+                flow.add_arc(day_node, away[day, rank], len(members), 0)
+                if day in group.anchor_ranks:
+                    group.anchor_arcs[day] = flow.add_arc(day_node, slots[day, group.anchor_ranks[day]], len(members), -anchor_bonus)
+
+        flow.solve(source, sink)
+        for group in groups:
+            group.plan(flow)
+
+        planned = []
+        kept_total = 0
+        previous_truck = dict(self.booked.get(self.day_before, []))
+        for day in days:
+            pairs = []
+            away_drivers = {}
+            free_trucks = {truck_id: rank for truck_id, rank in trucks.items() if truck_id not in self.busy_trucks[day]}
+            for group in groups:
+                anchored = flow.flow(group.anchor_arcs[day]) if day in group.anchor_arcs else 0
+                workers = sorted(group.workers.get(day, []), key=lambda driver_id: previous_truck.get(driver_id) != anchors[day].get(driver_id))
+                for driver_id in workers[:anchored]:
+                    pairs.append((driver_id, anchors[day][driver_id]))
+                    del free_trucks[anchors[day][driver_id]]
+                for driver_id in workers[anchored:]:
+                    away_drivers[driver_id] = drivers[driver_id]
+            kept_total += sum(previous_truck.get(driver_id) == truck_id for driver_id, truck_id in pairs)
+            away_pairs, kept = match_keeping_trucks(away_drivers, free_trucks, previous_truck)
+            kept_total += kept
+            pairs.extend(away_pairs)
+
+            for driver_id, truck_id in self.booked.get(day, []):
+                previous_truck[driver_id] = truck_id
+            for driver_id, truck_id in pairs:
+                planned.append((day, driver_id, truck_id))
+                previous_truck[driver_id] = truck_id
+        return planned, kept_total
+
+    def cost(self, planned, kept):
+        """
+        The objective the flow approximates, in days: the n-th day a driver works costs
+        n, each driver kept on their previous truck saves `continuity_weight`.
+        """
+        worked = defaultdict(int, self.days_worked)
+        total = 0
+        for _, driver_id, _ in planned:
+            worked[driver_id] += 1
+            total += worked[driver_id]
+        return total - self.continuity_weight * kept
+
+
+def plan_roster(start, end, drivers, trucks, existing, continuity_weight=1.0):
+    """
+    Plan assignments for every day from `start` to `end` (inclusive).
+
+    - `drivers` / `trucks`: dicts of id -> license rank.
+    - `existing`: `(date, driver_id, truck_id)` assignments already booked from
+      the day before `start` to `end`. They are kept, count towards the days worked
+      and seed the continuity preference.
+
+    The whole range is solved as one min-cost flow (see `RosterProblem.solve`): every
+    day gets as many assignments as possible, with the most even spread of days worked
+    traded against keeping drivers on their anchor truck. Continuity off the anchor
+    trucks is beyond the flow, so the day-by-day plan is built as well and the cheaper
+    of the two is returned (see `RosterProblem.cost`). Both cover the same number of
+    trucks each day.
+
+    Returns `(planned, stats)` where `planned` is a list of `(date, driver_id, truck_id)`.
+    """
+    problem = RosterProblem(start, end, drivers, trucks, existing, continuity_weight)
+    planned, kept = min(
+        problem.solve(problem.anchors()),
+        plan_day_by_day(start, end, drivers, trucks, existing, continuity_weight),
+        key=lambda plan: problem.cost(*plan)
+    )
+
+    worked = defaultdict(int, problem.days_worked)
+    for _, driver_id, _ in planned:
+        worked[driver_id] += 1
+    worked = [worked[driver_id] for driver_id in drivers]
+    stats = {
+        "planned": len(planned),
+        "kept_on_previous_truck": kept,
+        "min_days_worked": min(worked, default=0),
+        "max_days_worked": max(worked, default=0),
+    }
+    return planned, stats
@@ -0,0 +1,57 @@
+import asyncio
+import base64
+import binascii
+import logging
+from datetime import datetime, timedelta
+
+from config import SYNC_TOMBSTONE_RETENTION_DAYS
+from database import SessionLocal
+from models.models import Tombstone, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Entity names used in the tombstones table and in the `deleted` part of sync responses
+TOMBSTONE_ENTITIES = {"driver": "drivers", "truck": "trucks", "assignment": "assignments"}
+
+
+def encode_sync_cursor(moment: datetime) -> str:
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+def decode_sync_cursor(cursor: str) -> datetime:
+    """
+    Timestamp of a cursor from `encode_sync_cursor`. Raises ValueError when malformed.
+    """
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError) as error:
+        raise ValueError(str(error))
+
+
+def retention_horizon(now: datetime) -> datetime:
+    """
+    Oldest moment whose deletions are still known; older cursors need a full sync.
+    """
+    return now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def prune_tombstones() -> int:
+    db = SessionLocal()
+    try:
+        deleted = db.query(Tombstone).filter(Tombstone.deleted_at < retention_horizon(utcnow())).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+async def prune_tombstones_daily():
+    """
+    Drop tombstones past the retention period once a day.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(prune_tombstones)
+        except Exception:
+            logger.exception("Could not prune sync tombstones")
+        await asyncio.sleep(24 * 3600)
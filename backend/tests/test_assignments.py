@@ -1,9 +1,18 @@
+import asyncio
+import json
+from datetime import date
 import pytest
 import uuid
 from fastapi.testclient import TestClient
 from main import app
-from database import get_db, SessionLocal
+from config import DB_ASYNC
+from database import SessionLocal
 from models.models import Driver, Truck, Assignment
+from schemas.schemas import AssignmentResponseSchema
+from routes.events import event_matches, event_stream
+from services.events import broadcaster
+from services.occupancy import occupancy
+from utils.query_audit import query_budget
 
 client = TestClient(app)
 
@@ -65,7 +74,7 @@ def test_get_assignments(db_session, setup_driver_truck):
 
     # Create an assignment if the table is empty
     if not db_session.query(Assignment).first():
-        new_assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date="2025-02-15")
+        new_assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date=date(2025, 2, 15))
         db_session.add(new_assignment)
         db_session.commit()
 
@@ -85,7 +94,7 @@ def test_get_assignment_by_id(db_session, setup_driver_truck):
     driver_id = setup_driver_truck["driver_id"]
     truck_id = setup_driver_truck["truck_id"]
 
-    assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date="2025-02-15")
+    assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date=date(2025, 2, 15))
     db_session.add(assignment)
     db_session.commit()
 
@@ -104,7 +113,7 @@ def test_update_assignment(db_session, setup_driver_truck):
     driver_id = setup_driver_truck["driver_id"]
     truck_id = setup_driver_truck["truck_id"]
 
-    assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date="2025-02-15")
+    assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date=date(2025, 2, 15))
     db_session.add(assignment)
     db_session.commit()
 
@@ -128,7 +137,7 @@ def test_delete_assignment(db_session, setup_driver_truck):
     driver_id = setup_driver_truck["driver_id"]
     truck_id = setup_driver_truck["truck_id"]
 
-    assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date="2025-02-15")
+    assignment = Assignment(id=str(uuid.uuid4()), driver_id=driver_id, truck_id=truck_id, date=date(2025, 2, 15))
     db_session.add(assignment)
     db_session.commit()
 
@@ -139,3 +148,886 @@ def test_delete_assignment(db_session, setup_driver_truck):
     # Verify that it was actually deleted
     response = client.get(f"/api/assignments/{assignment.id}")
     assert response.status_code == 404
+
+
+# ✅ Test for creating assignments in bulk (POST)
+def test_create_assignments_bulk(db_session, setup_driver_truck):
+    """
+    Tests bulk creation, including conflicts inside the batch itself.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+
+    response = client.post("/api/assignments/bulk", json=[
+        {"driver_id": driver_id, "truck_id": truck_id, "date": "2025-03-01"},
+        {"driver_id": driver_id, "truck_id": truck_id, "date": "2025-03-01"},
+        {"driver_id": str(uuid.uuid4()), "truck_id": truck_id, "date": "2025-03-02"},
+        # Ids written differently refer to the same driver and truck
+        {"driver_id": driver_id.upper(), "truck_id": truck_id.replace("-", ""), "date": "2025-03-03"},
+        {"driver_id": driver_id, "truck_id": truck_id, "date": "2025-03-03"},
+    ])
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 3
+    assert data["results"][0]["status"] == "created"
+    assert data["results"][0]["assignment"]["truck_plate"]
+    assert data["results"][1]["detail"] == "Driver is already assigned to another truck on this date"
+    assert data["results"][2]["detail"] == "Driver not found"
+    assert data["results"][3]["assignment"]["driver_id"] == driver_id
+    assert data["results"][4]["detail"] == "Driver is already assigned to another truck on this date"
+
+
+# ✅ Test that double bookings are rejected by the unique indexes
+def test_create_assignment_conflict(db_session, setup_driver_truck):
+    """
+    Tests that a second assignment for the same driver and date returns 400.
+    """
+    payload = {
+        "driver_id": setup_driver_truck["driver_id"],
+        "truck_id": setup_driver_truck["truck_id"],
+        "date": "2025-04-01"
+    }
+
+    response = client.post("/api/assignments/", json=payload)
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/assignments/", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] in (
+        "Driver is already assigned to another truck on this date",
+        "Truck is already assigned to another driver on this date",
+    )
+
+
+# ✅ Test for paging through filtered assignments (GET)
+def test_get_assignments_keyset_pagination(db_session, setup_driver_truck):
+    """
+    Tests that limit/cursor pages through a driver's assignments in date order.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+
+    client.post("/api/assignments/bulk", json=[
+        {"driver_id": driver_id, "truck_id": truck_id, "date": day}
+        for day in ("2025-05-03", "2025-05-01", "2025-05-02")
+    ])
+
+    response = client.get("/api/assignments/", params={"driver_id": driver_id, "limit": 2})
+    assert response.status_code == 200, response.text
+    first_page = response.json()
+    assert [item["date"] for item in first_page] == ["2025-05-01", "2025-05-02"]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/api/assignments/", params={"driver_id": driver_id, "limit": 2, "cursor": cursor})
+    assert response.status_code == 200, response.text
+    assert [item["date"] for item in response.json()] == ["2025-05-03"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+# ✅ Test for exporting assignments (GET)
+def test_export_assignments(db_session, setup_driver_truck):
+    """
+    Tests the CSV and NDJSON exports filtered by driver.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+
+    client.post("/api/assignments/bulk", json=[
+        {"driver_id": driver_id, "truck_id": truck_id, "date": day}
+        for day in ("2025-06-01", "2025-06-02")
+    ])
+
+    response = client.get("/api/assignments/export", params={"driver_id": driver_id})
+    assert response.status_code == 200, response.text
+    lines = response.text.strip().splitlines()
+    assert lines[0] == "id,driver_id,driver_name,driver_license_type,truck_id,truck_plate,date"
+    assert len(lines) == 3
+
+    response = client.get("/api/assignments/export", params={"driver_id": driver_id, "format": "ndjson"})
+    assert response.status_code == 200, response.text
+    rows = [json.loads(line) for line in response.text.strip().splitlines()]
+    assert [row["date"] for row in rows] == ["2025-06-01", "2025-06-02"]
+    assert rows[0]["truck_id"] == truck_id
+
+
+# ✅ Test for the fleet-wide availability board (GET)
+def test_get_fleet_availability(db_session, setup_driver_truck):
+    """
+    Tests the free-day bitmaps and ranges of an assigned truck and driver.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+
+    client.post("/api/assignments/bulk", json=[
+        {"driver_id": driver_id, "truck_id": truck_id, "date": "2025-07-02"}
+    ])
+
+    response = client.get("/api/availability/", params={"start": "2025-07-01", "end": "2025-07-04"})
+    assert response.status_code == 200, response.text
+    data = response.json()
+
+    truck = next(item for item in data["trucks"] if item["id"] == truck_id)
+    driver = next(item for item in data["drivers"] if item["id"] == driver_id)
+    assert truck["free"] == "1011"
+    assert driver["free"] == "1011"
+    assert truck["free_ranges"] == [["2025-07-01", "2025-07-01"], ["2025-07-03", "2025-07-04"]]
+
+    # A license covers the trucks requiring it or less, and the drivers holding it or more
+    def listed(license_type):
+        data = client.get("/api/availability/", params={"start": "2025-07-01", "end": "2025-07-04", "license_type": license_type}).json()
+        return truck_id in {item["id"] for item in data["trucks"]}, driver_id in {item["id"] for item in data["drivers"]}
+
+    assert listed("D") == (True, False)
+    assert listed("C") == (True, True)
+    assert listed("B") == (False, True)
+
+
+# ✅ Test for automatic assignment of a day (POST)
+def test_auto_assign(db_session):
+    """
+    Tests that auto-assign respects license ranks and skips booked entities.
+    """
+    day = "2031-01-15"
+    senior = Driver(id=str(uuid.uuid4()), name="Senior", license_type="E")
+    junior = Driver(id=str(uuid.uuid4()), name="Junior", license_type="B")
+    heavy = Truck(id=str(uuid.uuid4()), plate=f"HVY-{uuid.uuid4().hex[:5]}", min_license_type="D")
+    light = Truck(id=str(uuid.uuid4()), plate=f"LGT-{uuid.uuid4().hex[:5]}", min_license_type="A")
+    db_session.add_all([senior, junior, heavy, light])
+    db_session.commit()
+
+    response = client.post("/api/assignments/auto", params={"date": day, "dry_run": True})
+    assert response.status_code == 200, response.text
+    proposed = {item["truck_id"]: item for item in response.json()["assignments"]}
+    assert proposed[heavy.id]["driver_license_type"] in ("D", "E")
+    assert response.json()["created"] == 0
+
+    response = client.post("/api/assignments/auto", params={"date": day})
+    assert response.status_code == 200, response.text
+    created = {item["truck_id"] for item in response.json()["assignments"]}
+    assert heavy.id in created
+
+    response = client.post("/api/assignments/auto", params={"date": day})
+    assert response.status_code == 200, response.text
+    assert all(item["truck_id"] not in created for item in response.json()["assignments"])
+
+
+# ✅ Test for planning a multi-day roster (POST)
+def test_plan_roster(db_session, setup_driver_truck):
+    """
+    Tests that a dry-run roster never double-books a driver or a truck.
+    """
+    response = client.post("/api/roster/plan", json={
+        "start": "2032-03-01",
+        "end": "2032-03-03",
+        "include_assignments": True
+    })
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["created"] == 0
+    assert data["planned"] == len(data["assignments"]) > 0
+    driver_days = {(item["driver_id"], item["date"]) for item in data["assignments"]}
+    truck_days = {(item["truck_id"], item["date"]) for item in data["assignments"]}
+    assert len(driver_days) == len(truck_days) == data["planned"]
+
+
+# ✅ Test for saving a roster (POST)
+def test_save_roster(db_session, setup_driver_truck, monkeypatch):
+    """
+    Tests that a saved roster publishes its assignments in the response shape of the other writes.
+    """
+    published = []
+    monkeypatch.setattr(broadcaster, "publish", lambda entity, action, data: published.append((entity, action, data)))
+
+    response = client.post("/api/roster/plan", json={"start": "2032-04-10", "end": "2032-04-10", "dry_run": False})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == len(published) > 0
+    assert {(entity, action) for entity, action, _ in published} == {("assignment", "created")}
+    for _, _, data in published:
+        event = AssignmentResponseSchema.model_validate(data)
+        assert event.driver_name and event.driver_license_type and event.truck_plate
+
+
+# ✅ Query budgets of the read endpoints
+def test_read_endpoints_query_budget(db_session, setup_driver_truck):
+    """
+    Tests that listing and detail reads run a fixed number of statements.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    client.post("/api/assignments/bulk", json=[
+        {"driver_id": driver_id, "truck_id": setup_driver_truck["truck_id"], "date": "2025-08-01"}
+    ])
+
+    # One statement for the data plus the table-version lookup behind the ETag
+    with query_budget(2):
+        assert client.get("/api/assignments/").status_code == 200
+    with query_budget(2):
+        assert client.get("/api/drivers/").status_code == 200
+    with query_budget(2):
+        assert client.get("/api/assignments/", params={"driver_id": driver_id, "limit": 10}).status_code == 200
+
+
+# ✅ Test for eligible and free drivers of a truck (GET)
+def test_get_eligible_drivers(db_session, setup_driver_truck):
+    """
+    Tests that only drivers with a high enough license and no assignment that day are listed.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    junior = Driver(id=str(uuid.uuid4()), name="Junior", license_type="A")
+    db_session.add(junior)
+    db_session.commit()
+
+    response = client.get(f"/api/trucks/{truck_id}/eligible-drivers")
+    assert response.status_code == 200, response.text
+    eligible = {driver["id"] for driver in response.json()}
+    assert driver_id in eligible
+    assert junior.id not in eligible
+
+    client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2025-09-01"})
+    response = client.get(f"/api/trucks/{truck_id}/eligible-drivers", params={"date": "2025-09-01"})
+    assert driver_id not in {driver["id"] for driver in response.json()}
+
+    response = client.get(f"/api/drivers/{driver_id}/eligible-trucks", params={"date": "2025-09-02"})
+    assert truck_id in {truck["id"] for truck in response.json()}
+
+
+# ✅ Test for binary UUID keys round-tripping through the API (GET)
+def test_binary_uuid_keys(db_session, setup_driver_truck):
+    """
+    Tests that ids come back in canonical string form and malformed ids are simply not found.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+
+    response = client.get(f"/api/drivers/{driver_id.upper()}")
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == driver_id
+
+    assert client.get("/api/drivers/not-a-uuid").status_code == 404
+    assert client.get("/api/assignments/not-a-uuid").status_code == 404
+
+
+# ✅ Test for conditional GET with ETags
+def test_conditional_get(db_session, setup_driver_truck):
+    """
+    Tests that unchanged lists answer 304 without running the list query and that writes change the ETag.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2025-10-01"})
+
+    response = client.get("/api/assignments/")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    with query_budget(1):
+        response = client.get("/api/assignments/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # A different query string is a different representation
+    assert client.get("/api/assignments/", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 200
+
+    client.put(f"/api/drivers/{driver_id}", json={"name": "Renamed", "license_type": "C"})
+    response = client.get("/api/assignments/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    detail = client.get(f"/api/trucks/{truck_id}")
+    assert client.get(f"/api/trucks/{truck_id}", headers={"If-None-Match": detail.headers["ETag"]}).status_code == 304
+
+
+# ✅ Test that the fast list encoding keeps the documented wire format
+def test_assignment_list_wire_format(db_session, setup_driver_truck):
+    """
+    Tests that listed assignments have exactly the fields of AssignmentResponseSchema, dates in ISO format.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    client.post("/api/assignments/", json={
+        "driver_id": driver_id, "truck_id": setup_driver_truck["truck_id"], "date": "2025-11-03"
+    })
+
+    response = client.get("/api/assignments/", params={"driver_id": driver_id})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [AssignmentResponseSchema.model_validate(item).model_dump(mode="json") for item in response.json()]
+    assert response.json()[0]["date"] == "2025-11-03"
+
+
+# ✅ Test for the in-memory occupancy index
+def test_occupancy_index(db_session, setup_driver_truck):
+    """
+    Tests that the occupancy index answers availability from memory and follows every write.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    slot = {"driver_id": driver_id, "truck_id": truck_id, "date": "2025-12-10"}
+    range_params = {"start": "2025-12-01", "end": "2025-12-31"}
+    from_database = client.get("/api/availability/", params=range_params).json()
+
+    occupancy.load(db_session, today=date(2025, 12, 1))
+    try:
+        assert client.get("/api/availability/", params=range_params).json() == from_database
+
+        created = client.post("/api/assignments/", json=slot).json()
+        with query_budget(0):
+            assert client.get(f"/api/trucks/{truck_id}/availability", params={"date": "2025-12-10"}).json() == {"available": False}
+
+        # Double booking rejected from memory, updating onto its own slot still allowed
+        response = client.post("/api/assignments/", json=slot)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Truck is already assigned to another driver on this date"
+        assert client.put(f"/api/assignments/{created['id']}", json=slot).status_code == 200
+
+        client.put(f"/api/assignments/{created['id']}", json={**slot, "date": "2025-12-11"})
+        assert occupancy.truck_booked(truck_id, date(2025, 12, 10)) is False
+        assert occupancy.driver_booked(driver_id, date(2025, 12, 11)) is True
+        assert occupancy.driver_booked(driver_id.replace("-", "").upper(), date(2025, 12, 11)) is True
+
+        client.delete(f"/api/assignments/{created['id']}")
+        assert occupancy.truck_days(truck_id, date(2025, 12, 1), 31) == 0
+        assert occupancy.truck_booked(truck_id, date(2024, 1, 1)) is None
+    finally:
+        occupancy.clear()
+
+
+# ✅ Test for the live change feed (Server-Sent Events)
+def test_change_feed(db_session, setup_driver_truck):
+    """
+    Tests that writes are published, replayed from an event id with filters, and delivered live.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    all_entities = {"assignment", "driver", "truck"}
+
+    async def collect(last_event_id, matches, during=None):
+        stream = event_stream(last_event_id, matches)
+        chunks = [await anext(stream)]
+        if during:
+            await asyncio.to_thread(during)
+        try:
+            while True:
+                chunks.append(await asyncio.wait_for(anext(stream), 0.3))
+        except asyncio.TimeoutError:
+            pass
+        await stream.aclose()
+        return b"".join(chunks).decode()
+
+    resume_from = broadcaster.last_event_id
+    created = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2025-12-20"}).json()
+    client.put(f"/api/drivers/{driver_id}", json={"name": "Feed Driver", "license_type": "C"})
+    client.delete(f"/api/assignments/{created['id']}")
+
+    replay = asyncio.run(collect(resume_from, lambda event: event_matches(event, all_entities, None, None)))
+    assert replay.index("event: assignment.created") < replay.index("event: driver.updated") < replay.index("event: assignment.deleted")
+    assert created["id"] in replay and '"date":"2025-12-20"' in replay
+
+    filtered = asyncio.run(collect(resume_from, lambda event: event_matches(event, all_entities, date(2026, 1, 1), None)))
+    assert "driver.updated" in filtered and "assignment." not in filtered
+
+    assert "event: reset" in asyncio.run(collect("stale-1", lambda event: True))
+
+    live = asyncio.run(collect(None, lambda event: True, during=lambda: client.put(
+        f"/api/trucks/{truck_id}", json={"plate": f"LIV-{uuid.uuid4().hex[:5]}", "min_license_type": "C"}
+    )))
+    assert "event: truck.updated" in live
+    assert broadcaster.subscriber_count == 0
+
+
+# ✅ Test for delta sync (GET)
+def test_delta_sync(db_session, setup_driver_truck, monkeypatch):
+    """
+    Tests that a sync cursor only returns what changed or was deleted after it.
+    """
+    import routes.sync
+    monkeypatch.setattr(routes.sync, "SYNC_OVERLAP_SECONDS", 0)
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+
+    first = client.get("/api/sync").json()
+    assert first["full"] is True
+    assert driver_id in {driver["id"] for driver in first["drivers"]}
+
+    created = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2025-12-24"}).json()
+    client.put(f"/api/drivers/{driver_id}", json={"name": "Synced Driver", "license_type": "C"})
+
+    delta = client.get("/api/sync", params={"since": first["cursor"]}).json()
+    assert delta["full"] is False
+    assert [assignment["id"] for assignment in delta["assignments"]] == [created["id"]]
+    assert [driver["name"] for driver in delta["drivers"]] == ["Synced Driver"]
+    assert delta["trucks"] == []
+
+    client.delete(f"/api/assignments/{created['id']}")
+    delta = client.get("/api/sync", params={"since": delta["cursor"]}).json()
+    assert delta["assignments"] == [] and delta["drivers"] == []
+    assert delta["deleted"]["assignments"] == [created["id"]]
+
+    assert client.get("/api/sync", params={"since": "not-a-cursor"}).status_code == 400
+
+
+# ✅ Test for streaming CSV / NDJSON imports (POST)
+def test_import_trucks_and_drivers(db_session, setup_driver_truck):
+    """
+    Tests that imports save valid rows and report invalid ones by line number.
+    """
+    existing_plate = db_session.get(Truck, setup_driver_truck["truck_id"]).plate
+    prefix = uuid.uuid4().hex[:5]
+    csv_body = "\n".join([
+        "plate,min_license_type",
+        f"IMP-{prefix}-1,B",
+        f"IMP-{prefix}-2,A",
+        f"IMP-{prefix}-1,C",
+        f"{existing_plate},A",
+        f"IMP-{prefix}-3,Z",
+        "",
+        f"IMP-{prefix}-4",
+    ])
+    response = client.post("/api/trucks/import", content=csv_body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["created"] == 2 and report["failed"] == 4
+    assert [(error["line"], error["detail"]) for error in report["errors"]] == [
+        (4, "Duplicate plate in the file"),
+        (5, "A truck with this plate already exists"),
+        (6, "Invalid license type"),
+        (8, "Expected 2 columns, found 1"),
+    ]
+    assert db_session.query(Truck).filter(Truck.plate == f"IMP-{prefix}-2").one().min_license_rank == 1
+
+    ndjson_body = '{"name": "Imported One", "license_type": "D"}\nnot json\n{"name": "Imported Two"}\n'
+    report = client.post("/api/drivers/import", content=ndjson_body, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert report["created"] == 1 and [error["line"] for error in report["errors"]] == [2, 3]
+
+    assert client.post("/api/trucks/import", content="plate\nX", headers={"Content-Type": "text/csv"}).status_code == 400
+
+
+# ✅ Test for Idempotency-Key retries of assignment writes (POST / PUT)
+@pytest.mark.parametrize("store", ["memory", "database"])
+def test_idempotent_assignment_writes(db_session, setup_driver_truck, monkeypatch, store):
+    """
+    Tests that a retried write replays its first response instead of running again.
+    """
+    import services.idempotency as idempotency
+    if store == "database":
+        monkeypatch.setattr(idempotency, "idempotency_store", idempotency.DatabaseIdempotencyStore(60, 60))
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    payload = {"driver_id": driver_id, "truck_id": truck_id, "date": "2026-04-01"}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/api/assignments/", json=payload, headers=headers)
+    retry = client.post("/api/assignments/", json=payload, headers=headers)
+    assert first.status_code == retry.status_code == 200, retry.text
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true" and "Idempotent-Replayed" not in first.headers
+    assert db_session.query(Assignment).filter(Assignment.driver_id == driver_id).count() == 1
+
+    # The same key with another body is rejected; without a key the conflict is reported as before
+    assert client.post("/api/assignments/", json={**payload, "date": "2026-04-02"}, headers=headers).status_code == 422
+    assert client.post("/api/assignments/", json=payload).status_code == 400
+
+    # Failures are not stored, so a retry runs again
+    update_headers = {"Idempotency-Key": uuid.uuid4().hex}
+    missing_truck = {**payload, "truck_id": str(uuid.uuid4())}
+    for _ in range(2):
+        response = client.put(f"/api/assignments/{first.json()['id']}", json=missing_truck, headers=update_headers)
+        assert response.status_code == 404 and "Idempotent-Replayed" not in response.headers
+
+    moved = {**payload, "date": "2026-04-03"}
+    updated = client.put(f"/api/assignments/{first.json()['id']}", json=moved, headers={"Idempotency-Key": headers["Idempotency-Key"]})
+    assert updated.status_code == 200 and updated.json()["date"] == "2026-04-03"
+
+
+# ✅ Test for routing reads to a replica (GET)
+def test_read_replica_routing(db_session, setup_driver_truck, tmp_path, monkeypatch):
+    """
+    Tests that reads use the replica, except right after the client wrote.
+    """
+    import database
+    import time
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from fastapi import Request, Response
+    from middlewares.middlewares import read_your_writes_middleware
+    from utils.cache import driver_cache
+
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    database.Base.metadata.create_all(replica_engine)
+    ReplicaSession = sessionmaker(bind=replica_engine, info={"replica": True})
+    monkeypatch.setattr(database, "ReplicaSessionLocals", [ReplicaSession])
+    if database.DB_ASYNC:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        async_replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+        monkeypatch.setattr(database, "AsyncReplicaSessionLocals", [async_sessionmaker(bind=async_replica, info={"replica": True})])
+    replica_driver_id = str(uuid.uuid4())
+    with ReplicaSession() as replica:
+        replica.add(Driver(id=replica_driver_id, name="Replica Driver", license_type="B"))
+        replica.commit()
+
+    reader = TestClient(app)
+    listed = {driver["id"] for driver in reader.get("/api/drivers/").json()}
+    assert listed == {replica_driver_id}
+    assert reader.get(f"/api/drivers/{replica_driver_id}").status_code == 200
+    # Rows read from a replica may lag behind the primary, so they are not cached
+    assert driver_cache.get(replica_driver_id) is None
+
+    reader.cookies.set(database.LAST_WRITE_COOKIE, str(time.time()))
+    listed = {driver["id"] for driver in reader.get("/api/drivers/").json()}
+    assert setup_driver_truck["driver_id"] in listed and replica_driver_id not in listed
+
+    reader.cookies.set(database.LAST_WRITE_COOKIE, str(time.time() - 3600))
+    assert {driver["id"] for driver in reader.get("/api/drivers/").json()} == {replica_driver_id}
+
+    async def call_next(request):
+        return Response(status_code=200)
+
+    for method, marked in (("POST", True), ("GET", False)):
+        response = asyncio.run(read_your_writes_middleware(Request({"type": "http", "method": method, "headers": []}), call_next))
+        assert (database.LAST_WRITE_COOKIE in response.headers.get("set-cookie", "")) is marked
+
+
+# ✅ Test for moving old assignments to the archive
+def test_assignment_archive(db_session, setup_driver_truck, monkeypatch):
+    """
+    Tests that archived assignments stay readable but can no longer be changed.
+    """
+    import services.archive
+    from models.models import ArchivedAssignment
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    old = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2001-01-05"}).json()
+    recent = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2001-03-01"}).json()
+
+    # Keep the assignments from 2001-02-01 on in the hot table
+    monkeypatch.setattr(services.archive, "ASSIGNMENT_HOT_DAYS", (date.today() - date(2001, 2, 1)).days)
+    assert services.archive.archive_assignments(db_session, services.archive.hot_horizon()) >= 1
+    assert db_session.get(Assignment, old["id"]) is None
+    assert db_session.get(ArchivedAssignment, old["id"]).date == date(2001, 1, 5)
+
+    assert client.get(f"/api/assignments/{old['id']}").json() == old
+    listed = client.get("/api/assignments/", params={"driver_id": driver_id}).json()
+    assert [assignment["id"] for assignment in listed] == [old["id"], recent["id"]]
+    first_page = client.get("/api/assignments/", params={"driver_id": driver_id, "limit": 1})
+    assert first_page.json() == [old]
+    second_page = client.get("/api/assignments/", params={"driver_id": driver_id, "limit": 1, "cursor": first_page.headers["X-Next-Cursor"]})
+    assert second_page.json() == [recent]
+    assert client.get("/api/assignments/", params={"driver_id": driver_id, "date_from": "2001-02-01"}).json() == [recent]
+    exported = client.get("/api/assignments/export", params={"format": "ndjson", "driver_id": driver_id}).text.splitlines()
+    assert [json.loads(line)["id"] for line in exported] == [old["id"], recent["id"]]
+    assert client.get(f"/api/trucks/{truck_id}/availability", params={"date": "2001-01-05"}).json() == {"available": False}
+
+    assert client.put(f"/api/assignments/{old['id']}", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2001-03-02"}).status_code == 400
+    assert client.delete(f"/api/assignments/{old['id']}").status_code == 400
+    response = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2001-01-06"})
+    assert response.status_code == 400 and "archived" in response.json()["detail"]
+
+
+# ✅ Test for the utilization rollups and reports (GET)
+def test_utilization_reports(db_session, setup_driver_truck):
+    """
+    Tests that assignment writes keep the rollups current and match a full rebuild.
+    """
+    from services.rollups import rebuild_rollups
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    created = [
+        client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": day}).json()
+        for day in ("2027-03-01", "2027-03-02", "2027-03-31")
+    ]
+    client.put(f"/api/assignments/{created[2]['id']}", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2027-04-01"})
+    client.delete(f"/api/assignments/{created[1]['id']}")
+    client.post("/api/assignments/bulk", json=[{"driver_id": driver_id, "truck_id": truck_id, "date": "2027-03-10"}])
+
+    def report(entity, entity_id, period):
+        params = {"entity": entity, "entity_id": entity_id, "period": period, "start": "2027-03-01", "end": "2027-04-30"}
+        response = client.get("/api/reports/utilization", params=params)
+        assert response.status_code == 200, response.text
+        return [(row["period_start"], row["assigned_days"], row["days"]) for row in response.json()]
+
+    monthly = report("truck", truck_id, "month")
+    assert monthly == [("2027-03-01", 2, 31), ("2027-04-01", 1, 30)]
+    assert report("driver", driver_id, "month") == monthly
+    weekly = report("driver", driver_id, "week")
+    assert weekly == [("2027-03-01", 1, 7), ("2027-03-08", 1, 7), ("2027-03-29", 1, 7)]
+
+    rebuild_rollups(db_session)
+    assert report("truck", truck_id, "month") == monthly and report("driver", driver_id, "week") == weekly
+
+    summary = client.get("/api/reports/utilization/summary", params={"entity": "truck", "start": "2027-04-01", "end": "2027-04-30"}).json()
+    assert summary[0]["period_start"] == "2027-04-01" and summary[0]["assigned_days"] >= 1
+    assert client.get("/api/reports/utilization", params={"entity": "truck", "start": "2027-04-01", "end": "2027-03-01"}).status_code == 400
+
+
+# ✅ Test for persisting a full-size bulk batch with its rollups (POST)
+def test_bulk_batch_rollups(db_session):
+    """
+    Tests that a maximum-size bulk batch of distinct drivers and trucks is stored
+    together with its rollups.
+    """
+    from models.models import UtilizationRollup
+    from routes.assignments import MAX_BULK_ASSIGNMENTS
+    from sqlalchemy import delete, insert
+    day = "2029-06-15"
+    drivers = [{"id": str(uuid.uuid4()), "name": f"Bulk {n}", "license_type": "E", "license_rank": 5} for n in range(MAX_BULK_ASSIGNMENTS)]
+    trucks = [{"id": str(uuid.uuid4()), "plate": f"BLK-{uuid.uuid4().hex[:8]}", "min_license_type": "A", "min_license_rank": 1} for _ in drivers]
+    db_session.execute(insert(Driver), drivers)
+    db_session.execute(insert(Truck), trucks)
+    db_session.commit()
+    driver_ids = [driver["id"] for driver in drivers]
+    truck_ids = [truck["id"] for truck in trucks]
+
+    try:
+        batch = [{"driver_id": driver_id, "truck_id": truck_id, "date": day} for driver_id, truck_id in zip(driver_ids, truck_ids)]
+        response = client.post("/api/assignments/bulk", json=batch)
+        assert response.status_code == 200, response.text
+        assert response.json()["created"] == MAX_BULK_ASSIGNMENTS
+
+        params = {"entity": "truck", "entity_id": truck_ids[-1], "period": "week", "start": day, "end": day}
+        assert [row["assigned_days"] for row in client.get("/api/reports/utilization", params=params).json()] == [1]
+    finally:
+        # Keeps the shared test database small for the other tests
+        db_session.rollback()
+        db_session.execute(delete(Assignment).where(Assignment.driver_id.in_(driver_ids)))
+        db_session.execute(delete(UtilizationRollup).where(UtilizationRollup.entity_id.in_(driver_ids + truck_ids)))
+        db_session.execute(delete(Driver).where(Driver.id.in_(driver_ids)))
+        db_session.execute(delete(Truck).where(Truck.id.in_(truck_ids)))
+        db_session.commit()
+
+
+# ✅ Test for the plate check of new trucks (POST)
+def test_create_truck_plate_check(db_session):
+    """
+    Tests that plate uniqueness is checked against the database, not a possibly stale cache.
+    """
+    plate = f"OLD-{uuid.uuid4().hex[:5]}"
+    created = client.post("/api/trucks/", json={"plate": plate, "min_license_type": "B"})
+    assert created.status_code == 200, created.text
+    assert client.post("/api/trucks/", json={"plate": plate, "min_license_type": "B"}).status_code == 409
+
+    # Renamed by another worker, whose write does not reach this worker's cache
+    truck = db_session.query(Truck).filter(Truck.plate == plate).one()
+    truck.plate = f"NEW-{uuid.uuid4().hex[:5]}"
+    db_session.commit()
+
+    assert client.post("/api/trucks/", json={"plate": plate, "min_license_type": "B"}).status_code == 200
+
+
+# ✅ Test that a slot taken after the pre-checks is still a conflict
+def test_bulk_concurrent_double_booking(db_session, setup_driver_truck, monkeypatch):
+    """
+    Tests that a bulk write racing another booking of the same truck returns 400.
+    """
+    import routes.assignments
+
+    other = Driver(id=str(uuid.uuid4()), name=f"Driver {uuid.uuid4().hex[:6]}", license_type="C")
+    db_session.add(other)
+    db_session.commit()
+    day = date(2033, 5, 5)
+    archived_detail = routes.assignments.archived_detail
+
+    def book_concurrently(value):
+        # Runs once the existing bookings have been read, like a concurrent request would
+        with SessionLocal() as concurrent:
+            if not concurrent.query(Assignment).filter_by(truck_id=setup_driver_truck["truck_id"], date=day).count():
+                concurrent.add(Assignment(id=str(uuid.uuid4()), driver_id=other.id, truck_id=setup_driver_truck["truck_id"], date=day))
+                concurrent.commit()
+        return archived_detail(value)
+
+    monkeypatch.setattr(routes.assignments, "archived_detail", book_concurrently)
+
+    response = client.post("/api/assignments/bulk", json=[
+        {"driver_id": setup_driver_truck["driver_id"], "truck_id": setup_driver_truck["truck_id"], "date": day.isoformat()}
+    ])
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Truck is already assigned to another driver on this date"
+
+
+# ✅ Test that the roster is planned over the whole range at once
+def test_plan_roster_horizon():
+    """
+    Tests that a day is left to the driver without bookings later in the range.
+    """
+    from services.roster import plan_roster
+
+    planned, stats = plan_roster(
+        date(2032, 5, 1), date(2032, 5, 2),
+        {"driver-a": 3, "driver-b": 3}, {"truck": 2},
+        existing=[(date(2032, 5, 2), "driver-a", "truck")]
+    )
+
+    assert planned == [(date(2032, 5, 1), "driver-b", "truck")]
+    assert stats["min_days_worked"] == stats["max_days_worked"] == 1
+
+
+# ✅ Test that writes through non-canonical ids refresh the cached trucks
+def test_truck_cache_non_canonical_ids(db_session, setup_driver_truck):
+    """
+    Tests that assignment writes see a truck updated or deleted through an id written differently.
+    """
+    driver_id = setup_driver_truck["driver_id"]
+    truck_id = setup_driver_truck["truck_id"]
+    plate = db_session.get(Truck, truck_id).plate
+    assert client.get(f"/api/trucks/{truck_id}").status_code == 200
+
+    response = client.put(f"/api/trucks/{truck_id.upper()}", json={"plate": plate, "min_license_type": "E"})
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2033-06-01"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Driver does not have the required license type"
+
+    response = client.delete(f"/api/trucks/{truck_id.replace('-', '')}")
+    assert response.status_code == 200, response.text
+
+    assert client.get(f"/api/trucks/{truck_id}").status_code == 404
+    response = client.post("/api/assignments/", json={"driver_id": driver_id, "truck_id": truck_id, "date": "2033-06-02"})
+    assert response.status_code == 404
+
+
+def error_entry(endpoint: str):
+    return {"timestamp": date.today(), "error_message": "boom", "stack_trace": "Traceback", "endpoint": endpoint}
+
+
+# ✅ Test that the error log writer inserts its entries in batches
+def test_error_log_writer_batches(db_session, monkeypatch):
+    """
+    Tests that queued entries are written with one insert per batch.
+    """
+    import middlewares.error_logger as error_logger
+    from models.models import ErrorLog
+
+    batches = []
+    insert_error_logs = error_logger.insert_error_logs
+    monkeypatch.setattr(error_logger, "insert_error_logs", lambda entries: batches.append(len(entries)) or insert_error_logs(entries))
+    endpoint = f"/writer-{uuid.uuid4().hex[:8]}"
+    writer = error_logger.ErrorLogWriter(max_queue=10, batch_size=2)
+
+    async def run():
+        for _ in range(5):
+            writer.submit(error_entry(endpoint))
+        await writer.stop()
+
+    asyncio.run(run())
+
+    assert batches == [2, 2, 1]
+    assert writer.stats() == {"queued": 0, "written": 5, "failed": 0, "dropped": 0}
+    assert db_session.query(ErrorLog).filter(ErrorLog.endpoint == endpoint).count() == 5
+
+
+# ✅ Test that a full error log queue drops entries instead of blocking
+def test_error_log_writer_drops_when_full(monkeypatch):
+    """
+    Tests that entries beyond the queue bound are counted as dropped while the writer is stuck.
+    """
+    import threading
+    import time
+    import middlewares.error_logger as error_logger
+
+    release = threading.Event()
+    monkeypatch.setattr(error_logger, "insert_error_logs", lambda entries: release.wait(5))
+    writer = error_logger.ErrorLogWriter(max_queue=2, batch_size=1)
+
+    async def run():
+        writer.submit(error_entry("/stuck"))
+        await asyncio.sleep(0.05)  # the writer takes the first entry and blocks on it
+        started = time.perf_counter()
+        for _ in range(5):
+            writer.submit(error_entry("/stuck"))
+        elapsed = time.perf_counter() - started
+        stats = writer.stats()
+        release.set()
+        await writer.stop()
+        return elapsed, stats
+
+    elapsed, stats = asyncio.run(run())
+
+    assert elapsed < 0.1
+    assert stats["queued"] == 2 and stats["dropped"] == 3
+    assert writer.stats()["written"] == 3
+
+
+# ✅ Test that stopping the error log writer flushes what is queued
+def test_error_log_writer_flushes_on_stop(db_session):
+    """
+    Tests that entries still queued when the writer stops are written before it exits.
+    """
+    from middlewares.error_logger import ErrorLogWriter
+    from models.models import ErrorLog
+
+    endpoint = f"/writer-{uuid.uuid4().hex[:8]}"
+    writer = ErrorLogWriter(max_queue=100, batch_size=50)
+
+    async def run():
+        for _ in range(20):
+            writer.submit(error_entry(endpoint))
+        assert writer.stats()["queued"] == 20
+        await writer.stop()
+
+    asyncio.run(run())
+
+    assert writer.stats()["written"] == 20
+    assert db_session.query(ErrorLog).filter(ErrorLog.endpoint == endpoint).count() == 20
+
+
+def scrape_metrics():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+# ✅ Test the Prometheus metrics endpoint
+def test_metrics_endpoint(db_session, setup_driver_truck):
+    """
+    Tests that a request shows up in the route latency and SQL statement histograms,
+    next to the connection pool gauges.
+    """
+    latency = 'http_request_duration_seconds_count{method="GET",route="/api/trucks/",status="200"}'
+    statements = 'db_statements_per_request_sum{method="GET",route="/api/trucks/"}'
+    before = scrape_metrics()
+
+    assert client.get("/api/trucks/").status_code == 200
+
+    after = scrape_metrics()
+    assert after[latency] == before.get(latency, 0) + 1
+    assert after[latency.replace("_count", "_bucket").replace('"}', '",le="+Inf"}')] == after[latency]
+    assert after[statements] >= before.get(statements, 0) + 1
+    for gauge in ("db_pool_size", "db_pool_checked_out", "db_pool_overflow"):
+        assert f'{gauge}{{engine="primary"}}' in after
+    assert after['db_pool_size{engine="primary"}'] == 10
+
+
+# ✅ Run this module again against the async routers
+@pytest.mark.skipif(DB_ASYNC, reason="already running against the async routers")
+def test_async_routers():
+    """
+    Runs the assignment, driver and truck tests of this module with DB_ASYNC=true. The
+    routers are chosen when the app is imported, so the tests run in a new interpreter.
+    """
+    import os
+    import subprocess
+    import sys
+
+    async_url = os.getenv("ASYNC_DATABASE_URL")
+    if not async_url:
+        drivers = {"sqlite": ("sqlite+aiosqlite", "aiosqlite"), "postgresql": ("postgresql+asyncpg", "asyncpg")}
+        scheme, _, rest = os.environ["DATABASE_URL"].partition(":")
+        if scheme not in drivers:
+            pytest.skip(f"No async driver known for {scheme}")
+        pytest.importorskip(drivers[scheme][1])
+        async_url = f"{drivers[scheme][0]}:{rest}"
+
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", __file__],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "DB_ASYNC": "true", "ASYNC_DATABASE_URL": async_url},
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout[-4000:] + result.stderr[-2000:]
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import select
+
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from database import is_replica
+from models.models import Driver, Truck
+
+# Immutable snapshots of the cached rows, safe to share between sessions and threads
+DriverRow = namedtuple("DriverRow", ["id", "name", "license_type", "license_rank"])
+TruckRow = namedtuple("TruckRow", ["id", "plate", "min_license_type", "min_license_rank"])
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl_seconds` after being stored.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+driver_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+truck_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+
+def cache_driver(driver, store=True):
+    row = DriverRow(driver.id, driver.name, driver.license_type, driver.license_rank)
+    if store:
+        driver_cache.set(row.id, row)
+    return row
+
+
+def cache_truck(truck, store=True):
+    row = TruckRow(truck.id, truck.plate, truck.min_license_type, truck.min_license_rank)
+    if store:
+        truck_cache.set(row.id, row)
+    return row
+
+
+def invalidate_driver(driver_id):
+    driver_cache.delete(driver_id)
+
+
+def invalidate_truck(truck_id):
+    truck_cache.delete(truck_id)
+
+
+def get_driver_row(db, driver_id):
+    """
+    Driver snapshot by id, from the cache or the database. None if it does not exist.
+    """
+    row = driver_cache.get(driver_id)
+    if row is None:
+        driver = db.execute(select(Driver).filter(Driver.id == driver_id)).scalar_one_or_none()
+        row = cache_driver(driver, store=not is_replica(db)) if driver else None
+    return row
+
+
+def get_truck_row(db, truck_id):
+    """
+    Truck snapshot by id, from the cache or the database. None if it does not exist.
+    """
+    row = truck_cache.get(truck_id)
+    if row is None:
+        truck = db.execute(select(Truck).filter(Truck.id == truck_id)).scalar_one_or_none()
+        row = cache_truck(truck, store=not is_replica(db)) if truck else None
+    return row
+
+
+def get_driver_rows(db, driver_ids):
+    """
+    Driver snapshots keyed by id; the ids missing from the cache are loaded in one query.
+    """
+    rows = {}
+    missing = []
+    for driver_id in driver_ids:
+        row = driver_cache.get(driver_id)
+        if row is None:
+            missing.append(driver_id)
+        else:
+            rows[driver_id] = row
+    if missing:
+        for driver in db.execute(select(Driver).filter(Driver.id.in_(missing))).scalars():
+            rows[driver.id] = cache_driver(driver, store=not is_replica(db))
+    return rows
+
+
+def get_truck_rows(db, truck_ids):
+    """
+    Truck snapshots keyed by id; the ids missing from the cache are loaded in one query.
+    """
+    rows = {}
+    missing = []
+    for truck_id in truck_ids:
+        row = truck_cache.get(truck_id)
+        if row is None:
+            missing.append(truck_id)
+        else:
+            rows[truck_id] = row
+    if missing:
+        for truck in db.execute(select(Truck).filter(Truck.id.in_(missing))).scalars():
+            rows[truck.id] = cache_truck(truck, store=not is_replica(db))
+    return rows
+
+
+async def get_driver_row_async(db, driver_id):
+    """
+    `get_driver_row` for an `AsyncSession`.
+    """
+    row = driver_cache.get(driver_id)
+    if row is None:
+        driver = await db.get(Driver, driver_id)
+        row = cache_driver(driver, store=not is_replica(db)) if driver else None
+    return row
+
+
+async def get_truck_row_async(db, truck_id):
+    """
+    `get_truck_row` for an `AsyncSession`.
+    """
+    row = truck_cache.get(truck_id)
+    if row is None:
+        truck = await db.get(Truck, truck_id)
+        row = cache_truck(truck, store=not is_replica(db)) if truck else None
+    return row
+
+
+def cache_stats():
+    return {"drivers": driver_cache.stats(), "trucks": truck_cache.stats()}
@@ -0,0 +1,101 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select, update
+
+from models.models import TableVersion
+
+
+def _version_update(table: str):
+    return (
+        update(TableVersion)
+        .where(TableVersion.name == table)
+        .values(version=TableVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_versions(db, *tables: str):
+    """
+    Bump the version of every table in `tables` inside the caller's transaction,
+    so the new ETags become visible exactly when the write commits.
+    """
+    for table in tables:
+        if not db.execute(_version_update(table)).rowcount:
+            db.add(TableVersion(name=table, version=1))
+
+
+async def bump_versions_async(db, *tables: str):
+    """
+    Async counterpart of `bump_versions`.
+    """
+    for table in tables:
+        if not (await db.execute(_version_update(table))).rowcount:
+            db.add(TableVersion(name=table, version=1))
+
+
+def _versions_select(tables):
+    return select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+
+
+def make_etag(request: Request, *parts) -> str:
+    """
+    Weak ETag over the request path, query string and `parts`.
+    """
+    key = "|".join([request.url.path, request.url.query, *map(repr, parts)])
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:24]}"'
+
+
+def _etag_from_versions(request: Request, tables, versions: dict) -> str:
+    # A table that was never bumped has no row yet; its first bump inserts version 1
+    return make_etag(request, *[(table, versions.get(table, 0)) for table in sorted(tables)])
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of `etag` against the request's `If-None-Match` header.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Attach the validators to `response` and return a `304 Not Modified` response
+    when the client already holds the current representation, None otherwise.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def check_table_versions(db, request: Request, response: Response, *tables: str) -> Optional[Response]:
+    """
+    Conditional GET keyed on the versions of `tables`. The versions are read
+    before the data, so a concurrent write can only make the body newer than
+    its ETag, never older.
+    """
+    versions = dict(db.execute(_versions_select(tables)).all())
+    return conditional_response(request, response, _etag_from_versions(request, tables, versions))
+
+
+async def check_table_versions_async(db, request: Request, response: Response, *tables: str) -> Optional[Response]:
+    """
+    Async counterpart of `check_table_versions`.
+    """
+    versions = dict((await db.execute(_versions_select(tables))).all())
+    return conditional_response(request, response, _etag_from_versions(request, tables, versions))
+
+
+def check_content(request: Request, response: Response, content) -> Optional[Response]:
+    """
+    Conditional GET keyed on the response content itself, for rows that are
+    already at hand without touching the database (e.g. from the entity cache).
+    """
+    return conditional_response(request, response, make_etag(request, content))
@@ -0,0 +1,180 @@
+import bisect
+import contextvars
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """
+    Prometheus histogram with optional labels. `observe` is thread-safe.
+    """
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                labels = format_labels(zip(self.labels, label_values))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.name}_bucket{format_labels(zip(self.labels, label_values), le=bound)} {cumulative}')
+                lines.append(f'{self.name}_bucket{format_labels(zip(self.labels, label_values), le="+Inf")} {count}')
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    Prometheus gauge, either set directly or computed by `callback` at scrape time.
+    With `labels`, the callback returns a dict of label values to gauge values.
+    """
+
+    def __init__(self, name: str, help: str, callback=None, labels=()):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount):
+        with self._lock:
+            self.value += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if self.labels:
+            for label_values, value in sorted(self.callback().items()):
+                lines.append(f"{self.name}{format_labels(zip(self.labels, label_values))} {value}")
+            return lines
+        value = self.callback() if self.callback else self.value
+        lines.append(f"{self.name} {value}")
+        return lines
+
+
+def format_labels(pairs, **extra):
+    items = [*pairs, *extra.items()]
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.")
+REQUEST_STATEMENTS = Histogram("db_statements_per_request", "SQL statements executed per request.", ("method", "route"), COUNT_BUCKETS)
+REQUEST_SQL_TIME = Histogram("db_statement_seconds_per_request", "Total SQL execution time per request.", ("method", "route"))
+POOL_CHECKOUT_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",))
+
+# Engines serving traffic whose QueuePool is exposed, by their `engine` label
+pooled_engines = {}
+
+
+def pool_stats(stat):
+    return {(name,): stat(engine.pool) for name, engine in pooled_engines.items()}
+
+
+POOL_SIZE = Gauge("db_pool_size", "Configured number of pooled connections.", lambda: pool_stats(lambda pool: pool.size()), ("engine",))
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out.", lambda: pool_stats(lambda pool: pool.checkedout()), ("engine",))
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened beyond the pool size.", lambda: pool_stats(lambda pool: max(pool.overflow(), 0)), ("engine",)
+)
+
+METRICS = [
+    REQUEST_LATENCY, REQUESTS_IN_FLIGHT, REQUEST_STATEMENTS, REQUEST_SQL_TIME,
+    POOL_CHECKOUT_WAIT, POOL_SIZE, POOL_CHECKED_OUT, POOL_OVERFLOW
+]
+
+# [statement count, total seconds] of the current request, shared with the handler's thread
+request_sql_stats = contextvars.ContextVar("request_sql_stats", default=None)
+
+
+class TimedPoolMixin:
+    """
+    Records how long each checkout waited for a connection, labelled with the
+    engine name that `instrument_engine` gives the pool.
+    """
+    engine_name = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, self.engine_name)
+
+    def recreate(self):
+        # Disposing the engine swaps in a new pool, which keeps the label
+        pool = super().recreate()
+        pool.engine_name = self.engine_name
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine, name: str):
+    """
+    Count statements and SQL time per request and expose the pool saturation of
+    `engine` under the `engine="<name>"` label. Pass `sync_engine` of an async engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        stats = request_sql_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    if isinstance(engine.pool, QueuePool):
+        engine.pool.engine_name = name
+        pooled_engines[name] = engine
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,110 @@
+import base64
+import heapq
+import json
+from datetime import date
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+    """
+    payload = json.dumps([value.isoformat() if isinstance(value, date) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor produced by `encode_cursor` back into typed values for `columns`.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [
+            date.fromisoformat(value) if column.type.python_type is date else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_after(columns, values):
+    """
+    Build `(c1, c2, ...) > (v1, v2, ...)` expanded into OR/AND terms so that
+    every database can use the composite index on the sort columns.
+    """
+    clauses = []
+    for position, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        clauses.append(and_(*equal_prefix, column > values[position]))
+    return or_(*clauses)
+
+
+def _page_query(query, columns, cursor, limit):
+    query = query.order_by(*columns)
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, columns)))
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+
+def _trim_page(rows, columns, limit, response: Response):
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return rows
+
+
+def fetch_page(query, columns, cursor, limit, response: Response):
+    """
+    Order `query` by `columns`, resume after `cursor` and return at most `limit` rows.
+
+    When more rows remain, the cursor for the next page is sent in the
+    `X-Next-Cursor` response header. Without a limit every remaining row is returned.
+    """
+    rows = _page_query(query, columns, cursor, limit).all()
+    return _trim_page(rows, columns, limit, response)
+
+
+async def fetch_page_async(db, statement, columns, cursor, limit, response: Response, scalars=False):
+    """
+    `fetch_page` for a `select()` statement run on an `AsyncSession`.
+    Set `scalars` when selecting a single ORM entity.
+    """
+    result = await db.execute(_page_query(statement, columns, cursor, limit))
+    rows = result.scalars().all() if scalars else result.all()
+    return _trim_page(rows, columns, limit, response)
+
+
+def _merge_pages(pages, columns, limit, response: Response):
+    keys = [column.key for column in columns]
+    rows = list(heapq.merge(*pages, key=lambda row: tuple(getattr(row, key) for key in keys)))
+    return _trim_page(rows, columns, limit, response)
+
+
+def fetch_merged_page(queries, columns_by_query, cursor, limit, response: Response):
+    """
+    `fetch_page` over several queries selecting the same labels, such as the hot and
+    archived assignments. Each query is paged on its own sort columns and index, and
+    the pages are merged in sort order.
+    """
+    pages = [_page_query(query, columns, cursor, limit).all() for query, columns in zip(queries, columns_by_query)]
+    return _merge_pages(pages, columns_by_query[0], limit, response)
+
+
+async def fetch_merged_page_async(db, statements, columns_by_query, cursor, limit, response: Response):
+    """
+    `fetch_merged_page` for `select()` statements run on an `AsyncSession`.
+    """
+    pages = [
+        (await db.execute(_page_query(statement, columns, cursor, limit))).all()
+        for statement, columns in zip(statements, columns_by_query)
+    ]
+    return _merge_pages(pages, columns_by_query[0], limit, response)
@@ -0,0 +1,112 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from config import QUERY_AUDIT_REPEAT_THRESHOLD, QUERY_AUDIT_SLOW_MS
+
+logger = logging.getLogger(__name__)
+
+
+class QueryAudit:
+    """
+    Statements executed while the audit is active, with their duration in seconds.
+    """
+
+    def __init__(self, slow_ms: float = QUERY_AUDIT_SLOW_MS, repeat_threshold: int = QUERY_AUDIT_REPEAT_THRESHOLD):
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        with self._lock:
+            self.statements.append((statement, seconds))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self):
+        """
+        Identical statements run at least `repeat_threshold` times: the N+1 signature,
+        since SQLAlchemy sends the same parameterised SQL for every lazy load.
+        """
+        counts = Counter(statement for statement, _ in self.statements)
+        return {statement: count for statement, count in counts.items() if count >= self.repeat_threshold}
+
+    def slow(self):
+        return [(statement, seconds) for statement, seconds in self.statements if seconds * 1000 >= self.slow_ms]
+
+    def report(self):
+        lines = [f"{self.count} statements"]
+        lines += [f"repeated {count}x: {statement}" for statement, count in self.repeated().items()]
+        lines += [f"slow {seconds * 1000:.1f} ms: {statement}" for statement, seconds in self.slow()]
+        return "\n".join(lines)
+
+
+# Audit of the current request (set by `query_audit_middleware`)
+current_audit = contextvars.ContextVar("current_audit", default=None)
+# Audits opened with `audit_queries()`; they see statements from every thread
+_global_audits = []
+_global_lock = threading.Lock()
+
+
+def install_query_audit(engine):
+    """
+    Feed every statement run on `engine` to the active audits.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("audit_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["audit_started"].pop()
+        audit = current_audit.get()
+        if audit is not None:
+            audit.record(statement, elapsed)
+        for audit in _global_audits:
+            audit.record(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("audit_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+@contextmanager
+def audit_queries(**options):
+    """
+    Record every statement executed inside the block, from any thread.
+
+        with audit_queries() as audit:
+            client.get("/api/assignments/")
+        assert not audit.repeated()
+    """
+    audit = QueryAudit(**options)
+    with _global_lock:
+        _global_audits.append(audit)
+    try:
+        yield audit
+    finally:
+        with _global_lock:
+            _global_audits.remove(audit)
+
+
+@contextmanager
+def query_budget(max_statements: int, **options):
+    """
+    Fail when the block runs more than `max_statements` statements or repeats one
+    as often as an N+1 loop would.
+    """
+    with audit_queries(**options) as audit:
+        yield audit
+    assert audit.count <= max_statements, f"Query budget of {max_statements} exceeded:\n{audit.report()}"
+    assert not audit.repeated(), f"Repeated statements (N+1):\n{audit.report()}"
@@ -0,0 +1,55 @@
+import json
+from datetime import date
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used without it
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """
+    Encode `content` as compact UTF-8 JSON bytes, with dates in ISO format,
+    matching FastAPI's default JSON responses.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def row_dicts(rows):
+    """
+    SQL result rows as dicts keyed by the selected labels.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    # Every row shares its labels; zipping them is cheaper than Row._asdict()
+    fields = rows[0]._fields if rows else ()
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def rows_response(rows, response: Response) -> FastJSONResponse:
+    """
+    Serialize SQL result rows straight to a JSON array of objects keyed by the
+    selected labels, skipping the `response_model` validation pass.
+
+    The query must select exactly the fields of the documented response model.
+    Headers already set on the injected `response` (cursor, ETag) are kept.
+    """
+    fast_response = FastJSONResponse(row_dicts(rows))
+    fast_response.headers.raw.extend(response.headers.raw)
+    return fast_response